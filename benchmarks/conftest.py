@@ -0,0 +1,57 @@
+import os
+
+import pytest
+
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from rest_framework.test import APIClient
+
+from .seed import seed_dataset
+
+
+BENCH_USERS = int(os.environ.get('BENCH_USERS', 10))
+BENCH_TASKS = int(os.environ.get('BENCH_TASKS', 1000))
+
+
+@pytest.fixture(scope='session')
+def dataset(django_db_setup, django_db_blocker):
+    """
+    Dataset compartido por toda la sesión. Se dimensiona con las variables
+    de entorno BENCH_USERS y BENCH_TASKS (tareas por usuario).
+    """
+    with django_db_blocker.unblock():
+        users = seed_dataset(users=BENCH_USERS, tasks_per_user=BENCH_TASKS)
+    return users
+
+
+@pytest.fixture(autouse=True)
+def disable_throttling(settings):
+    settings.REST_FRAMEWORK = dict(
+        settings.REST_FRAMEWORK, DEFAULT_THROTTLE_RATES={}
+    )
+
+
+@pytest.fixture
+def bench_user(dataset):
+    return dataset[0]
+
+
+@pytest.fixture
+def client(bench_user):
+    client = APIClient()
+    client.force_authenticate(user=bench_user)
+    return client
+
+
+@pytest.fixture
+def count_queries(benchmark):
+    """
+    Ejecuta una vez la operación fuera del benchmark y guarda la cantidad
+    de queries en `extra_info` del reporte.
+    """
+    def run(operation, *args, **kwargs):
+        with CaptureQueriesContext(connection) as context:
+            operation(*args, **kwargs)
+        benchmark.extra_info['queries'] = len(context.captured_queries)
+        return len(context.captured_queries)
+    return run
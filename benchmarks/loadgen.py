@@ -0,0 +1,296 @@
+"""
+Generador de carga en proceso para la API de tareas.
+
+Crea una base de test, la puebla con `seed_dataset` y lanza `--concurrency`
+usuarios virtuales que recorren register/login/list/filter/create/complete/
+reopen/delete contra la aplicación WSGI usando el cliente de test de Django.
+Reporta throughput, p50/p95/p99 y queries por request, y opcionalmente
+compara el resultado contra un baseline JSON.
+
+    python -m benchmarks.loadgen --users 10 --tasks 1000 --concurrency 4 \\
+        --iterations 50 --baseline benchmarks/baseline.json
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+
+
+OPERATIONS = (
+    'register', 'login', 'list', 'filter', 'create', 'complete', 'reopen',
+    'delete',
+)
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class Recorder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.queries = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def add(self, operation, seconds, queries, ok):
+        with self.lock:
+            self.latencies[operation].append(seconds)
+            self.queries[operation].append(queries)
+            if not ok:
+                self.errors[operation] += 1
+
+
+class VirtualUser(threading.Thread):
+    def __init__(self, index, email, password, iterations, recorder):
+        super().__init__(name=f'vuser-{index}')
+        self.index = index
+        self.email = email
+        self.password = password
+        self.iterations = iterations
+        self.recorder = recorder
+        self.error = None
+
+    def request(self, operation, method, url, expected, **kwargs):
+        from django.db import connection
+
+        count = [0]
+
+        def counter(execute, sql, params, many, context):
+            count[0] += 1
+            return execute(sql, params, many, context)
+
+        start = time.perf_counter()
+        with connection.execute_wrapper(counter):
+            response = getattr(self.client, method)(url, **kwargs)
+        elapsed = time.perf_counter() - start
+        self.recorder.add(
+            operation, elapsed, count[0], response.status_code == expected
+        )
+        return response
+
+    def run(self):
+        from django.db import connections
+        from django.test import Client
+        from django.urls import reverse
+
+        self.client = Client()
+        try:
+            self.request(
+                'register', 'post', reverse('register'), 201,
+                data={
+                    'username': f'loadgen{self.index}',
+                    'email': f'loadgen{self.index}@bench.local',
+                    'password': self.password,
+                    'phone_number': '1234567890',
+                },
+                content_type='application/json'
+            )
+            response = self.request(
+                'login', 'post', reverse('login'), 200,
+                data={'username': self.email, 'password': self.password},
+                content_type='application/json'
+            )
+            self.client.defaults['HTTP_AUTHORIZATION'] = (
+                f"Bearer {response.json()['access']}"
+            )
+            list_url = reverse('task-list')
+            for _ in range(self.iterations):
+                self.request('list', 'get', list_url, 200)
+                self.request(
+                    'filter', 'get', list_url, 200,
+                    data={'status': 'pending', 'priority': 'high'}
+                )
+                response = self.request(
+                    'create', 'post', list_url, 201,
+                    data={'title': 'Load test task', 'priority': 'high'},
+                    content_type='application/json'
+                )
+                pk = response.json()['id']
+                self.request(
+                    'complete', 'post',
+                    reverse('task-complete', kwargs={'pk': pk}), 200
+                )
+                self.request(
+                    'reopen', 'post',
+                    reverse('task-reopen', kwargs={'pk': pk}), 200
+                )
+                self.request(
+                    'delete', 'delete',
+                    reverse('task-detail', kwargs={'pk': pk}), 204
+                )
+        except Exception as exc:
+            self.error = exc
+        finally:
+            connections.close_all()
+
+
+def run(users, tasks_per_user, concurrency, iterations):
+    from django.db import connection
+
+    from .seed import BENCH_PASSWORD, bench_email, seed_dataset
+
+    seed_start = time.perf_counter()
+    seed_dataset(users=users, tasks_per_user=tasks_per_user)
+    seed_seconds = time.perf_counter() - seed_start
+
+    recorder = Recorder()
+    vusers = [
+        VirtualUser(
+            index,
+            bench_email(index % users),
+            BENCH_PASSWORD,
+            iterations,
+            recorder
+        )
+        for index in range(concurrency)
+    ]
+    start = time.perf_counter()
+    for vuser in vusers:
+        vuser.start()
+    for vuser in vusers:
+        vuser.join()
+    elapsed = time.perf_counter() - start
+    for vuser in vusers:
+        if vuser.error is not None:
+            raise vuser.error
+
+    total = sum(len(values) for values in recorder.latencies.values())
+    operations = {}
+    for operation in OPERATIONS:
+        latencies = recorder.latencies.get(operation, [])
+        queries = recorder.queries.get(operation, [])
+        if not latencies:
+            continue
+        operations[operation] = {
+            'requests': len(latencies),
+            'errors': recorder.errors.get(operation, 0),
+            'mean_ms': round(sum(latencies) / len(latencies) * 1000, 3),
+            'p50_ms': round(percentile(latencies, 0.50) * 1000, 3),
+            'p95_ms': round(percentile(latencies, 0.95) * 1000, 3),
+            'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+            'queries_per_request': round(sum(queries) / len(queries), 2),
+        }
+    return {
+        'meta': {
+            'database': connection.vendor,
+            'users': users,
+            'tasks_per_user': tasks_per_user,
+            'concurrency': concurrency,
+            'iterations': iterations,
+            'seed_seconds': round(seed_seconds, 3),
+        },
+        'throughput_rps': round(total / elapsed, 2),
+        'operations': operations,
+    }
+
+
+def compare(result, baseline, tolerance):
+    """
+    Devuelve la lista de regresiones respecto del baseline: cualquier
+    aumento de queries por request, o un p95 peor que `tolerance`.
+    """
+    regressions = []
+    if baseline.get('meta', {}).get('database') != result['meta']['database']:
+        print(
+            'warning: baseline measured on a different database, '
+            'latencies are not comparable',
+            file=sys.stderr
+        )
+    for operation, expected in baseline.get('operations', {}).items():
+        actual = result['operations'].get(operation)
+        if actual is None:
+            continue
+        if actual['queries_per_request'] > expected['queries_per_request']:
+            regressions.append(
+                f"{operation}: queries/request "
+                f"{expected['queries_per_request']} -> "
+                f"{actual['queries_per_request']}"
+            )
+        limit = expected['p95_ms'] * (1 + tolerance)
+        if actual['p95_ms'] > limit:
+            regressions.append(
+                f"{operation}: p95 {expected['p95_ms']}ms -> "
+                f"{actual['p95_ms']}ms (limit {limit:.3f}ms)"
+            )
+    return regressions
+
+
+def print_report(result):
+    print(
+        f"{'operation':<10} {'requests':>8} {'p50 ms':>9} {'p95 ms':>9} "
+        f"{'p99 ms':>9} {'queries':>8}"
+    )
+    for operation, stats in result['operations'].items():
+        print(
+            f"{operation:<10} {stats['requests']:>8} {stats['p50_ms']:>9} "
+            f"{stats['p95_ms']:>9} {stats['p99_ms']:>9} "
+            f"{stats['queries_per_request']:>8}"
+        )
+    print(f"throughput: {result['throughput_rps']} req/s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--users', type=int, default=10)
+    parser.add_argument('--tasks', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--output', help='Guarda el resultado en JSON')
+    parser.add_argument('--baseline', help='Baseline JSON a comparar')
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    parser.add_argument(
+        '--write-baseline',
+        action='store_true',
+        help='Sobrescribe --baseline con el resultado'
+    )
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'setup.settings.bench')
+    import django
+    django.setup()
+
+    from django.conf import settings
+    from django.db import connection
+    from django.test.utils import override_settings, setup_test_environment
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(
+        verbosity=0, autoclobber=True
+    )
+    # Sin throttling: se mide la API, no el rate limit
+    rest_framework = dict(settings.REST_FRAMEWORK, DEFAULT_THROTTLE_RATES={})
+    try:
+        with override_settings(REST_FRAMEWORK=rest_framework):
+            result = run(
+                args.users, args.tasks, args.concurrency, args.iterations
+            )
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    print_report(result)
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(result, output, indent=2)
+    if args.baseline and args.write_baseline:
+        with open(args.baseline, 'w') as output:
+            json.dump(result, output, indent=2)
+            output.write('\n')
+    elif args.baseline:
+        with open(args.baseline) as source:
+            regressions = compare(result, json.load(source), args.tolerance)
+        for regression in regressions:
+            print(f'REGRESSION {regression}', file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
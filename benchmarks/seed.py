@@ -0,0 +1,107 @@
+import random
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.utils import timezone
+
+from tasks.models import Task, Workspace, WorkspaceMembership
+from users.models import Users
+
+
+BENCH_PASSWORD = 'bench-pass-123'
+BENCH_PREFIX = 'bench'
+
+
+def bench_email(index):
+    return f'{BENCH_PREFIX}{index}@bench.local'
+
+
+def seed_dataset(users=10, tasks_per_user=100, batch_size=5000, seed=0):
+    """
+    Crea `users` usuarios con `tasks_per_user` tareas cada uno mediante
+    `bulk_create`. El resultado es reproducible para un mismo `seed`.
+    Devuelve la lista de usuarios creados.
+    """
+    rng = random.Random(seed)
+    password = make_password(BENCH_PASSWORD)
+    created = Users.objects.bulk_create([
+        Users(
+            username=f'{BENCH_PREFIX}{index}',
+            email=bench_email(index),
+            password=password,
+            phone_number='',
+        )
+        for index in range(users)
+    ], batch_size=batch_size)
+    if created and created[0].pk is None:
+        created = list(
+            Users.objects.filter(username__startswith=BENCH_PREFIX)
+            .order_by('pk')
+        )
+
+    statuses = [choice for choice, _ in Task.STATUS_CHOICES]
+    priorities = [choice for choice, _ in Task.PRIORITY_CHOICES]
+    now = timezone.now()
+    batch = []
+    for user in created:
+        for index in range(tasks_per_user):
+            status = rng.choice(statuses)
+            batch.append(Task(
+                user=user,
+                title=f'Task {index}',
+                description=f'Benchmark task {index} for {user.username}',
+                status=status,
+                priority=rng.choice(priorities),
+                due_date=now + timedelta(days=rng.randint(-30, 30)),
+                completed_at=now if status == 'completed' else None,
+            ))
+            if len(batch) >= batch_size:
+                Task.objects.bulk_create(batch)
+                batch = []
+    if batch:
+        Task.objects.bulk_create(batch)
+    return created
+
+
+def seed_workspace(owner, members=1000, tasks=100000, batch_size=5000):
+    """
+    Crea un workspace de `owner` con `members` miembros adicionales y
+    `tasks` tareas repartidas entre ellos. Devuelve el workspace.
+    """
+    password = make_password(BENCH_PASSWORD)
+    prefix = f'{BENCH_PREFIX}ws{owner.pk}-'
+    Users.objects.bulk_create([
+        Users(
+            username=f'{prefix}{index}',
+            email=f'{prefix}{index}@bench.local',
+            password=password,
+            phone_number='',
+        )
+        for index in range(members)
+    ], batch_size=batch_size)
+    users = [owner, *Users.objects.filter(username__startswith=prefix)]
+
+    workspace = Workspace.objects.create(name=f'{prefix}workspace', owner=owner)
+    WorkspaceMembership.objects.bulk_create([
+        WorkspaceMembership(
+            workspace=workspace,
+            user=user,
+            role='owner' if user == owner else 'member',
+        )
+        for user in users
+    ], batch_size=batch_size)
+
+    for start in range(0, tasks, batch_size):
+        Task.objects.bulk_create([
+            Task(
+                user=users[index % len(users)],
+                workspace=workspace,
+                title=f'Shared task {index}',
+            )
+            for index in range(start, min(start + batch_size, tasks))
+        ])
+    return workspace
+
+
+def clear_dataset():
+    Users.objects.filter(username__startswith=BENCH_PREFIX).delete()
@@ -0,0 +1,91 @@
+import itertools
+
+import pytest
+
+from django.urls import reverse
+
+from tasks.models import Task
+from .seed import BENCH_PASSWORD, bench_email
+
+
+pytest.importorskip('pytest_benchmark')
+
+pytestmark = pytest.mark.django_db
+
+
+def test_login(benchmark, count_queries, client, bench_user):
+    url = reverse('login')
+    data = {'username': bench_email(0), 'password': BENCH_PASSWORD}
+    count_queries(client.post, url, data, format='json')
+    response = benchmark(client.post, url, data, format='json')
+    assert response.status_code == 200
+
+
+def test_register(benchmark, count_queries, client):
+    url = reverse('register')
+    counter = itertools.count()
+
+    def register():
+        index = next(counter)
+        return client.post(url, {
+            'username': f'register{index}',
+            'email': f'register{index}@bench.local',
+            'password': BENCH_PASSWORD,
+            'phone_number': '1234567890',
+        }, format='json')
+
+    count_queries(register)
+    response = benchmark(register)
+    assert response.status_code == 201, response.data
+
+
+def test_list_tasks(benchmark, count_queries, client):
+    url = reverse('task-list')
+    count_queries(client.get, url)
+    response = benchmark(client.get, url)
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize('params', [
+    {'status': 'pending'},
+    {'priority': 'high'},
+    {'title': 'Task 1'},
+    {'status': 'pending', 'priority': 'high'},
+])
+def test_filter_tasks(benchmark, count_queries, client, params):
+    url = reverse('task-list')
+    count_queries(client.get, url, params)
+    response = benchmark(client.get, url, params)
+    assert response.status_code == 200
+
+
+def test_create_task(benchmark, count_queries, client):
+    url = reverse('task-list')
+    data = {'title': 'New task', 'priority': 'high'}
+    count_queries(client.post, url, data, format='json')
+    response = benchmark(client.post, url, data, format='json')
+    assert response.status_code == 201
+
+
+def test_complete_and_reopen_task(benchmark, count_queries, client, bench_user):
+    task = Task.objects.filter(user=bench_user).first()
+    complete_url = reverse('task-complete', kwargs={'pk': task.pk})
+    reopen_url = reverse('task-reopen', kwargs={'pk': task.pk})
+
+    def complete_and_reopen():
+        client.post(complete_url)
+        return client.post(reopen_url)
+
+    count_queries(complete_and_reopen)
+    response = benchmark(complete_and_reopen)
+    assert response.status_code == 200
+
+
+def test_delete_task(benchmark, count_queries, client, bench_user):
+    def setup():
+        task = Task.objects.create(title='To delete', user=bench_user)
+        url = reverse('task-detail', kwargs={'pk': task.pk})
+        return (url,), {}
+
+    count_queries(client.delete, setup()[0][0])
+    benchmark.pedantic(client.delete, setup=setup, rounds=50)
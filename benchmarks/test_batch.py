@@ -0,0 +1,50 @@
+"""
+Sincronización de `size` cambios con requests sueltos frente a un solo
+`POST /api/batch/`. El cliente de los benchmarks fuerza la autenticación,
+así que la diferencia no incluye el costo de red ni la validación del JWT
+por request, que el batch también ahorra.
+"""
+import pytest
+
+from django.urls import reverse
+
+from tasks.models import Task
+
+
+pytest.importorskip('pytest_benchmark')
+
+pytestmark = pytest.mark.django_db
+
+SIZES = [10, 50]
+
+
+def task_ids(user, size):
+    return list(
+        Task.objects.filter(user=user).values_list('pk', flat=True)[:size]
+    )
+
+
+@pytest.mark.parametrize('size', SIZES)
+def test_separate_requests(benchmark, client, bench_user, size):
+    ids = task_ids(bench_user, size)
+
+    def run():
+        for pk in ids:
+            client.patch(
+                reverse('task-detail', kwargs={'pk': pk}),
+                {'priority': 'high'}, format='json'
+            )
+
+    benchmark(run)
+
+
+@pytest.mark.parametrize('size', SIZES)
+def test_batch(benchmark, count_queries, client, bench_user, size):
+    url = reverse('batch')
+    data = {'operations': [
+        {'method': 'PATCH', 'path': f'/api/tasks/{pk}/', 'body': {'priority': 'high'}}
+        for pk in task_ids(bench_user, size)
+    ]}
+    count_queries(client.post, url, data, format='json')
+    response = benchmark(client.post, url, data, format='json')
+    assert response.status_code == 200, response.data
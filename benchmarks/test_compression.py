@@ -0,0 +1,40 @@
+"""
+CPU contra bytes ahorrados de cada codec y nivel, sobre el JSON de un
+listado de tareas. El tamaño comprimido y el ratio quedan en `extra_info`
+para elegir `COMPRESSION_LEVELS`. Los codecs no instalados se saltean.
+"""
+import pytest
+
+from core import compression
+from core.renderers import FastJSONRenderer
+from tasks.serializers import TaskSerializer
+from .test_rendering import build_tasks
+
+
+pytest.importorskip('pytest_benchmark')
+
+LEVELS = {
+    'gzip': [1, 6, 9],
+    'br': [1, 4, 6, 11],
+    'zstd': [1, 3, 9, 19],
+}
+
+
+@pytest.fixture(scope='module', params=[100, 5_000])
+def payload(request):
+    data = TaskSerializer(build_tasks(request.param), many=True).data
+    return FastJSONRenderer().render(data)
+
+
+@pytest.mark.parametrize('name, level', [
+    (name, level) for name, levels in LEVELS.items() for level in levels
+])
+def test_compress(benchmark, payload, name, level):
+    codec = compression.CODECS.get(name)
+    if codec is None:
+        pytest.skip(f'{name} is not installed.')
+    compressed = codec.compress(payload, level)
+    benchmark.extra_info['bytes'] = len(payload)
+    benchmark.extra_info['compressed_bytes'] = len(compressed)
+    benchmark.extra_info['ratio'] = round(len(payload) / len(compressed), 2)
+    benchmark(codec.compress, payload, level)
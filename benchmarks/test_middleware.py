@@ -0,0 +1,31 @@
+"""
+Costo del stack de middleware por request de la API: el stack anterior,
+con sesión, CSRF, mensajes y clickjacking en todos los requests, contra el
+actual, que solo los corre en el admin. Usa un request sin token, que no
+toca la base, para que la diferencia sea solo la de los middleware.
+"""
+import pytest
+
+from django.conf import settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+
+pytest.importorskip('pytest_benchmark')
+
+pytestmark = pytest.mark.django_db
+
+FULL_MIDDLEWARE = [
+    middleware for middleware in settings.MIDDLEWARE
+    if middleware != 'core.middleware.AdminMiddleware'
+] + settings.ADMIN_MIDDLEWARE
+
+
+@pytest.mark.parametrize('stack', ['full', 'api'])
+def test_api_request(benchmark, settings, stack):
+    if stack == 'full':
+        settings.MIDDLEWARE = FULL_MIDDLEWARE
+    client = APIClient()
+    url = reverse('task-list')
+    response = benchmark(client.get, url)
+    assert response.status_code == 401
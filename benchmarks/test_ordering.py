@@ -0,0 +1,39 @@
+"""
+Orden por cada campo permitido, con y sin paginación por cursor. Con el
+índice (user, campo, id) el costo de una página no depende de su posición.
+"""
+import pytest
+
+from django.urls import reverse
+
+
+pytest.importorskip('pytest_benchmark')
+
+pytestmark = pytest.mark.django_db
+
+ORDERINGS = ['-created_at', '-updated_at', 'due_date', '-priority', 'status']
+
+
+@pytest.mark.parametrize('ordering', ORDERINGS)
+def test_list_ordered(benchmark, count_queries, client, ordering):
+    url = reverse('task-list')
+    params = {'ordering': ordering}
+    count_queries(client.get, url, params)
+    response = benchmark(client.get, url, params)
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize('ordering', ORDERINGS)
+@pytest.mark.parametrize('depth', [0, 10])
+def test_cursor_page(benchmark, count_queries, client, ordering, depth):
+    """Página `depth` del listado paginado de a 50"""
+    url = reverse('task-list')
+    response = client.get(url, {'ordering': ordering, 'page_size': 50})
+    for _ in range(depth):
+        if response.data['next'] is None:
+            break
+        response = client.get(response.data['next'])
+    next_url = response.data['next'] or url
+    count_queries(client.get, next_url)
+    response = benchmark(client.get, next_url)
+    assert response.status_code == 200
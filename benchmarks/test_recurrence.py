@@ -0,0 +1,61 @@
+"""
+Usuarios con cientos de tareas recurrentes: el listado sigue leyendo solo
+las series y las ocurrencias se expanden en memoria por ventana.
+"""
+import os
+from datetime import timedelta
+
+import pytest
+
+from django.urls import reverse
+from django.utils import timezone
+
+from tasks.models import Task
+
+
+pytest.importorskip('pytest_benchmark')
+
+pytestmark = pytest.mark.django_db
+
+RECURRING_TASKS = int(os.environ.get('BENCH_RECURRING_TASKS', 300))
+RULES = [
+    'FREQ=DAILY',
+    'FREQ=WEEKLY;BYDAY=MO,WE,FR',
+    'FREQ=WEEKLY;INTERVAL=2',
+    'FREQ=MONTHLY',
+]
+
+
+@pytest.fixture
+def recurring(bench_user):
+    start = timezone.now() - timedelta(days=365)
+    Task.objects.bulk_create([
+        Task(
+            user=bench_user,
+            title=f'Recurring {index}',
+            recurrence=RULES[index % len(RULES)],
+            due_date=start + timedelta(hours=index),
+        )
+        for index in range(RECURRING_TASKS)
+    ])
+    return bench_user
+
+
+@pytest.mark.parametrize('days', [7, 31, 92])
+def test_occurrences_window(benchmark, count_queries, client, recurring, days):
+    now = timezone.now()
+    params = {
+        'start': now.isoformat(),
+        'end': (now + timedelta(days=days)).isoformat(),
+    }
+    url = reverse('task-occurrences')
+    count_queries(client.get, url, params)
+    response = benchmark(client.get, url, params)
+    assert response.status_code == 200
+
+
+def test_list_with_recurring(benchmark, count_queries, client, recurring):
+    url = reverse('task-list')
+    count_queries(client.get, url)
+    response = benchmark(client.get, url)
+    assert response.status_code == 200
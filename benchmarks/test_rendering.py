@@ -0,0 +1,73 @@
+"""
+Render de listados de 1k a 100k tareas con el JSONRenderer de DRF y con
+FastJSONRenderer (orjson), y costo de las fechas con DateTimeField y
+UTCDateTimeField. No usan la base: las tareas se arman en memoria. El pico
+de memoria de un render se guarda en `extra_info`.
+"""
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.serializers import DateTimeField
+
+from core.renderers import FastJSONRenderer
+from core.serializers import UTCDateTimeField
+from tasks.models import Tag, Task
+from tasks.serializers import TaskSerializer
+
+
+pytest.importorskip('pytest_benchmark')
+
+SIZES = [1_000, 10_000, 100_000]
+RENDERERS = {'drf': JSONRenderer, 'fast': FastJSONRenderer}
+DATETIME_FIELDS = {'drf': DateTimeField, 'utc': UTCDateTimeField}
+
+
+def build_tasks(size):
+    now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    tasks = []
+    for index in range(size):
+        task = Task(
+            id=index + 1,
+            user_id=1,
+            title=f'Task {index}',
+            description='Descripción de la tarea',
+            created_at=now + timedelta(seconds=index),
+            updated_at=now + timedelta(seconds=index, microseconds=index),
+            due_date=now + timedelta(days=index % 30),
+            completed_at=None if index % 2 else now,
+        )
+        task._prefetched_objects_cache = {'tags': Tag.objects.none()}
+        tasks.append(task)
+    return tasks
+
+
+@pytest.fixture(scope='module', params=SIZES)
+def serialized(request):
+    return TaskSerializer(build_tasks(request.param), many=True).data
+
+
+@pytest.mark.parametrize('renderer', RENDERERS)
+def test_render_list(benchmark, serialized, renderer):
+    render = RENDERERS[renderer]().render
+    tracemalloc.start()
+    output = render(serialized)
+    benchmark.extra_info['peak_bytes'] = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    benchmark.extra_info['tasks'] = len(serialized)
+    benchmark.extra_info['output_bytes'] = len(output)
+    benchmark(render, serialized)
+
+
+@pytest.mark.parametrize('field', DATETIME_FIELDS)
+def test_datetime_fields(benchmark, field):
+    """Las 4 fechas de 10k tareas"""
+    to_representation = DATETIME_FIELDS[field]().to_representation
+    values = [
+        value
+        for task in build_tasks(10_000)
+        for value in (task.created_at, task.updated_at, task.due_date, task.completed_at)
+    ]
+    benchmark(lambda: [to_representation(value) for value in values])
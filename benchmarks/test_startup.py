@@ -0,0 +1,79 @@
+"""
+Arranque de un worker como lo hace uWSGI: un proceso carga `setup.wsgi`
+(el master) y hace fork; el hijo atiende su primer request. Mide el tiempo
+hasta la primera respuesta del worker y su memoria privada (las páginas
+que dejó de compartir con el master), con y sin WSGI_PRELOAD. Corre en
+subprocesos para partir de un intérprete limpio; requiere Linux.
+"""
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+
+pytest.importorskip('pytest_benchmark')
+
+if not os.path.exists('/proc/self/smaps_rollup'):
+    pytest.skip('Startup benchmark requires Linux.', allow_module_level=True)
+
+MASTER = r'''
+import gc, json, os, time
+
+started = time.perf_counter()
+from setup.wsgi import application
+loaded = time.perf_counter() - started
+
+from django.conf import settings
+from django.test.client import RequestFactory
+
+
+def private_kb():
+    with open('/proc/self/smaps_rollup') as smaps:
+        return sum(
+            int(line.split()[1]) for line in smaps
+            if line.startswith(('Private_Clean', 'Private_Dirty'))
+        )
+
+
+read, write = os.pipe()
+if os.fork() == 0:
+    host = next((h for h in settings.ALLOWED_HOSTS if h != '*'), 'localhost')
+    environ = RequestFactory(HTTP_HOST=host.lstrip('.'))._base_environ(
+        PATH_INFO='/api/tasks/', REQUEST_METHOD='GET'
+    )
+    started = time.perf_counter()
+    chunks = application(environ, lambda status, headers: None)
+    b''.join(chunks)
+    first_request = time.perf_counter() - started
+    gc.collect()
+    os.write(write, json.dumps({
+        'load_seconds': loaded,
+        'first_request_seconds': first_request,
+        'worker_private_kb': private_kb(),
+    }).encode())
+    os._exit(0)
+os.close(write)
+os.wait()
+print(os.read(read, 4096).decode())
+'''
+
+
+def run_master(preload):
+    env = dict(
+        os.environ,
+        PYTHONPATH=os.pathsep.join(sys.path),
+        WSGI_PRELOAD=str(preload),
+    )
+    output = subprocess.run(
+        [sys.executable, '-c', MASTER],
+        env=env, check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+@pytest.mark.parametrize('preload', [False, True])
+def test_worker_startup(benchmark, preload):
+    result = benchmark.pedantic(run_master, args=(preload,), rounds=5)
+    benchmark.extra_info.update(result)
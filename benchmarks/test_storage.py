@@ -0,0 +1,80 @@
+"""
+Tamaño en disco y costo de filtrar status/priority guardados como SMALLINT
+frente a VARCHAR. Solo corre sobre Postgres: crea dos tablas temporales con
+BENCH_STORAGE_ROWS filas (por defecto 2.000.000) y el mismo índice
+compuesto, y guarda los tamaños de tabla e índice en `extra_info`.
+"""
+import os
+
+import pytest
+
+from django.db import connection
+
+
+pytest.importorskip('pytest_benchmark')
+
+pytestmark = pytest.mark.django_db
+
+BENCH_STORAGE_ROWS = int(os.environ.get('BENCH_STORAGE_ROWS', 2_000_000))
+
+# Las expresiones van en un execute con parámetros: `%%` es el módulo
+COLUMNS = {
+    'coded': ('smallint', '1 + i %% 4', '1 + i %% 3', 4, 3),
+    'text': (
+        'varchar(20)',
+        "(ARRAY['pending','in_progress','completed','cancelled'])[1 + i %% 4]",
+        "(ARRAY['low','medium','high'])[1 + i %% 3]",
+        'cancelled', 'high',
+    ),
+}
+
+
+@pytest.fixture
+def storage_table(request):
+    kind = request.param
+    column, status, priority, status_value, priority_value = COLUMNS[kind]
+    table = f'bench_storage_{kind}'
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'CREATE TEMPORARY TABLE {table} ('
+            f' id bigint PRIMARY KEY, user_id integer NOT NULL,'
+            f' status {column} NOT NULL, priority {column} NOT NULL)'
+        )
+        cursor.execute(
+            f'INSERT INTO {table} SELECT i, i %% 1000, {status}, {priority}'
+            f' FROM generate_series(1, %s) AS i',
+            [BENCH_STORAGE_ROWS],
+        )
+        cursor.execute(
+            f'CREATE INDEX ON {table} (user_id, status, id)'
+        )
+        cursor.execute(
+            f'CREATE INDEX ON {table} (user_id, priority, id)'
+        )
+        cursor.execute(f'ANALYZE {table}')
+        cursor.execute(
+            'SELECT pg_table_size(%s), pg_indexes_size(%s)', [table, table]
+        )
+        table_size, index_size = cursor.fetchone()
+    yield table, status_value, priority_value, table_size, index_size
+    with connection.cursor() as cursor:
+        cursor.execute(f'DROP TABLE {table}')
+
+
+@pytest.mark.parametrize('storage_table', ['coded', 'text'], indirect=True)
+def test_filter_status_priority(benchmark, storage_table):
+    table, status_value, priority_value, table_size, index_size = storage_table
+    benchmark.extra_info['rows'] = BENCH_STORAGE_ROWS
+    benchmark.extra_info['table_bytes'] = table_size
+    benchmark.extra_info['index_bytes'] = index_size
+
+    def run():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT count(*) FROM {table}'
+                f' WHERE user_id = %s AND status = %s AND priority = %s',
+                [7, status_value, priority_value],
+            )
+            return cursor.fetchone()[0]
+
+    assert benchmark(run) > 0
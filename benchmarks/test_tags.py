@@ -0,0 +1,88 @@
+"""
+Compara estrategias para filtrar por etiquetas. La vista usa EXISTS sobre
+la tabla intermedia; JOIN + DISTINCT y GROUP BY + HAVING son las
+alternativas habituales con el ORM.
+"""
+import random
+
+import pytest
+
+from django.db.models import Count, Exists, OuterRef
+from django.urls import reverse
+
+from tasks.models import Tag, Task
+
+
+pytest.importorskip('pytest_benchmark')
+
+pytestmark = pytest.mark.django_db
+
+TAG_NAMES = [f'tag{index}' for index in range(20)]
+FILTER = ['tag1', 'tag2', 'tag3']
+
+
+@pytest.fixture
+def tagged(bench_user):
+    """Entre 0 y 4 etiquetas al azar por tarea del usuario"""
+    rng = random.Random(0)
+    tags = Tag.for_names(bench_user, TAG_NAMES)
+    task_ids = Task.objects.filter(user=bench_user).values_list('pk', flat=True)
+    Task.tags.through.objects.bulk_create([
+        Task.tags.through(task_id=task_id, tag_id=tag.pk)
+        for task_id in task_ids
+        for tag in rng.sample(tags, rng.randint(0, 4))
+    ], batch_size=5000)
+    return bench_user
+
+
+def any_exists(user):
+    task_tags = Task.tags.through.objects.filter(
+        task_id=OuterRef('pk'), tag__name__in=FILTER
+    )
+    return list(Task.objects.filter(user=user).filter(Exists(task_tags)))
+
+
+def any_join_distinct(user):
+    return list(
+        Task.objects.filter(user=user, tags__name__in=FILTER).distinct()
+    )
+
+
+def all_exists(user):
+    queryset = Task.objects.filter(user=user)
+    for name in FILTER:
+        queryset = queryset.filter(Exists(
+            Task.tags.through.objects.filter(
+                task_id=OuterRef('pk'), tag__name=name
+            )
+        ))
+    return list(queryset)
+
+
+def all_having(user):
+    return list(
+        Task.objects.filter(user=user, tags__name__in=FILTER)
+        .annotate(matched=Count('tags'))
+        .filter(matched=len(FILTER))
+    )
+
+
+@pytest.mark.parametrize('strategy', [any_exists, any_join_distinct])
+def test_filter_any(benchmark, tagged, strategy):
+    benchmark.group = 'tags any'
+    assert len(benchmark(strategy, tagged)) == len(any_exists(tagged))
+
+
+@pytest.mark.parametrize('strategy', [all_exists, all_having])
+def test_filter_all(benchmark, tagged, strategy):
+    benchmark.group = 'tags all'
+    assert len(benchmark(strategy, tagged)) == len(all_exists(tagged))
+
+
+@pytest.mark.parametrize('match', ['any', 'all'])
+def test_list_tagged(benchmark, count_queries, client, tagged, match):
+    url = reverse('task-list')
+    params = {'tags': ','.join(FILTER), 'tags_match': match}
+    count_queries(client.get, url, params)
+    response = benchmark(client.get, url, params)
+    assert response.status_code == 200
@@ -0,0 +1,106 @@
+import pytest
+
+from django.conf import settings
+from django.urls import reverse
+
+from tasks.models import Task
+
+
+pytest.importorskip('pytest_benchmark')
+
+pytestmark = pytest.mark.django_db
+
+
+def build_chain(user, depth):
+    """Cadena de `depth` tareas, cada una hija de la anterior"""
+    root = Task.objects.create(user=user, title='Deep root')
+    parent = root
+    for index in range(depth - 1):
+        parent = Task.objects.create(
+            user=user, title=f'Deep {index}', parent=parent
+        )
+    return root
+
+
+def build_wide(user, width, fanout=50):
+    """
+    Árbol de dos niveles con `width` tareas. Las rutas se calculan a mano
+    para poder usar `bulk_create`.
+    """
+    root = Task.objects.create(user=user, title='Wide root')
+    branches = Task.objects.bulk_create([
+        Task(user=user, title=f'Branch {index}', parent=root, path=f'{root.pk}/')
+        for index in range(max(1, width // fanout))
+    ])
+    if branches[0].pk is None:
+        branches = list(root.children.order_by('pk'))
+    Task.objects.bulk_create([
+        Task(
+            user=user,
+            title=f'Leaf {index}',
+            parent=branch,
+            path=branch.build_path(),
+            status='completed' if index % 2 else 'pending',
+        )
+        for branch in branches
+        for index in range(fanout)
+    ], batch_size=5000)
+    return root
+
+
+@pytest.fixture
+def deep_tree(bench_user):
+    return build_chain(bench_user, settings.TASK_MAX_DEPTH - 1)
+
+
+@pytest.fixture(params=[1000, 10000])
+def wide_tree(request, bench_user):
+    return build_wide(bench_user, request.param)
+
+
+def test_subtree_deep(benchmark, count_queries, client, deep_tree):
+    url = reverse('task-subtree', kwargs={'pk': deep_tree.pk})
+    count_queries(client.get, url)
+    response = benchmark(client.get, url)
+    assert response.status_code == 200
+    assert len(response.data['tasks']) == settings.TASK_MAX_DEPTH - 1
+
+
+def test_subtree_wide(benchmark, count_queries, client, wide_tree):
+    url = reverse('task-subtree', kwargs={'pk': wide_tree.pk})
+    count_queries(client.get, url)
+    response = benchmark(client.get, url)
+    assert response.status_code == 200
+
+
+def test_incomplete_descendants_wide(benchmark, wide_tree):
+    def count_incomplete():
+        return wide_tree.get_descendants().exclude(status='completed').count()
+
+    assert benchmark(count_incomplete) > 0
+
+
+def test_complete_subtree_wide(benchmark, count_queries, client, wide_tree):
+    url = reverse('task-complete', kwargs={'pk': wide_tree.pk})
+
+    def complete():
+        Task.objects.filter(pk=wide_tree.pk).update(version=1)
+        return client.post(f'{url}?subtree=true')
+
+    count_queries(complete)
+    response = benchmark(complete)
+    assert response.status_code == 200
+
+
+def test_move_subtree_deep(benchmark, bench_user, deep_tree):
+    child = deep_tree.children.get()
+    roots = [Task.objects.create(user=bench_user, title='Target a'),
+             Task.objects.create(user=bench_user, title='Target b')]
+    targets = iter(roots * 1000)
+
+    def move():
+        child.refresh_from_db()
+        child.parent = next(targets)
+        child.save()
+
+    benchmark(move)
@@ -0,0 +1,76 @@
+"""
+Acceso a tareas compartidas con workspaces grandes. Se dimensiona con
+BENCH_WORKSPACE_MEMBERS y BENCH_WORKSPACE_TASKS.
+"""
+import os
+
+import pytest
+
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from tasks.models import Task, WorkspaceMembership
+from .seed import seed_workspace
+
+
+pytest.importorskip('pytest_benchmark')
+
+pytestmark = pytest.mark.django_db
+
+WORKSPACE_MEMBERS = int(os.environ.get('BENCH_WORKSPACE_MEMBERS', 2000))
+WORKSPACE_TASKS = int(os.environ.get('BENCH_WORKSPACE_TASKS', 100000))
+
+
+@pytest.fixture
+def workspace(bench_user):
+    return seed_workspace(
+        bench_user, members=WORKSPACE_MEMBERS, tasks=WORKSPACE_TASKS
+    )
+
+
+@pytest.fixture
+def member_client(workspace):
+    """Cliente de un miembro cualquiera del workspace (no el dueño)"""
+    member = WorkspaceMembership.objects.filter(
+        workspace=workspace, role='member'
+    ).select_related('user').last().user
+    client = APIClient()
+    client.force_authenticate(user=member)
+    return client
+
+
+def test_visible_count(benchmark, workspace):
+    """Condición de acceso completa sobre todas las tareas del workspace"""
+    def count():
+        return Task.objects.filter(Task.visible_to(workspace.owner)).count()
+
+    assert benchmark(count) >= WORKSPACE_TASKS
+
+
+def test_retrieve_shared_task(benchmark, count_queries, member_client,
+                              workspace):
+    task = Task.objects.filter(workspace=workspace).last()
+    url = reverse('task-detail', kwargs={'pk': task.pk})
+    count_queries(member_client.get, url)
+    response = benchmark(member_client.get, url)
+    assert response.status_code == 200
+
+
+def test_filter_shared_tasks(benchmark, count_queries, member_client,
+                             workspace):
+    url = reverse('task-list')
+    params = {'title': 'Shared task 9999'}
+    count_queries(member_client.get, url, params)
+    response = benchmark(member_client.get, url, params)
+    assert response.status_code == 200
+
+
+def test_non_member_denied(benchmark, count_queries, dataset, workspace):
+    """Un usuario fuera del workspace recibe 404 sin recorrer sus miembros"""
+    outsider = APIClient()
+    outsider.force_authenticate(user=dataset[-1])
+    task = Task.objects.filter(workspace=workspace).last()
+    url = reverse('task-detail', kwargs={'pk': task.pk})
+    count_queries(outsider.get, url)
+    response = benchmark(outsider.get, url)
+    assert response.status_code == 404
@@ -0,0 +1,34 @@
+from contextlib import contextmanager
+
+import pytest
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def format_queries(queries):
+    return '\n'.join(
+        f"{index}. {query['sql']}"
+        for index, query in enumerate(queries, start=1)
+    )
+
+
+@pytest.fixture
+def assert_num_queries():
+    """
+    Verifica que el bloque ejecute exactamente `expected` queries. Si no se
+    cumple, el error lista numeradas todas las queries ejecutadas.
+    """
+    @contextmanager
+    def check(expected):
+        with CaptureQueriesContext(connection) as context:
+            yield context
+        executed = len(context.captured_queries)
+        if executed != expected:
+            pytest.fail(
+                f'Query budget: expected {expected} queries, '
+                f'{executed} were executed:\n'
+                f'{format_queries(context.captured_queries)}',
+                pytrace=False
+            )
+    return check
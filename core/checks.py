@@ -0,0 +1,79 @@
+"""
+Checks de Django (tag `performance`) para configuraciones que degradan la
+performance en producción. Se ejecutan con `--deploy`:
+
+    python manage.py check --deploy --tag performance
+
+Todos son errores, así el comando termina con un código distinto de cero
+y el contenedor no arranca con una configuración lenta.
+"""
+from django.conf import settings
+from django.core.checks import Error, register
+
+
+TAG = 'performance'
+
+CACHED_LOADER = 'django.template.loaders.cached.Loader'
+
+
+@register(TAG, deploy=True)
+def check_debug(app_configs, **kwargs):
+    if settings.DEBUG:
+        return [Error(
+            'DEBUG is enabled.',
+            hint='Every connection keeps all executed SQL in '
+                 'connection.queries, so long-lived workers grow until '
+                 'uWSGI recycles them. Use setup.settings.prod.',
+            id='core.E001',
+        )]
+    return []
+
+
+@register(TAG, deploy=True)
+def check_persistent_connections(app_configs, **kwargs):
+    return [
+        Error(
+            f'Database "{alias}" opens a new connection for every request.',
+            hint='Set CONN_MAX_AGE (and CONN_HEALTH_CHECKS).',
+            id='core.E002',
+        )
+        for alias, database in settings.DATABASES.items()
+        # None son conexiones sin límite de vida
+        if database.get('CONN_MAX_AGE', 0) == 0
+    ]
+
+
+@register(TAG, deploy=True)
+def check_template_loaders(app_configs, **kwargs):
+    errors = []
+    for template in settings.TEMPLATES:
+        loaders = template.get('OPTIONS', {}).get('loaders')
+        if loaders is None:
+            # Sin `loaders` Django usa el cached loader
+            continue
+        if not any(
+            isinstance(loader, (list, tuple)) and loader[0] == CACHED_LOADER
+            for loader in loaders
+        ):
+            errors.append(Error(
+                'Templates are recompiled on every render.',
+                hint=f'Wrap the template loaders in {CACHED_LOADER}.',
+                id='core.E003',
+            ))
+    return errors
+
+
+@register(TAG, deploy=True)
+def check_query_logging(app_configs, **kwargs):
+    levels = {settings.LOG_LEVEL}
+    for name in ('django', 'django.db', 'django.db.backends'):
+        level = settings.LOGGING.get('loggers', {}).get(name, {}).get('level')
+        if level:
+            levels.add(level)
+    if 'DEBUG' in {str(level).upper() for level in levels}:
+        return [Error(
+            'SQL queries are logged at DEBUG level.',
+            hint='Set LOG_LEVEL to INFO or higher.',
+            id='core.E004',
+        )]
+    return []
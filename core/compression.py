@@ -0,0 +1,110 @@
+"""
+Codecs de compresión de respuestas para `CompressionMiddleware`. gzip está
+siempre disponible; brotli (`br`) y zstd solo si están instalados los
+paquetes `brotli` y `zstandard`. Cada codec comprime un body completo o un
+stream, haciendo flush después de cada chunk para no demorar su envío.
+"""
+import zlib
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+
+# Tipos que se comprimen. No incluye text/html para no exponer los tokens
+# CSRF del admin a ataques tipo BREACH, ni text/event-stream (SSE).
+COMPRESSIBLE_TYPES = (
+    'application/json',
+    'text/plain',
+    'text/csv',
+)
+
+
+class Gzip:
+    name = 'gzip'
+
+    @staticmethod
+    def compressor(level):
+        return zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data, level):
+        compressor = self.compressor(level)
+        return compressor.compress(data) + compressor.flush()
+
+    def stream(self, chunks, level):
+        compressor = self.compressor(level)
+        for chunk in chunks:
+            yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        yield compressor.flush()
+
+
+class Brotli:
+    name = 'br'
+
+    def compress(self, data, level):
+        return brotli.compress(data, quality=level)
+
+    def stream(self, chunks, level):
+        compressor = brotli.Compressor(quality=level)
+        for chunk in chunks:
+            yield compressor.process(chunk) + compressor.flush()
+        yield compressor.finish()
+
+
+class Zstd:
+    name = 'zstd'
+
+    def compress(self, data, level):
+        return zstandard.ZstdCompressor(level=level).compress(data)
+
+    def stream(self, chunks, level):
+        compressor = zstandard.ZstdCompressor(level=level).compressobj()
+        for chunk in chunks:
+            yield compressor.compress(chunk) + compressor.flush(
+                zstandard.COMPRESSOBJ_FLUSH_BLOCK
+            )
+        yield compressor.flush()
+
+
+# Disponibles, en orden de preferencia del servidor
+CODECS = {
+    codec.name: codec
+    for codec, module in (
+        (Zstd(), zstandard),
+        (Brotli(), brotli),
+        (Gzip(), zlib),
+    )
+    if module is not None
+}
+
+
+def negotiate(accept_encoding):
+    """
+    Codec a usar según el header `Accept-Encoding`, o None. Entre los que
+    acepta el cliente (q > 0) se elige por preferencia del servidor.
+    """
+    accepted = {}
+    for item in accept_encoding.split(','):
+        name, _, params = item.partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name] = quality
+    wildcard = accepted.get('*', 0.0)
+    for name, codec in CODECS.items():
+        if accepted.get(name, wildcard) > 0:
+            return codec
+    return None
@@ -0,0 +1,78 @@
+"""
+Chequeos de `/healthz` y `/readyz` y el warm-up de cada worker.
+"""
+from django.conf import settings
+from django.db import DatabaseError, connections
+from django.db.migrations.executor import MigrationExecutor
+from django.urls import get_resolver
+from django.utils.module_loading import import_string
+
+
+# Una vez aplicadas, las migraciones no se vuelven a verificar en el worker
+_migrations_applied = False
+
+
+def check_database():
+    """Abre (o reusa) la conexión de cada base y ejecuta un SELECT 1"""
+    for connection in connections.all():
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+
+
+def check_migrations():
+    """Indica si no quedan migraciones por aplicar en la base default"""
+    global _migrations_applied
+    if not _migrations_applied:
+        executor = MigrationExecutor(connections['default'])
+        plan = executor.migration_plan(executor.loader.graph.leaf_nodes())
+        _migrations_applied = not plan
+    return _migrations_applied
+
+
+def readiness():
+    """
+    Estado de cada chequeo de `/readyz`: `database` y `migrations`.
+    """
+    checks = {'database': False, 'migrations': False}
+    try:
+        check_database()
+        checks['database'] = True
+        checks['migrations'] = check_migrations()
+    except DatabaseError:
+        pass
+    return checks
+
+
+def warm_up():
+    """
+    Deja listo un worker antes de que reciba tráfico: resuelve las rutas de
+    `WARM_UP_PATHS`, arma los campos de los serializers de
+    `WARM_UP_SERIALIZERS` y abre las conexiones a la base. Si la base no
+    responde el worker arranca igual y se conecta en el primer request.
+    """
+    resolver = get_resolver()
+    for path in settings.WARM_UP_PATHS:
+        resolver.resolve(path)
+    for serializer in settings.WARM_UP_SERIALIZERS:
+        import_string(serializer)().fields
+    try:
+        check_database()
+    except DatabaseError:
+        pass
+
+
+def register_warm_up():
+    """
+    Ejecuta `warm_up` en cada worker de uWSGI después del fork. Con
+    `lazy-apps` la app ya se carga en el worker, así que se ejecuta en el
+    momento. Fuera de uWSGI no hace nada.
+    """
+    try:
+        import uwsgi
+        from uwsgidecorators import postfork
+    except ImportError:
+        return
+    if uwsgi.worker_id() > 0:
+        warm_up()
+    else:
+        postfork(warm_up)
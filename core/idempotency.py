@@ -0,0 +1,135 @@
+import hashlib
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import IdempotencyKey
+
+
+HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 255
+
+
+def _fingerprint(request):
+    digest = hashlib.sha256()
+    digest.update(request.method.encode())
+    digest.update(request.get_full_path().encode())
+    digest.update(request.body)
+    return digest.hexdigest()
+
+
+def _error(detail, status_code):
+    return Response({'detail': detail}, status=status_code)
+
+
+def idempotent(view_method):
+    """
+    Soporte para el header `Idempotency-Key` en acciones de escritura.
+
+    La primera respuesta para cada (usuario, clave) se guarda en la tabla
+    `idempotency_keys` durante `IDEMPOTENCY_TTL` segundos; los reintentos
+    se responden desde ahí sin volver a ejecutar la vista. La clave se
+    reclama con un INSERT sobre una restricción única antes de ejecutar la
+    vista, así entre requests concurrentes solo uno la ejecuta. Reusar la
+    clave con otro request responde 422, y un reintento mientras el primero
+    sigue en curso responde 409.
+    """
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if not key:
+            return view_method(self, request, *args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return _error(
+                f'{HEADER} must be at most {MAX_KEY_LENGTH} characters.',
+                status.HTTP_400_BAD_REQUEST
+            )
+
+        fingerprint = _fingerprint(request)
+        record, stored = claim(
+            request.user, hashlib.sha256(key.encode()).hexdigest(), fingerprint
+        )
+        if record is None:
+            return replay(stored, fingerprint)
+
+        try:
+            response = view_method(self, request, *args, **kwargs)
+        except Exception:
+            record.delete()
+            raise
+
+        if response.status_code >= 500:
+            record.delete()
+        else:
+            IdempotencyKey.objects.filter(pk=record.pk).update(
+                status=response.status_code,
+                data=response.data,
+                expires_at=timezone.now() + timedelta(
+                    seconds=settings.IDEMPOTENCY_TTL
+                ),
+            )
+        return response
+
+    return wrapper
+
+
+def claim(user, key, fingerprint):
+    """
+    Reclama la clave para este request. Devuelve (registro, None) si le
+    corresponde ejecutar la vista, o (None, registro guardado) si otro
+    request ya la reclamó.
+    """
+    now = timezone.now()
+    lock_expires_at = now + timedelta(seconds=settings.IDEMPOTENCY_LOCK_TTL)
+    stored = IdempotencyKey.objects.filter(user=user, key=key).first()
+    if stored is None:
+        try:
+            with transaction.atomic():
+                record = IdempotencyKey.objects.create(
+                    user=user,
+                    key=key,
+                    fingerprint=fingerprint,
+                    expires_at=lock_expires_at,
+                )
+            return record, None
+        except IntegrityError:
+            # Otro request la reclamó entre la lectura y el INSERT
+            return claim(user, key, fingerprint)
+    if stored.expires_at > now:
+        return None, stored
+    # Venció: se toma solo si ningún otro request la tomó antes
+    taken = IdempotencyKey.objects.filter(
+        pk=stored.pk, expires_at=stored.expires_at
+    ).update(
+        fingerprint=fingerprint,
+        status=None,
+        data=None,
+        expires_at=lock_expires_at,
+    )
+    if not taken:
+        return claim(user, key, fingerprint)
+    stored.fingerprint = fingerprint
+    stored.status = None
+    stored.expires_at = lock_expires_at
+    return stored, None
+
+
+def replay(stored, fingerprint):
+    if stored.fingerprint != fingerprint:
+        return _error(
+            f'{HEADER} was already used for a different request.',
+            status.HTTP_422_UNPROCESSABLE_ENTITY
+        )
+    if stored.status is None:
+        return _error(
+            'A request with this Idempotency-Key is still in progress.',
+            status.HTTP_409_CONFLICT
+        )
+    response = Response(stored.data, status=stored.status)
+    response['Idempotent-Replayed'] = 'true'
+    return response
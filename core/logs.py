@@ -0,0 +1,163 @@
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime, timezone
+
+from django.conf import settings
+
+
+request_context = ContextVar('request_context', default={})
+
+CONTEXT_FIELDS = ('request_id', 'user_id', 'view')
+
+# Atributos propios de LogRecord que no se copian como campos extra
+RESERVED_ATTRS = frozenset(vars(
+    logging.LogRecord('', 0, '', 0, '', None, None)
+)) | {'message', 'asctime'} | set(CONTEXT_FIELDS)
+
+slow_query_logger = logging.getLogger('core.db.slow_queries')
+
+
+def sampled(rate):
+    return rate >= 1 or random.random() < rate
+
+
+class RequestContextFilter(logging.Filter):
+    """
+    Agrega a cada registro el request id, usuario y vista del request en
+    curso. Corre en el hilo que loguea, antes de encolar el registro.
+    """
+    def filter(self, record):
+        context = request_context.get()
+        for field in CONTEXT_FIELDS:
+            if not hasattr(record, field):
+                setattr(record, field, context.get(field))
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Una línea JSON por registro, con los campos extra pasados en `extra`.
+    """
+    def format(self, record):
+        payload = {
+            'timestamp': datetime.fromtimestamp(
+                record.created, tz=timezone.utc
+            ).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for field in CONTEXT_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                payload[field] = value
+        for key, value in record.__dict__.items():
+            if key not in RESERVED_ATTRS and not key.startswith('_'):
+                payload[key] = value
+        if record.exc_info:
+            payload['exception'] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str, separators=(',', ':'))
+
+
+class QueueStreamHandler(logging.handlers.QueueHandler):
+    """
+    Handler no bloqueante: encola el registro y un hilo aparte lo formatea
+    y escribe en el stream. Si la cola se llena se descartan registros en
+    lugar de frenar el request. El hilo se inicia en cada proceso con el
+    primer registro, así funciona igual cuando uWSGI hace fork de los
+    workers (uWSGI no corre los hooks de `os.register_at_fork`).
+    """
+    def __init__(self, stream=None, maxsize=10000):
+        super().__init__(queue.Queue(maxsize=maxsize))
+        self.maxsize = maxsize
+        self.target = logging.StreamHandler(stream or sys.stderr)
+        self.dropped = 0
+        self.listener = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+
+    def ensure_started(self):
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            # La cola heredada del master puede tener los locks tomados y
+            # registros que ya escribe el hilo del master
+            self.queue = queue.Queue(maxsize=self.maxsize)
+            self.listener = logging.handlers.QueueListener(
+                self.queue, self.target, respect_handler_level=False
+            )
+            self.listener.start()
+            self._pid = os.getpid()
+
+    def stop(self):
+        """Detiene el hilo; no se vuelve a iniciar en este proceso"""
+        with self._start_lock:
+            if self.listener is not None and self._pid == os.getpid():
+                self.listener.stop()
+            self.listener = None
+            self._pid = os.getpid()
+
+    def setFormatter(self, fmt):
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record):
+        # El formateo queda a cargo del hilo del listener
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def emit(self, record):
+        self.ensure_started()
+        super().emit(record)
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self):
+        self.stop()
+        super().close()
+
+
+class SlowQueryLogger:
+    """
+    `execute_wrapper` que loguea las queries que superan
+    `LOG_SLOW_QUERY_MS`, muestreadas con `LOG_SLOW_QUERY_SAMPLE_RATE`.
+    """
+    def __init__(self, threshold_ms=None, sample_rate=None):
+        if threshold_ms is None:
+            threshold_ms = settings.LOG_SLOW_QUERY_MS
+        if sample_rate is None:
+            sample_rate = settings.LOG_SLOW_QUERY_SAMPLE_RATE
+        self.threshold = threshold_ms / 1000
+        self.sample_rate = sample_rate
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            if duration >= self.threshold and sampled(self.sample_rate):
+                slow_query_logger.warning(
+                    'slow query',
+                    extra={
+                        'duration_ms': round(duration * 1000, 2),
+                        'sql': sql[:settings.LOG_SLOW_QUERY_MAX_SQL],
+                        'many': many,
+                    }
+                )
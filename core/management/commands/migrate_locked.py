@@ -0,0 +1,60 @@
+import time
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+# Clave del advisory lock de Postgres que toman las migraciones
+MIGRATION_LOCK_ID = 72_547_001
+
+
+class Command(BaseCommand):
+    help = (
+        'Aplica las migraciones con un advisory lock de Postgres, para que '
+        'si varias réplicas arrancan a la vez solo una migre y el resto '
+        'espere y encuentre el esquema al día.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+        parser.add_argument(
+            '--poll-interval', type=float, default=1,
+            help='Segundos entre intentos de tomar el lock',
+        )
+
+    def handle(self, *args, database, poll_interval, verbosity, **options):
+        connection = connections[database]
+        self.acquire_lock(connection, poll_interval, verbosity)
+        try:
+            call_command('migrate', database=database, verbosity=verbosity)
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SELECT pg_advisory_unlock(%s)', [MIGRATION_LOCK_ID]
+                )
+
+    def acquire_lock(self, connection, poll_interval, verbosity):
+        """
+        Espera el lock con pg_try_advisory_lock en lugar de
+        pg_advisory_lock. La espera de pg_advisory_lock es una transacción
+        abierta, y CREATE INDEX CONCURRENTLY de la réplica que migra espera
+        a que terminen todas las transacciones: se bloquearían entre sí.
+        Entre intentos no queda ninguna transacción abierta.
+        """
+        if connection.in_atomic_block:
+            raise CommandError(
+                'migrate_locked cannot run inside a transaction.'
+            )
+        waiting = False
+        while True:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SELECT pg_try_advisory_lock(%s)', [MIGRATION_LOCK_ID]
+                )
+                if cursor.fetchone()[0]:
+                    return
+            if verbosity and not waiting:
+                self.stdout.write('Waiting for the migration lock...')
+            waiting = True
+            time.sleep(poll_interval)
@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.models import IdempotencyKey, ThrottleBucket
+
+
+class Command(BaseCommand):
+    help = (
+        'Borra las respuestas vencidas de Idempotency-Key y los buckets de '
+        'throttling que ya se recargaron por completo. Conviene '
+        'programarlo (por ejemplo cada hora con cron).'
+    )
+
+    def handle(self, *args, verbosity, **options):
+        deleted, _ = IdempotencyKey.objects.filter(
+            expires_at__lte=timezone.now()
+        ).delete()
+        if verbosity:
+            self.stdout.write(f'{deleted} idempotency keys deleted.')
+        deleted, _ = ThrottleBucket.objects.filter(
+            expires_at__lte=time.time()
+        ).delete()
+        if verbosity:
+            self.stdout.write(f'{deleted} throttle buckets deleted.')
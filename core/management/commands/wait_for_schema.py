@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from core import health
+
+
+class Command(BaseCommand):
+    help = (
+        'Espera a que la base responda y tenga todas las migraciones '
+        'aplicadas. No migra: eso lo hace `migrate_locked`.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--timeout', type=float, default=300,
+            help='Segundos máximos de espera',
+        )
+        parser.add_argument(
+            '--interval', type=float, default=1,
+            help='Segundos entre intentos',
+        )
+
+    def handle(self, *args, timeout, interval, verbosity, **options):
+        deadline = time.monotonic() + timeout
+        while True:
+            checks = health.readiness()
+            if all(checks.values()):
+                if verbosity:
+                    self.stdout.write('Schema is up to date.')
+                return
+            if time.monotonic() >= deadline:
+                pending = ', '.join(name for name, ok in checks.items() if not ok)
+                raise CommandError(f'Timed out waiting for: {pending}.')
+            # Si la base se cayó, la próxima vuelta abre una conexión nueva
+            connections.close_all()
+            time.sleep(interval)
@@ -0,0 +1,358 @@
+import atexit
+import fcntl
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+_current = ContextVar('request_metrics', default=None)
+
+# Archivos de METRICS_DIR: uno por proceso (pid y hora de inicio en ns) y
+# el agregado de los procesos que ya terminaron
+WORKER_FILE = re.compile(r'^metrics-(\d+)-(\d+)\.json$')
+AGGREGATE_FILE = 'metrics-aggregate.json'
+LOCK_FILE = 'metrics.lock'
+
+
+class RequestMetrics:
+    """
+    Tiempos acumulados durante un request: queries SQL y serialización.
+    """
+    def __init__(self):
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.timings = defaultdict(float)
+
+    def query_wrapper(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_seconds += time.perf_counter() - start
+            self.db_queries += 1
+
+    @contextmanager
+    def activate(self):
+        token = _current.set(self)
+        try:
+            yield self
+        finally:
+            _current.reset(token)
+
+
+def current():
+    return _current.get()
+
+
+@contextmanager
+def timed(name):
+    """
+    Suma el tiempo del bloque a la métrica `name` del request en curso.
+    """
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.timings[name] += time.perf_counter() - start
+
+
+def _new_series():
+    return {
+        'count': 0,
+        'latency_sum': 0.0,
+        'latency_buckets': [0] * len(LATENCY_BUCKETS),
+        'db_queries': 0,
+        'db_seconds': 0.0,
+        'serializer_seconds': 0.0,
+        'response_bytes': 0,
+    }
+
+
+def _merge(target, series):
+    for key, value in series.items():
+        if key == 'latency_buckets':
+            target[key] = [a + b for a, b in zip(target[key], value)]
+        else:
+            target[key] += value
+
+
+class MetricsStore:
+    """
+    Agregado de métricas por (vista, método, status).
+
+    Cada proceso acumula en memoria y vuelca periódicamente su estado a
+    `METRICS_DIR/metrics-<pid>-<inicio>.json`, y una última vez al
+    terminar; `collect` suma los archivos de todos los workers de uWSGI.
+    Los archivos de procesos que ya terminaron se suman a
+    `metrics-aggregate.json` y se borran, así los contadores no bajan
+    cuando uWSGI recicla un worker. Sin `METRICS_DIR` solo se reporta el
+    proceso actual.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._series = defaultdict(_new_series)
+        self._last_flush = 0.0
+        self._pid = None
+        self._path = None
+
+    def observe(self, view, method, status, duration, metrics, size):
+        with self._lock:
+            series = self._series[(view, method, str(status))]
+            series['count'] += 1
+            series['latency_sum'] += duration
+            for index, bound in enumerate(LATENCY_BUCKETS):
+                if duration <= bound:
+                    series['latency_buckets'][index] += 1
+            series['db_queries'] += metrics.db_queries
+            series['db_seconds'] += metrics.db_seconds
+            series['serializer_seconds'] += metrics.timings['serializer']
+            series['response_bytes'] += size
+        self.maybe_flush()
+
+    def snapshot(self):
+        with self._lock:
+            return [
+                [view, method, status, dict(series)]
+                for (view, method, status), series in self._series.items()
+            ]
+
+    def maybe_flush(self):
+        if not settings.METRICS_DIR:
+            return
+        now = time.monotonic()
+        if now - self._last_flush < settings.METRICS_FLUSH_INTERVAL:
+            return
+        self.flush()
+
+    def path(self, directory):
+        """
+        Archivo de este proceso. Incluye la hora de inicio: si uWSGI
+        reutiliza el pid de un worker muerto, el nuevo no pisa su archivo.
+        """
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._path = f'metrics-{self._pid}-{time.time_ns()}.json'
+            register_exit_flush(self.flush)
+        return os.path.join(directory, self._path)
+
+    def flush(self):
+        directory = settings.METRICS_DIR
+        if not directory:
+            return
+        self._last_flush = time.monotonic()
+        os.makedirs(directory, exist_ok=True)
+        write_json(self.path(directory), self.snapshot())
+
+    def collect(self):
+        directory = settings.METRICS_DIR
+        if not directory:
+            return self.snapshot()
+        self.flush()
+        merged = defaultdict(_new_series)
+        with directory_lock(directory):
+            aggregate = self.merge_finished(directory)
+            for view, method, status, series in aggregate['rows']:
+                _merge(merged[(view, method, status)], series)
+            for name in running_files(directory, own=os.path.basename(self._path)):
+                rows = read_json(os.path.join(directory, name))
+                for view, method, status, series in rows or []:
+                    _merge(merged[(view, method, status)], series)
+        return [
+            [view, method, status, series]
+            for (view, method, status), series in merged.items()
+        ]
+
+    def merge_finished(self, directory):
+        """
+        Suma al agregado los archivos de procesos que ya terminaron y los
+        borra. El agregado guarda qué archivos incluye, así un archivo que
+        no se llegó a borrar no se cuenta dos veces.
+        """
+        path = os.path.join(directory, AGGREGATE_FILE)
+        aggregate = read_json(path) or {'merged': [], 'rows': []}
+        names = worker_files(directory)
+        running = set(running_files(directory, own=os.path.basename(self._path)))
+        finished = [name for name in names if name not in running]
+        if not finished:
+            return aggregate
+        merged = defaultdict(_new_series)
+        for view, method, status, series in aggregate['rows']:
+            _merge(merged[(view, method, status)], series)
+        included = set(aggregate['merged'])
+        for name in finished:
+            if name in included:
+                continue
+            for view, method, status, series in read_json(
+                os.path.join(directory, name)
+            ) or []:
+                _merge(merged[(view, method, status)], series)
+        aggregate = {
+            'merged': sorted(set(finished)),
+            'rows': [
+                [view, method, status, series]
+                for (view, method, status), series in merged.items()
+            ],
+        }
+        write_json(path, aggregate)
+        for name in finished:
+            try:
+                os.remove(os.path.join(directory, name))
+            except FileNotFoundError:
+                pass
+        return aggregate
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+
+def register_exit_flush(flush):
+    """
+    Vuelca las métricas al terminar el proceso, para no perder las de los
+    últimos segundos. uWSGI no corre los hooks de atexit en los workers
+    salvo que se lo configure, pero sí `uwsgi.atexit`.
+    """
+    try:
+        import uwsgi
+    except ImportError:
+        atexit.register(flush)
+        return
+    previous = getattr(uwsgi, 'atexit', None)
+
+    def flush_and_chain():
+        flush()
+        if previous is not None:
+            previous()
+
+    uwsgi.atexit = flush_and_chain
+
+
+def pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def worker_files(directory):
+    return [name for name in os.listdir(directory) if WORKER_FILE.match(name)]
+
+
+def running_files(directory, own=None):
+    """
+    Archivos de procesos vivos: por cada pid vivo, el de inicio más
+    reciente (los anteriores son de workers que tuvieron ese pid antes).
+    """
+    latest = {}
+    for name in worker_files(directory):
+        pid, started = map(int, WORKER_FILE.match(name).groups())
+        if pid not in latest or started > latest[pid][0]:
+            latest[pid] = (started, name)
+    running = [
+        name for pid, (_, name) in latest.items()
+        if pid == os.getpid() or pid_alive(pid)
+    ]
+    if own and own not in running:
+        running.append(own)
+    return running
+
+
+@contextmanager
+def directory_lock(directory):
+    """Lock entre procesos para actualizar el agregado"""
+    with open(os.path.join(directory, LOCK_FILE), 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def read_json(path):
+    try:
+        with open(path) as source:
+            return json.load(source)
+    except (OSError, ValueError):
+        return None
+
+
+def write_json(path, data):
+    """Escribe `data` de forma atómica, con un archivo temporal y rename"""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    with os.fdopen(fd, 'w') as tmp:
+        json.dump(data, tmp)
+    os.replace(tmp_path, path)
+
+
+store = MetricsStore()
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"')
+
+
+def render_prometheus(rows):
+    counters = (
+        ('http_db_queries_total', 'db_queries', 'SQL queries executed.'),
+        ('http_db_seconds_total', 'db_seconds', 'Time spent in SQL queries.'),
+        (
+            'http_serializer_seconds_total',
+            'serializer_seconds',
+            'Time spent serializing responses.'
+        ),
+        (
+            'http_response_bytes_total',
+            'response_bytes',
+            'Response body size.'
+        ),
+    )
+    rows = sorted(rows, key=lambda row: row[:3])
+    lines = [
+        '# HELP http_request_duration_seconds Request latency per view.',
+        '# TYPE http_request_duration_seconds histogram',
+    ]
+    for view, method, status, series in rows:
+        labels = (
+            f'view="{_label(view)}",method="{method}",status="{status}"'
+        )
+        for bound, value in zip(LATENCY_BUCKETS, series['latency_buckets']):
+            lines.append(
+                f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {value}'
+            )
+        lines.append(
+            f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {series["count"]}'
+        )
+        lines.append(
+            f'http_request_duration_seconds_sum{{{labels}}} {series["latency_sum"]}'
+        )
+        lines.append(
+            f'http_request_duration_seconds_count{{{labels}}} {series["count"]}'
+        )
+    for name, key, help_text in counters:
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} counter')
+        for view, method, status, series in rows:
+            labels = (
+                f'view="{_label(view)}",method="{method}",status="{status}"'
+            )
+            lines.append(f'{name}{{{labels}}} {series[key]}')
+    return '\n'.join(lines) + '\n'
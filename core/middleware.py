@@ -0,0 +1,355 @@
+import cProfile
+import logging
+import os
+import time
+import uuid
+
+from django.conf import settings
+from django.core.handlers.exception import convert_exception_to_response
+from django.db import connection
+from django.http import JsonResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.functional import empty
+from django.utils.module_loading import import_string
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from . import compression, logs, metrics, profiling
+
+
+class ProfilingMiddleware:
+    """
+    Profiling opcional de un request con cProfile, pedido con el header
+    `X-Profile: 1` o `?profile=1`. Solo para usuarios staff: el token JWT
+    se valida acá, únicamente cuando se pide el profiling. El resultado se
+    guarda en `PROFILING_DIR/request-<profile id>.prof`, con un id
+    aleatorio (el request id lo puede elegir el cliente con X-Request-ID),
+    y la respuesta lo indica en `X-Profile-Id`. El log del profiling
+    relaciona ambos ids.
+
+    Con `PROFILING_SAMPLER` además registra los hilos que atienden
+    requests para el profiler por muestreo (ver core.profiling).
+    """
+    logger = logging.getLogger('core.profiling')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if settings.PROFILING_SAMPLER:
+            profiling.sampler.ensure_started()
+            with profiling.sampler.track():
+                return self.handle(request)
+        return self.handle(request)
+
+    def handle(self, request):
+        if not self.requested(request) or not self.allowed(request):
+            return self.get_response(request)
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.disable()
+
+        profile_id = uuid.uuid4().hex
+        os.makedirs(settings.PROFILING_DIR, exist_ok=True)
+        path = os.path.join(settings.PROFILING_DIR, f'request-{profile_id}.prof')
+        profiler.dump_stats(path)
+        # El request id lo agrega RequestContextFilter
+        self.logger.info(
+            'request profiled',
+            extra={'profile': path, 'profile_id': profile_id}
+        )
+        response['X-Profile-Id'] = profile_id
+        return response
+
+    @staticmethod
+    def requested(request):
+        return (
+            request.headers.get('X-Profile') == '1'
+            or request.GET.get('profile') == '1'
+        )
+
+    @staticmethod
+    def allowed(request):
+        try:
+            result = JWTAuthentication().authenticate(request)
+        except AuthenticationFailed:
+            return False
+        return result is not None and result[0].is_staff
+
+
+class MetricsMiddleware:
+    """
+    Registra por vista la latencia, cantidad y tiempo de queries SQL,
+    tiempo de serialización y tamaño de la respuesta. Opcionalmente
+    expone los mismos datos en el header `Server-Timing`.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request_metrics = metrics.RequestMetrics()
+        start = time.perf_counter()
+        with request_metrics.activate():
+            with connection.execute_wrapper(request_metrics.query_wrapper):
+                response = self.get_response(request)
+        duration = time.perf_counter() - start
+
+        match = request.resolver_match
+        view = match.view_name if match else '<unresolved>'
+        size = 0 if response.streaming else len(response.content)
+        metrics.store.observe(
+            view,
+            request.method,
+            response.status_code,
+            duration,
+            request_metrics,
+            size
+        )
+        if settings.METRICS_SERVER_TIMING:
+            response['Server-Timing'] = self.server_timing(
+                duration, request_metrics
+            )
+        return response
+
+    @staticmethod
+    def server_timing(duration, request_metrics):
+        serializer = request_metrics.timings['serializer']
+        return ', '.join([
+            f'total;dur={duration * 1000:.1f}',
+            f'db;dur={request_metrics.db_seconds * 1000:.1f}'
+            f';desc="{request_metrics.db_queries} queries"',
+            f'serializer;dur={serializer * 1000:.1f}',
+        ])
+
+
+class RequestLogMiddleware:
+    """
+    Log estructurado de cada request con request id, usuario, vista,
+    status y duración. Los requests lentos o con error se loguean siempre;
+    el resto se muestrea con `LOG_REQUEST_SAMPLE_RATE`.
+    """
+    logger = logging.getLogger('core.requests')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request_id = (
+            request.headers.get('X-Request-ID') or uuid.uuid4().hex
+        )[:64]
+        context = {'request_id': request_id}
+        token = logs.request_context.set(context)
+        start = time.perf_counter()
+        try:
+            with connection.execute_wrapper(logs.SlowQueryLogger()):
+                response = self.get_response(request)
+            duration_ms = (time.perf_counter() - start) * 1000
+            context['user_id'] = self.user_id(request)
+            self.log(request, response, duration_ms)
+        finally:
+            logs.request_context.reset(token)
+        response['X-Request-ID'] = request_id
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        logs.request_context.get()['view'] = request.resolver_match.view_name
+
+    @staticmethod
+    def user_id(request):
+        user = request.__dict__.get('user')
+        # No forzar la carga del usuario desde la sesión solo para el log
+        if getattr(user, '_wrapped', None) is empty:
+            return None
+        return getattr(user, 'pk', None)
+
+    def log(self, request, response, duration_ms):
+        slow = duration_ms >= settings.LOG_SLOW_REQUEST_MS
+        failed = response.status_code >= 500
+        if not (slow or failed) and not logs.sampled(
+            settings.LOG_REQUEST_SAMPLE_RATE
+        ):
+            return
+        level = logging.WARNING if slow or failed else logging.INFO
+        self.logger.log(level, 'slow request' if slow else 'request', extra={
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'duration_ms': round(duration_ms, 2),
+            'slow': slow,
+        })
+
+
+class CompressionMiddleware:
+    """
+    Comprime las respuestas JSON y de texto con el mejor codec que acepta
+    el cliente (zstd, br o gzip, según lo instalado) y el nivel de
+    `COMPRESSION_LEVELS`. Las respuestas de menos de
+    `COMPRESSION_MIN_SIZE` bytes se envían sin comprimir. Las respuestas
+    streaming se comprimen chunk a chunk.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if not self.compressible(response):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        codec = compression.negotiate(request.headers.get('Accept-Encoding', ''))
+        if codec is None:
+            return response
+        level = settings.COMPRESSION_LEVELS[codec.name]
+
+        if response.streaming:
+            response.streaming_content = codec.stream(
+                response.streaming_content, level
+            )
+            response.headers.pop('Content-Length', None)
+        else:
+            compressed = codec.compress(response.content, level)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = codec.name
+        return response
+
+    @staticmethod
+    def compressible(response):
+        if response.has_header('Content-Encoding'):
+            return False
+        if response.streaming and response.is_async:
+            return False
+        content_type = response.get('Content-Type', '').partition(';')[0]
+        if content_type.strip() not in compression.COMPRESSIBLE_TYPES:
+            return False
+        return (
+            response.streaming
+            or len(response.content) >= settings.COMPRESSION_MIN_SIZE
+        )
+
+
+class LoadSheddingMiddleware:
+    """
+    Rechaza con 503 y `Retry-After` cuando el servidor está saturado, para
+    que la latencia de los requests aceptados se mantenga acotada:
+
+    - si el request esperó en cola más de `LOAD_SHEDDING_MAX_QUEUE_MS`
+      (según el header `X-Request-Start` que agrega nginx), o
+    - si la cola de conexiones de uWSGI supera `LOAD_SHEDDING_MAX_BACKLOG`.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+        try:
+            import uwsgi
+        except ImportError:
+            uwsgi = None
+        self.uwsgi = uwsgi
+
+    def __call__(self, request):
+        if (
+            settings.LOAD_SHEDDING_ENABLED
+            and not request.path.startswith(
+                tuple(settings.LOAD_SHEDDING_EXEMPT_PATHS)
+            )
+            and self.overloaded(request)
+        ):
+            response = JsonResponse(
+                {'detail': 'Service overloaded, retry later.'},
+                status=503
+            )
+            response['Retry-After'] = str(settings.LOAD_SHEDDING_RETRY_AFTER)
+            return response
+        return self.get_response(request)
+
+    def overloaded(self, request):
+        queue_ms = self.queue_time_ms(request)
+        if queue_ms is not None and queue_ms > settings.LOAD_SHEDDING_MAX_QUEUE_MS:
+            return True
+        if self.uwsgi is not None:
+            return self.uwsgi.listen_queue() > settings.LOAD_SHEDDING_MAX_BACKLOG
+        return False
+
+    @staticmethod
+    def queue_time_ms(request):
+        header = request.headers.get('X-Request-Start', '')
+        if header.startswith('t='):
+            header = header[2:]
+        try:
+            started = float(header)
+        except ValueError:
+            return None
+        return (time.time() - started) * 1000
+
+
+class AdminMiddleware:
+    """
+    Corre los middleware de `ADMIN_MIDDLEWARE` (sesión, CSRF, usuario de
+    sesión, mensajes, clickjacking) solo en los paths de
+    `ADMIN_MIDDLEWARE_PATHS`. La API autentica con JWT y no los necesita.
+
+    Arma la cadena igual que el handler de Django, y como el handler solo
+    llama a `process_view`, `process_exception` y
+    `process_template_response` de los middleware de `MIDDLEWARE`, los
+    reenvía a los de la cadena.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.paths = tuple(settings.ADMIN_MIDDLEWARE_PATHS)
+        self.view_middleware = []
+        self.template_response_middleware = []
+        self.exception_middleware = []
+
+        handler = convert_exception_to_response(get_response)
+        for middleware_path in reversed(settings.ADMIN_MIDDLEWARE):
+            middleware = import_string(middleware_path)(handler)
+            if hasattr(middleware, 'process_view'):
+                self.view_middleware.insert(0, middleware.process_view)
+            if hasattr(middleware, 'process_template_response'):
+                self.template_response_middleware.append(
+                    middleware.process_template_response
+                )
+            if hasattr(middleware, 'process_exception'):
+                self.exception_middleware.append(middleware.process_exception)
+            handler = convert_exception_to_response(middleware)
+        self.admin_chain = handler
+
+    def applies(self, request):
+        return request.path_info.startswith(self.paths)
+
+    def __call__(self, request):
+        if self.applies(request):
+            return self.admin_chain(request)
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not self.applies(request):
+            return None
+        for method in self.view_middleware:
+            response = method(request, view_func, view_args, view_kwargs)
+            if response is not None:
+                return response
+        return None
+
+    def process_template_response(self, request, response):
+        if self.applies(request):
+            for method in self.template_response_middleware:
+                response = method(request, response)
+        return response
+
+    def process_exception(self, request, exception):
+        if not self.applies(request):
+            return None
+        for method in self.exception_middleware:
+            response = method(request, exception)
+            if response is not None:
+                return response
+        return None
@@ -0,0 +1,26 @@
+# Generated by Django 5.0 on 2026-10-18 23:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ThrottleBucket',
+            fields=[
+                ('key', models.CharField(max_length=200, primary_key=True, serialize=False)),
+                ('tokens', models.FloatField()),
+                ('granted', models.BooleanField()),
+                ('updated_at', models.FloatField()),
+                ('expires_at', models.FloatField(db_index=True)),
+            ],
+            options={
+                'db_table': 'throttle_buckets',
+            },
+        ),
+    ]
@@ -0,0 +1,54 @@
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+
+
+class IdempotencyKey(models.Model):
+    """
+    Respuesta guardada para un (usuario, Idempotency-Key). La restricción
+    única hace que solo uno de varios requests concurrentes con la misma
+    clave la reclame (ver core.idempotency). Mientras el request está en
+    curso `status` es NULL.
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    key = models.CharField(max_length=64)
+    fingerprint = models.CharField(max_length=64)
+    status = models.PositiveSmallIntegerField(null=True)
+    data = models.JSONField(null=True, encoder=DjangoJSONEncoder)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        db_table = 'idempotency_keys'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'key'],
+                name='idempotency_keys_user_key_unique'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} - {self.key}"
+
+
+class ThrottleBucket(models.Model):
+    """
+    Estado del token bucket de un scope e identidad (ver
+    core.throttling). Se actualiza con un único upsert atómico, así los
+    workers no se pisan. Pasado `expires_at` el bucket estaría lleno y la
+    fila se puede borrar.
+    """
+    key = models.CharField(max_length=200, primary_key=True)
+    tokens = models.FloatField()
+    granted = models.BooleanField()
+    updated_at = models.FloatField()
+    expires_at = models.FloatField(db_index=True)
+
+    class Meta:
+        db_table = 'throttle_buckets'
+
+    def __str__(self):
+        return self.key
@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator del admin para tablas grandes. No hace `COUNT(*)`: sin
+    filtros usa `reltuples` de pg_class (lo que mantiene ANALYZE) y con
+    filtros la cantidad de filas que estima el planner con EXPLAIN. Si la
+    estimación es menor que ADMIN_EXACT_COUNT_THRESHOLD cuenta exacto, que
+    en ese caso es barato.
+    """
+    @cached_property
+    def count(self):
+        estimate = self.estimate()
+        if estimate is None or estimate < settings.ADMIN_EXACT_COUNT_THRESHOLD:
+            return super().count
+        return estimate
+
+    def estimate(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        with connection.cursor() as cursor:
+            if not queryset.query.where:
+                cursor.execute(
+                    'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                    [queryset.model._meta.db_table],
+                )
+                row = cursor.fetchone()
+                # -1 si la tabla todavía no fue analizada
+                return row[0] if row and row[0] >= 0 else None
+            sql, params = queryset.order_by().query.sql_with_params()
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            return cursor.fetchone()[0][0]['Plan']['Plan Rows']
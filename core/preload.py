@@ -0,0 +1,42 @@
+"""
+Precarga de la app en el master de uWSGI, antes del fork. Lo que se
+importa acá queda compartido entre los workers (copy-on-write) y no se
+vuelve a pagar cada vez que uWSGI recicla o agrega un worker.
+"""
+import gc
+
+from django.conf import settings
+from django.db import connections
+from django.urls import get_resolver
+from rest_framework.settings import api_settings
+
+
+# Clases de DRF que se importan recién al primer request
+DRF_SETTINGS = (
+    'DEFAULT_RENDERER_CLASSES',
+    'DEFAULT_PARSER_CLASSES',
+    'DEFAULT_AUTHENTICATION_CLASSES',
+    'DEFAULT_PERMISSION_CLASSES',
+    'DEFAULT_THROTTLE_CLASSES',
+    'DEFAULT_CONTENT_NEGOTIATION_CLASS',
+    'DEFAULT_METADATA_CLASS',
+    'DEFAULT_VERSIONING_CLASS',
+    'DEFAULT_PAGINATION_CLASS',
+    'DEFAULT_FILTER_BACKENDS',
+    'EXCEPTION_HANDLER',
+)
+
+
+def preload():
+    """
+    Importa las URLs (y con ellas vistas y serializers) y las clases de DRF,
+    cierra las conexiones que se hayan abierto y congela los objetos
+    creados hasta acá con `gc.freeze()`: el recolector no los vuelve a
+    recorrer, así no escribe en sus páginas y los workers no las copian.
+    """
+    get_resolver(settings.ROOT_URLCONF).url_patterns
+    for name in DRF_SETTINGS:
+        getattr(api_settings, name)
+    connections.close_all()
+    gc.collect()
+    gc.freeze()
@@ -0,0 +1,104 @@
+"""
+Profiling en producción:
+
+- Por request: un usuario staff agrega `X-Profile: 1` o `?profile=1` y el
+  request corre bajo cProfile; el resultado queda en
+  `PROFILING_DIR/request-<profile id>.prof` (ver ProfilingMiddleware).
+- Muestreo continuo: con `PROFILING_SAMPLER` cada worker toma cada
+  `PROFILING_SAMPLE_INTERVAL` segundos el stack de los hilos que están
+  atendiendo un request y vuelca los conteos a
+  `PROFILING_DIR/stacks-<pid>.folded`, en el formato de flamegraph.pl:
+
+      cat stacks-*.folded | flamegraph.pl > flamegraph.svg
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from django.conf import settings
+
+
+def frame_label(code):
+    return f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})'
+
+
+def folded_stack(frame):
+    """Stack de `frame` desde la raíz, separado por `;`"""
+    labels = []
+    while frame is not None:
+        labels.append(frame_label(frame.f_code))
+        frame = frame.f_back
+    return ';'.join(reversed(labels))
+
+
+class SamplingProfiler:
+    """
+    Profiler por muestreo de los hilos que están atendiendo un request. El
+    hilo de muestreo se inicia en cada proceso con el primer request, así
+    funciona igual cuando uWSGI hace fork de los workers.
+    """
+    def __init__(self):
+        self._pid = None
+        self._active = set()
+        self._stacks = Counter()
+        self._last_flush = 0.0
+        self._start_lock = threading.Lock()
+
+    def ensure_started(self):
+        if self._pid == os.getpid():
+            return
+        # Los primeros requests de un worker con varios hilos llegan a la
+        # vez: solo uno inicia el hilo de muestreo
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            # Lo heredado del master no corresponde a este worker
+            self._active = set()
+            self._stacks = Counter()
+            self._last_flush = time.monotonic()
+            threading.Thread(
+                target=self.run, name='sampling-profiler', daemon=True
+            ).start()
+            self._pid = os.getpid()
+
+    @contextmanager
+    def track(self):
+        """Marca el hilo actual como atendiendo un request"""
+        thread_id = threading.get_ident()
+        self._active.add(thread_id)
+        try:
+            yield
+        finally:
+            self._active.discard(thread_id)
+
+    def run(self):
+        while True:
+            time.sleep(settings.PROFILING_SAMPLE_INTERVAL)
+            self.sample()
+            if time.monotonic() - self._last_flush >= settings.PROFILING_FLUSH_INTERVAL:
+                self.flush()
+
+    def sample(self):
+        frames = sys._current_frames()
+        for thread_id in list(self._active):
+            frame = frames.get(thread_id)
+            if frame is not None:
+                self._stacks[folded_stack(frame)] += 1
+
+    def flush(self):
+        self._last_flush = time.monotonic()
+        directory = settings.PROFILING_DIR
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f'stacks-{os.getpid()}.folded')
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as tmp:
+            for stack, count in list(self._stacks.items()):
+                tmp.write(f'{stack} {count}\n')
+        os.replace(tmp_path, path)
+
+
+sampler = SamplingProfiler()
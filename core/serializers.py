@@ -0,0 +1,49 @@
+import datetime
+
+from django.utils.functional import cached_property
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+from . import metrics
+
+
+class TimedSerializerMixin:
+    """
+    Mide el tiempo de serialización (`.data`) para las métricas del request.
+    """
+    @property
+    def data(self):
+        with metrics.timed('serializer'):
+            return super().data
+
+
+class TimedListSerializer(TimedSerializerMixin, serializers.ListSerializer):
+    pass
+
+
+class UTCDateTimeField(serializers.DateTimeField):
+    """
+    DateTimeField con un atajo para el caso común: fecha en UTC (como las
+    devuelve la base), zona horaria UTC y formato ISO 8601. Arma el string
+    directamente, sin convertir de zona; el resultado es el mismo que el de
+    DRF.
+
+    La zona activa se consulta una vez por instancia del campo y no por
+    valor: en un listado la misma instancia serializa todas las filas, y
+    leer la zona activa es lo más caro del DateTimeField de DRF.
+    """
+    @cached_property
+    def utc_output(self):
+        output_format = getattr(self, 'format', api_settings.DATETIME_FORMAT)
+        field_timezone = getattr(self, 'timezone', None) or self.default_timezone()
+        return output_format == ISO_8601 and str(field_timezone) == 'UTC'
+
+    def to_representation(self, value):
+        if (
+            value
+            and not isinstance(value, str)
+            and value.tzinfo is datetime.timezone.utc
+            and self.utc_output
+        ):
+            return value.isoformat()[:-6] + 'Z'
+        return super().to_representation(value)
@@ -0,0 +1,383 @@
+import time
+
+import pytest
+
+from django.db import OperationalError
+from django.db.migrations.executor import MigrationExecutor
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core import health, metrics
+from tasks.models import Task
+from users.models import Users
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def user():
+    return Users.objects.create_user(
+        username="testuser",
+        email="test@test.com",
+        password="testpass123"
+    )
+
+
+@pytest.fixture
+def authenticated_client(api_client, user):
+    api_client.force_authenticate(user=user)
+    return api_client
+
+
+@pytest.fixture(autouse=True)
+def metrics_store(settings):
+    settings.METRICS_DIR = ''
+    metrics.store.reset()
+    yield metrics.store
+    metrics.store.reset()
+
+
+@pytest.mark.django_db
+class TestMetricsMiddleware:
+    def test_server_timing_header(self, authenticated_client, user):
+        """Test la respuesta incluye el header Server-Timing"""
+        Task.objects.create(title="Task", user=user)
+        response = authenticated_client.get(reverse('task-list'))
+
+        assert response.status_code == status.HTTP_200_OK
+        timing = response['Server-Timing']
+        assert timing.startswith('total;dur=')
+        assert 'db;dur=' in timing
+        assert 'serializer;dur=' in timing
+
+    def test_server_timing_disabled(self, authenticated_client, settings):
+        """Test el header Server-Timing se puede desactivar"""
+        settings.METRICS_SERVER_TIMING = False
+        response = authenticated_client.get(reverse('task-list'))
+        assert not response.has_header('Server-Timing')
+
+    def test_request_recorded_per_view(
+        self, authenticated_client, user, metrics_store
+    ):
+        """Test se registran queries, serialización y tamaño por vista"""
+        Task.objects.create(title="Task", user=user)
+        response = authenticated_client.get(reverse('task-list'))
+
+        [(view, method, code, series)] = metrics_store.collect()
+        assert (view, method, code) == ('task-list', 'GET', '200')
+        assert series['count'] == 1
+        assert series['db_queries'] >= 1
+        assert series['serializer_seconds'] > 0
+        assert series['response_bytes'] == len(response.content)
+
+
+@pytest.mark.django_db
+class TestMetricsView:
+    def test_metrics_endpoint(self, authenticated_client):
+        """Test /metrics expone las métricas en formato Prometheus"""
+        authenticated_client.get(reverse('task-list'))
+        response = authenticated_client.get(reverse('metrics'))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response['Content-Type'].startswith('text/plain')
+        body = response.content.decode()
+        assert 'http_request_duration_seconds_count{view="task-list"' in body
+
+
+@pytest.mark.django_db
+class TestRequestLogMiddleware:
+    def test_request_logged_with_context(
+        self, authenticated_client, user, caplog
+    ):
+        """Test log del request con request id, usuario, vista y status"""
+        with caplog.at_level('INFO', logger='core.requests'):
+            response = authenticated_client.get(
+                reverse('task-list'), HTTP_X_REQUEST_ID='req-1'
+            )
+
+        assert response['X-Request-ID'] == 'req-1'
+        [record] = [r for r in caplog.records if r.name == 'core.requests']
+        assert record.request_id == 'req-1'
+        assert record.user_id == user.pk
+        assert record.view == 'task-list'
+        assert record.status == 200
+        assert record.duration_ms >= 0
+
+    def test_request_id_generated(self, authenticated_client):
+        """Test se genera un request id si el cliente no lo envía"""
+        response = authenticated_client.get(reverse('task-list'))
+        assert len(response['X-Request-ID']) == 32
+
+    def test_request_log_sampling(self, authenticated_client, settings, caplog):
+        """Test los requests rápidos se muestrean"""
+        settings.LOG_REQUEST_SAMPLE_RATE = 0
+        with caplog.at_level('INFO', logger='core.requests'):
+            authenticated_client.get(reverse('task-list'))
+        assert not [r for r in caplog.records if r.name == 'core.requests']
+
+    def test_slow_request_always_logged(
+        self, authenticated_client, settings, caplog
+    ):
+        """Test los requests lentos se loguean aunque no salgan sorteados"""
+        settings.LOG_REQUEST_SAMPLE_RATE = 0
+        settings.LOG_SLOW_REQUEST_MS = 0
+        with caplog.at_level('INFO', logger='core.requests'):
+            authenticated_client.get(reverse('task-list'))
+        [record] = [r for r in caplog.records if r.name == 'core.requests']
+        assert record.slow is True
+        assert record.levelname == 'WARNING'
+
+    def test_slow_query_logged(self, authenticated_client, settings, caplog):
+        """Test las queries sobre el umbral se loguean con su SQL"""
+        settings.LOG_SLOW_QUERY_MS = 0
+        with caplog.at_level('WARNING', logger='core.db.slow_queries'):
+            authenticated_client.get(reverse('task-list'))
+        records = [
+            r for r in caplog.records if r.name == 'core.db.slow_queries'
+        ]
+        assert records
+        assert 'tasks' in records[0].sql
+        assert records[0].view == 'task-list'
+
+
+@pytest.mark.django_db
+class TestThrottling:
+    def test_login_throttled(self, api_client, settings):
+        """Test el login se limita por IP y devuelve Retry-After"""
+        settings.REST_FRAMEWORK = dict(
+            settings.REST_FRAMEWORK,
+            DEFAULT_THROTTLE_RATES={'login': '2/min'}
+        )
+        url = reverse('login')
+        data = {'username': 'nobody@test.com', 'password': 'wrong'}
+        for _ in range(2):
+            response = api_client.post(url, data, format='json')
+            assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+        response = api_client.post(url, data, format='json')
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert int(response['Retry-After']) > 0
+
+    def test_forwarded_for_ignored(self, api_client, settings):
+        """Test un X-Forwarded-For distinto en cada request no evita el límite"""
+        settings.REST_FRAMEWORK = dict(
+            settings.REST_FRAMEWORK,
+            DEFAULT_THROTTLE_RATES={'login': '2/min'}
+        )
+        url = reverse('login')
+        data = {'username': 'nobody@test.com', 'password': 'wrong'}
+        statuses = [
+            api_client.post(
+                url, data, format='json',
+                HTTP_X_FORWARDED_FOR=f'203.0.113.{index}',
+            ).status_code
+            for index in range(5)
+        ]
+        assert statuses == [
+            status.HTTP_400_BAD_REQUEST,
+            status.HTTP_400_BAD_REQUEST,
+            *[status.HTTP_429_TOO_MANY_REQUESTS] * 3,
+        ]
+
+    def test_task_writes_throttled_per_user(
+        self, authenticated_client, settings
+    ):
+        """Test las escrituras de tareas se limitan pero no las lecturas"""
+        settings.REST_FRAMEWORK = dict(
+            settings.REST_FRAMEWORK,
+            DEFAULT_THROTTLE_RATES={'task_write': '1/min'}
+        )
+        url = reverse('task-list')
+        response = authenticated_client.post(url, {'title': 'One'})
+        assert response.status_code == status.HTTP_201_CREATED
+
+        response = authenticated_client.post(url, {'title': 'Two'})
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+        response = authenticated_client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db
+class TestLoadSheddingMiddleware:
+    def test_shed_when_queued_too_long(self, authenticated_client):
+        """Test 503 con Retry-After si el request esperó demasiado en cola"""
+        started = time.time() - 10
+        response = authenticated_client.get(
+            reverse('task-list'), HTTP_X_REQUEST_START=f't={started:.3f}'
+        )
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert response['Retry-After'] == '5'
+
+    def test_not_shed_when_fresh(self, authenticated_client):
+        """Test los requests recientes se atienden"""
+        response = authenticated_client.get(
+            reverse('task-list'), HTTP_X_REQUEST_START=f't={time.time():.3f}'
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_exempt_paths(self, authenticated_client):
+        """Test /metrics no se descarta aunque haya saturación"""
+        started = time.time() - 10
+        response = authenticated_client.get(
+            reverse('metrics'), HTTP_X_REQUEST_START=f't={started:.3f}'
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db
+class TestAdminMiddleware:
+    @pytest.fixture
+    def admin_user(self):
+        return Users.objects.create_superuser(
+            username="admin", email="admin@test.com", password="adminpass123"
+        )
+
+    def test_admin_login(self, client, admin_user):
+        """Test el admin sigue usando sesión y CSRF"""
+        client = type(client)(enforce_csrf_checks=True)
+        response = client.get('/admin/login/')
+        assert response.status_code == status.HTTP_200_OK
+        assert response['X-Frame-Options'] == 'DENY'
+        token = response.cookies['csrftoken'].value
+
+        response = client.post('/admin/login/', {
+            'username': 'admin@test.com',
+            'password': 'adminpass123',
+            'csrfmiddlewaretoken': token,
+        })
+        assert response.status_code == status.HTTP_302_FOUND
+        assert client.get('/admin/').status_code == status.HTTP_200_OK
+
+    def test_admin_rejects_missing_csrf(self, client, admin_user):
+        client = type(client)(enforce_csrf_checks=True)
+        response = client.post('/admin/login/', {
+            'username': 'admin@test.com', 'password': 'adminpass123',
+        })
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_api_skips_session_and_csrf(self, authenticated_client):
+        """Test la API no carga sesión ni setea cookies"""
+        response = authenticated_client.get(reverse('task-list'))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert not response.cookies
+        assert 'Cookie' not in response.get('Vary', '')
+        assert not response.has_header('X-Frame-Options')
+
+
+@pytest.mark.django_db
+class TestHealth:
+    @pytest.fixture(autouse=True)
+    def reset_migrations_check(self, monkeypatch):
+        monkeypatch.setattr(health, '_migrations_applied', False)
+
+    def test_healthz(self, api_client, django_assert_num_queries):
+        with django_assert_num_queries(0):
+            response = api_client.get(reverse('healthz'))
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {'status': 'ok'}
+
+    def test_readyz(self, api_client):
+        response = api_client.get(reverse('readyz'))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {
+            'status': 'ready',
+            'checks': {'database': True, 'migrations': True},
+        }
+
+    def test_readyz_caches_migrations(self, api_client, django_assert_num_queries):
+        """Test las migraciones se verifican una sola vez por worker"""
+        api_client.get(reverse('readyz'))
+        with django_assert_num_queries(1):
+            response = api_client.get(reverse('readyz'))
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_readyz_database_down(self, api_client, monkeypatch):
+        def fail():
+            raise OperationalError('connection refused')
+
+        monkeypatch.setattr(health, 'check_database', fail)
+        response = api_client.get(reverse('readyz'))
+
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert response.json()['checks'] == {'database': False, 'migrations': False}
+
+    def test_readyz_pending_migrations(self, api_client, monkeypatch):
+        monkeypatch.setattr(
+            MigrationExecutor, 'migration_plan', lambda self, targets: [object()]
+        )
+        response = api_client.get(reverse('readyz'))
+
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert response.json()['checks'] == {'database': True, 'migrations': False}
+
+
+@pytest.mark.django_db
+class TestProfilingMiddleware:
+    @pytest.fixture(autouse=True)
+    def profiling_dir(self, settings, tmp_path):
+        settings.PROFILING_DIR = str(tmp_path)
+        return tmp_path
+
+    def jwt_client(self, api_client, user):
+        api_client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}'
+        )
+        return api_client
+
+    def test_staff_request_profiled(self, api_client, user, profiling_dir):
+        user.is_staff = True
+        user.save()
+        client = self.jwt_client(api_client, user)
+
+        response = client.get(reverse('task-list'), {'profile': '1'})
+
+        assert response.status_code == status.HTTP_200_OK
+        profile_id = response['X-Profile-Id']
+        assert (profiling_dir / f'request-{profile_id}.prof').exists()
+
+    def test_request_id_not_used_as_filename(self, api_client, user, profiling_dir):
+        """Test el X-Request-ID del cliente no elige el archivo del profile"""
+        user.is_staff = True
+        user.save()
+        client = self.jwt_client(api_client, user)
+
+        response = client.get(
+            reverse('task-list'), {'profile': '1'},
+            HTTP_X_REQUEST_ID='../../etc/profile'
+        )
+
+        [path] = profiling_dir.iterdir()
+        assert path.name == f"request-{response['X-Profile-Id']}.prof"
+        assert '..' not in response['X-Profile-Id']
+
+    def test_profile_header(self, api_client, user, profiling_dir):
+        user.is_staff = True
+        user.save()
+        client = self.jwt_client(api_client, user)
+
+        response = client.get(reverse('task-list'), HTTP_X_PROFILE='1')
+
+        assert response.has_header('X-Profile-Id')
+
+    def test_non_staff_not_profiled(self, api_client, user, profiling_dir):
+        client = self.jwt_client(api_client, user)
+
+        response = client.get(reverse('task-list'), {'profile': '1'})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert not response.has_header('X-Profile-Id')
+        assert not list(profiling_dir.iterdir())
+
+    def test_anonymous_not_profiled(self, api_client, profiling_dir):
+        response = api_client.get(reverse('healthz'), {'profile': '1'})
+
+        assert not response.has_header('X-Profile-Id')
+        assert not list(profiling_dir.iterdir())
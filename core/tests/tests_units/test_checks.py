@@ -0,0 +1,63 @@
+from unittest import mock
+
+import pytest
+
+from django.core.management import call_command
+from django.core.management.base import SystemCheckError
+
+from core import checks
+
+
+class TestPerformanceChecks:
+    def test_debug(self, settings):
+        settings.DEBUG = True
+        assert [error.id for error in checks.check_debug(None)] == ['core.E001']
+
+        settings.DEBUG = False
+        assert checks.check_debug(None) == []
+
+    def test_persistent_connections(self, settings):
+        with mock.patch.dict(settings.DATABASES['default'], CONN_MAX_AGE=0):
+            errors = checks.check_persistent_connections(None)
+        assert [error.id for error in errors] == ['core.E002']
+        assert '"default"' in errors[0].msg
+
+        with mock.patch.dict(settings.DATABASES['default'], CONN_MAX_AGE=60):
+            assert checks.check_persistent_connections(None) == []
+
+        with mock.patch.dict(settings.DATABASES['default'], CONN_MAX_AGE=None):
+            assert checks.check_persistent_connections(None) == []
+
+        with mock.patch.dict(settings.DATABASES['default']):
+            del settings.DATABASES['default']['CONN_MAX_AGE']
+            errors = checks.check_persistent_connections(None)
+        assert [error.id for error in errors] == ['core.E002']
+
+    def test_template_loaders(self, settings):
+        settings.TEMPLATES = [{'OPTIONS': {}}]
+        assert checks.check_template_loaders(None) == []
+
+        settings.TEMPLATES = [{'OPTIONS': {'loaders': [
+            'django.template.loaders.app_directories.Loader',
+        ]}}]
+        assert [error.id for error in checks.check_template_loaders(None)] == ['core.E003']
+
+        settings.TEMPLATES = [{'OPTIONS': {'loaders': [
+            (checks.CACHED_LOADER, ['django.template.loaders.app_directories.Loader']),
+        ]}}]
+        assert checks.check_template_loaders(None) == []
+
+    def test_query_logging(self, settings):
+        settings.LOG_LEVEL = 'INFO'
+        settings.LOGGING = {'loggers': {'django.db.backends': {'level': 'DEBUG'}}}
+        assert [error.id for error in checks.check_query_logging(None)] == ['core.E004']
+
+        settings.LOGGING = {'loggers': {}}
+        assert checks.check_query_logging(None) == []
+
+    def test_deploy_check_fails(self, settings):
+        """Test el check del arranque del contenedor falla, no solo advierte"""
+        settings.DEBUG = False
+        with mock.patch.dict(settings.DATABASES['default'], CONN_MAX_AGE=0):
+            with pytest.raises(SystemCheckError, match='core.E002'):
+                call_command('check', deploy=True, tags=['performance'])
@@ -0,0 +1,85 @@
+import gzip
+import json
+
+import pytest
+
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.test import RequestFactory
+
+from core import compression
+from core.middleware import CompressionMiddleware
+
+
+PAYLOAD = {'results': [{'id': index, 'title': f'Task {index}'} for index in range(200)]}
+
+
+def run(response, accept_encoding='gzip'):
+    request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING=accept_encoding)
+    return CompressionMiddleware(lambda request: response)(request)
+
+
+class TestNegotiate:
+    @pytest.fixture(autouse=True)
+    def codecs(self, monkeypatch):
+        monkeypatch.setattr(compression, 'CODECS', {
+            'br': compression.Brotli(), 'gzip': compression.Gzip(),
+        })
+
+    @pytest.mark.parametrize('header, expected', [
+        ('gzip', 'gzip'),
+        ('gzip, br', 'br'),
+        ('gzip, br;q=0', 'gzip'),
+        ('deflate', None),
+        ('', None),
+        ('gzip;q=0', None),
+        ('*', 'br'),
+        ('*, br;q=0', 'gzip'),
+    ])
+    def test_negotiate(self, header, expected):
+        codec = compression.negotiate(header)
+        assert (codec and codec.name) == expected
+
+
+class TestCompressionMiddleware:
+    def test_compresses_json(self):
+        content = json.dumps(PAYLOAD).encode()
+        response = run(JsonResponse(PAYLOAD))
+
+        assert response['Content-Encoding'] == 'gzip'
+        assert response['Vary'] == 'Accept-Encoding'
+        assert int(response['Content-Length']) == len(response.content)
+        assert gzip.decompress(response.content) == content
+
+    def test_small_response(self, settings):
+        settings.COMPRESSION_MIN_SIZE = 10_000
+        response = run(JsonResponse(PAYLOAD))
+        assert not response.has_header('Content-Encoding')
+
+    def test_not_accepted(self):
+        response = run(JsonResponse(PAYLOAD), accept_encoding='identity')
+
+        assert not response.has_header('Content-Encoding')
+        assert response['Vary'] == 'Accept-Encoding'
+
+    def test_skips_html(self):
+        response = run(HttpResponse('<p>hola</p>' * 500))
+        assert not response.has_header('Content-Encoding')
+
+    def test_weak_etag(self):
+        response = JsonResponse(PAYLOAD)
+        response['ETag'] = '"abc"'
+        assert run(response)['ETag'] == 'W/"abc"'
+
+    def test_streaming(self):
+        chunks = [json.dumps(item).encode() + b'\n' for item in PAYLOAD['results']]
+        response = run(StreamingHttpResponse(iter(chunks), content_type='application/json'))
+
+        assert response['Content-Encoding'] == 'gzip'
+        assert not response.has_header('Content-Length')
+        assert gzip.decompress(b''.join(response.streaming_content)) == b''.join(chunks)
+
+    def test_skips_event_stream(self):
+        response = run(StreamingHttpResponse(
+            iter([b'data: {}\n\n']), content_type='text/event-stream'
+        ))
+        assert not response.has_header('Content-Encoding')
@@ -0,0 +1,43 @@
+import sys
+import types
+
+import pytest
+
+from core import health
+
+
+@pytest.fixture
+def uwsgi(monkeypatch):
+    """Módulos `uwsgi` y `uwsgidecorators` falsos"""
+    hooks = []
+    module = types.SimpleNamespace(worker_id=lambda: 0)
+    monkeypatch.setitem(sys.modules, 'uwsgi', module)
+    monkeypatch.setitem(
+        sys.modules, 'uwsgidecorators', types.SimpleNamespace(postfork=hooks.append)
+    )
+    module.hooks = hooks
+    return module
+
+
+@pytest.mark.django_db
+def test_warm_up(django_assert_num_queries):
+    """Test el warm-up abre la conexión a la base"""
+    with django_assert_num_queries(1):
+        health.warm_up()
+
+
+def test_register_warm_up_in_master(uwsgi):
+    health.register_warm_up()
+    assert uwsgi.hooks == [health.warm_up]
+
+
+def test_register_warm_up_lazy_apps(uwsgi, monkeypatch):
+    """Test con lazy-apps se ejecuta en el worker en el momento"""
+    calls = []
+    monkeypatch.setattr(health, 'warm_up', lambda: calls.append(True))
+    uwsgi.worker_id = lambda: 2
+
+    health.register_warm_up()
+
+    assert calls == [True]
+    assert uwsgi.hooks == []
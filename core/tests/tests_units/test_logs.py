@@ -0,0 +1,113 @@
+import io
+import json
+import logging
+import os
+
+import pytest
+
+from core import logs
+from core.logs import JsonFormatter, QueueStreamHandler, RequestContextFilter
+
+
+@pytest.fixture
+def record():
+    return logging.LogRecord(
+        'core.requests', logging.INFO, __file__, 1, 'hello %s', ('world',), None
+    )
+
+
+class TestJsonFormatter:
+    def test_format(self, record):
+        """Test cada registro es una línea JSON con los campos extra"""
+        record.status = 200
+        record.request_id = 'abc'
+        payload = json.loads(JsonFormatter().format(record))
+
+        assert payload['message'] == 'hello world'
+        assert payload['level'] == 'INFO'
+        assert payload['logger'] == 'core.requests'
+        assert payload['status'] == 200
+        assert payload['request_id'] == 'abc'
+        assert 'args' not in payload
+
+    def test_format_exception(self, record):
+        """Test se incluye el traceback de las excepciones"""
+        try:
+            raise ValueError('boom')
+        except ValueError:
+            import sys
+            record.exc_info = sys.exc_info()
+        payload = json.loads(JsonFormatter().format(record))
+        assert 'ValueError: boom' in payload['exception']
+
+
+class TestRequestContextFilter:
+    def test_adds_request_context(self, record):
+        """Test se agregan request id, usuario y vista del request actual"""
+        token = logs.request_context.set(
+            {'request_id': 'abc', 'user_id': 1, 'view': 'task-list'}
+        )
+        try:
+            RequestContextFilter().filter(record)
+        finally:
+            logs.request_context.reset(token)
+
+        assert record.request_id == 'abc'
+        assert record.user_id == 1
+        assert record.view == 'task-list'
+
+
+class TestQueueStreamHandler:
+    def test_writes_from_listener_thread(self, record):
+        """Test el registro se escribe de forma asíncrona en el stream"""
+        stream = io.StringIO()
+        handler = QueueStreamHandler(stream=stream)
+        handler.setFormatter(JsonFormatter())
+        handler.handle(record)
+        handler.stop()
+
+        assert json.loads(stream.getvalue())['message'] == 'hello world'
+
+    def test_drops_when_queue_is_full(self, record):
+        """Test con la cola llena se descartan registros sin bloquear"""
+        handler = QueueStreamHandler(stream=io.StringIO(), maxsize=1)
+        handler.stop()
+        handler.handle(record)
+        handler.handle(record)
+
+        assert handler.dropped == 1
+
+    def test_writes_after_fork(self, record, tmp_path, monkeypatch):
+        """Test en un proceso hijo el hilo se inicia con el primer registro"""
+        # uWSGI no corre los hooks de os.register_at_fork
+        monkeypatch.setattr(os, 'register_at_fork', lambda **kwargs: None)
+        path = tmp_path / 'log.jsonl'
+        with open(path, 'a', buffering=1) as stream:
+            handler = QueueStreamHandler(stream=stream)
+            handler.setFormatter(JsonFormatter())
+            # El master loguea antes del fork, como con uWSGI
+            handler.handle(record)
+
+            pid = os.fork()
+            if pid == 0:
+                try:
+                    record.msg = 'from child'
+                    record.args = None
+                    handler.handle(record)
+                    handler.stop()
+                finally:
+                    os._exit(0)
+            os.waitpid(pid, 0)
+            handler.stop()
+
+        messages = [
+            json.loads(line)['message'] for line in path.read_text().splitlines()
+        ]
+        assert sorted(messages) == ['from child', 'hello world']
+
+
+class TestSampling:
+    @pytest.mark.parametrize('rate, expected', [(1, True), (0, False)])
+    def test_sampled(self, rate, expected):
+        """Test tasa de muestreo"""
+        assert logs.sampled(rate) is expected
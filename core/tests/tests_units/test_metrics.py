@@ -0,0 +1,189 @@
+import os
+import subprocess
+import sys
+import types
+
+import pytest
+
+from core import metrics
+from core.metrics import MetricsStore, RequestMetrics, register_exit_flush
+
+
+@pytest.fixture
+def request_metrics():
+    request_metrics = RequestMetrics()
+    request_metrics.db_queries = 3
+    request_metrics.db_seconds = 0.02
+    request_metrics.timings['serializer'] = 0.01
+    return request_metrics
+
+
+@pytest.fixture(autouse=True)
+def exit_hooks(monkeypatch):
+    """Hooks de salida registrados por los stores del test"""
+    hooks = []
+    monkeypatch.setattr(metrics, 'register_exit_flush', hooks.append)
+    return hooks
+
+
+@pytest.fixture
+def finished_pid():
+    """Pid de un proceso que ya terminó"""
+    process = subprocess.Popen([sys.executable, '-c', 'pass'])
+    process.wait()
+    return process.pid
+
+
+def worker_file(tmp_path, request_metrics, name):
+    """Deja en `tmp_path` el archivo de un worker con un request"""
+    worker = MetricsStore()
+    worker.observe('task-list', 'GET', 200, 0.01, request_metrics, 10)
+    worker.flush()
+    os.replace(tmp_path / worker._path, tmp_path / name)
+
+
+class TestMetricsStore:
+    def test_observe_aggregates_by_view(self, settings, request_metrics):
+        """Test agregado por vista, método y status"""
+        settings.METRICS_DIR = ''
+        store = MetricsStore()
+        store.observe('task-list', 'GET', 200, 0.03, request_metrics, 100)
+        store.observe('task-list', 'GET', 200, 0.2, request_metrics, 50)
+
+        [(view, method, status, series)] = store.collect()
+        assert (view, method, status) == ('task-list', 'GET', '200')
+        assert series['count'] == 2
+        assert series['db_queries'] == 6
+        assert series['response_bytes'] == 150
+        # buckets acumulativos: 0.03 entra desde 0.05, 0.2 desde 0.25
+        buckets = dict(zip(metrics.LATENCY_BUCKETS, series['latency_buckets']))
+        assert buckets[0.025] == 0
+        assert buckets[0.05] == 1
+        assert buckets[0.25] == 2
+
+    def test_collect_merges_worker_files(
+        self, settings, tmp_path, request_metrics
+    ):
+        """Test se suman las métricas volcadas por otros workers"""
+        settings.METRICS_DIR = str(tmp_path)
+        worker_file(tmp_path, request_metrics, f'metrics-{os.getppid()}-1.json')
+
+        store = MetricsStore()
+        store.observe('task-list', 'GET', 200, 0.01, request_metrics, 10)
+
+        [(_, _, _, series)] = store.collect()
+        assert series['count'] == 2
+        assert series['db_queries'] == 6
+        # el worker sigue vivo: su archivo no se toca
+        assert (tmp_path / f'metrics-{os.getppid()}-1.json').exists()
+
+    def test_finished_workers_kept_in_aggregate(
+        self, settings, tmp_path, request_metrics, finished_pid
+    ):
+        """Test las métricas de un worker que terminó pasan al agregado"""
+        settings.METRICS_DIR = str(tmp_path)
+        worker_file(tmp_path, request_metrics, f'metrics-{finished_pid}-1.json')
+
+        store = MetricsStore()
+        store.observe('task-list', 'GET', 200, 0.01, request_metrics, 10)
+
+        [(_, _, _, series)] = store.collect()
+        assert series['count'] == 2
+        assert not (tmp_path / f'metrics-{finished_pid}-1.json').exists()
+        assert (tmp_path / metrics.AGGREGATE_FILE).exists()
+
+        # los contadores no bajan en las lecturas siguientes
+        [(_, _, _, series)] = store.collect()
+        assert series['count'] == 2
+
+    def test_aggregated_file_not_counted_twice(
+        self, settings, tmp_path, request_metrics, finished_pid
+    ):
+        """Test un archivo ya sumado al agregado que no se borró no se vuelve a sumar"""
+        settings.METRICS_DIR = str(tmp_path)
+        name = f'metrics-{finished_pid}-1.json'
+        worker_file(tmp_path, request_metrics, name)
+        store = MetricsStore()
+        store.collect()
+        worker_file(tmp_path, request_metrics, name)
+        metrics.write_json(
+            str(tmp_path / metrics.AGGREGATE_FILE),
+            {**metrics.read_json(str(tmp_path / metrics.AGGREGATE_FILE)), 'merged': [name]},
+        )
+
+        [(_, _, _, series)] = store.collect()
+        assert series['count'] == 1
+        assert not (tmp_path / name).exists()
+
+    def test_reused_pid_does_not_overwrite(
+        self, settings, tmp_path, request_metrics
+    ):
+        """Test un worker con el pid de uno que terminó no pisa sus métricas"""
+        settings.METRICS_DIR = str(tmp_path)
+        worker_file(tmp_path, request_metrics, f'metrics-{os.getpid()}-1.json')
+
+        store = MetricsStore()
+        store.observe('task-list', 'GET', 200, 0.01, request_metrics, 10)
+
+        [(_, _, _, series)] = store.collect()
+        assert series['count'] == 2
+        assert not (tmp_path / f'metrics-{os.getpid()}-1.json').exists()
+
+    def test_flush_at_exit(
+        self, settings, tmp_path, request_metrics, exit_hooks
+    ):
+        """Test las métricas desde el último volcado se escriben al terminar"""
+        settings.METRICS_DIR = str(tmp_path)
+        settings.METRICS_FLUSH_INTERVAL = 60
+        store = MetricsStore()
+        store.observe('task-list', 'GET', 200, 0.01, request_metrics, 10)
+        store.observe('task-list', 'GET', 200, 0.01, request_metrics, 10)
+
+        [flush] = exit_hooks
+        flush()
+
+        [(_, _, _, series)] = metrics.read_json(str(tmp_path / store._path))
+        assert series['count'] == 2
+
+    def test_render_prometheus(self, settings, request_metrics):
+        """Test formato de exposición de Prometheus"""
+        settings.METRICS_DIR = ''
+        store = MetricsStore()
+        store.observe('task-list', 'GET', 200, 0.03, request_metrics, 100)
+
+        body = metrics.render_prometheus(store.collect())
+
+        labels = 'view="task-list",method="GET",status="200"'
+        assert '# TYPE http_request_duration_seconds histogram' in body
+        assert f'http_request_duration_seconds_count{{{labels}}} 1' in body
+        assert f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} 1' in body
+        assert f'http_db_queries_total{{{labels}}} 3' in body
+
+
+class TestRegisterExitFlush:
+    def test_uwsgi_atexit_chained(self, monkeypatch):
+        """Test con uWSGI se usa `uwsgi.atexit`, sin perder el hook anterior"""
+        calls = []
+        uwsgi = types.SimpleNamespace(atexit=lambda: calls.append('previous'))
+        monkeypatch.setitem(sys.modules, 'uwsgi', uwsgi)
+
+        register_exit_flush(lambda: calls.append('flush'))
+        uwsgi.atexit()
+
+        assert calls == ['flush', 'previous']
+
+
+class TestTimed:
+    def test_timed_accumulates_in_active_request(self):
+        """Test `timed` suma al request activo"""
+        request_metrics = RequestMetrics()
+        with request_metrics.activate():
+            with metrics.timed('serializer'):
+                pass
+        assert request_metrics.timings['serializer'] > 0
+
+    def test_timed_without_request(self):
+        """Test `timed` no falla fuera de un request"""
+        with metrics.timed('serializer'):
+            pass
+        assert metrics.current() is None
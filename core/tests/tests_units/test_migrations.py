@@ -0,0 +1,101 @@
+import types
+
+import pytest
+
+from django.core.management import CommandError, call_command
+
+from core import health
+from core.management.commands import migrate_locked
+
+
+class FakeCursor:
+    def __init__(self, executed, results):
+        self.executed = executed
+        self.results = results
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def execute(self, sql, params=None):
+        self.executed.append((sql, params))
+
+    def fetchone(self):
+        return (self.results.pop(0),)
+
+
+@pytest.fixture
+def postgres(monkeypatch):
+    """Conexión falsa de Postgres que registra el SQL ejecutado"""
+    executed = []
+    # Resultados de pg_try_advisory_lock, en orden
+    results = [True]
+    connection = types.SimpleNamespace(
+        in_atomic_block=False,
+        alias='default',
+        cursor=lambda: FakeCursor(executed, results),
+    )
+    connection.executed = executed
+    connection.results = results
+    monkeypatch.setattr(migrate_locked, 'connections', {'default': connection})
+    return connection
+
+
+class TestMigrateLocked:
+    def test_migrates_holding_lock(self, postgres, monkeypatch):
+        """Test las migraciones corren entre el lock y el unlock"""
+        def migrate(name, **kwargs):
+            postgres.executed.append((name, None))
+
+        monkeypatch.setattr(migrate_locked, 'call_command', migrate)
+        call_command('migrate_locked', verbosity=0)
+
+        lock_id = [migrate_locked.MIGRATION_LOCK_ID]
+        assert postgres.executed == [
+            ('SELECT pg_try_advisory_lock(%s)', lock_id),
+            ('migrate', None),
+            ('SELECT pg_advisory_unlock(%s)', lock_id),
+        ]
+
+    def test_polls_until_lock_is_free(self, postgres, monkeypatch):
+        """Test mientras otra réplica migra se reintenta sin bloquear"""
+        postgres.results[:] = [False, False, True]
+        sleeps = []
+        monkeypatch.setattr(migrate_locked.time, 'sleep', sleeps.append)
+        monkeypatch.setattr(migrate_locked, 'call_command', lambda *args, **kwargs: None)
+        call_command('migrate_locked', poll_interval=0.5, verbosity=0)
+
+        assert [sql for sql, _ in postgres.executed] == [
+            'SELECT pg_try_advisory_lock(%s)',
+            'SELECT pg_try_advisory_lock(%s)',
+            'SELECT pg_try_advisory_lock(%s)',
+            'SELECT pg_advisory_unlock(%s)',
+        ]
+        assert sleeps == [0.5, 0.5]
+
+    def test_unlocks_on_failure(self, postgres, monkeypatch):
+        def migrate(name, **kwargs):
+            raise CommandError('boom')
+
+        monkeypatch.setattr(migrate_locked, 'call_command', migrate)
+        with pytest.raises(CommandError):
+            call_command('migrate_locked', verbosity=0)
+
+        assert postgres.executed[-1][0] == 'SELECT pg_advisory_unlock(%s)'
+
+
+class TestWaitForSchema:
+    def test_ready(self, monkeypatch):
+        monkeypatch.setattr(
+            health, 'readiness', lambda: {'database': True, 'migrations': True}
+        )
+        call_command('wait_for_schema', verbosity=0)
+
+    def test_timeout(self, monkeypatch):
+        monkeypatch.setattr(
+            health, 'readiness', lambda: {'database': True, 'migrations': False}
+        )
+        with pytest.raises(CommandError, match='migrations'):
+            call_command('wait_for_schema', timeout=0, interval=0, verbosity=0)
@@ -0,0 +1,38 @@
+import pytest
+
+from core.paginator import EstimatedCountPaginator
+from users.models import Users
+
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def users():
+    return Users.objects.bulk_create([
+        Users(username=f"user{index}", email=f"user{index}@test.com")
+        for index in range(3)
+    ])
+
+
+def test_exact_count_without_estimate(users):
+    paginator = EstimatedCountPaginator(Users.objects.order_by('id'), 2)
+    assert paginator.count == 3
+
+
+def test_small_estimate_counts_exactly(users, monkeypatch, settings):
+    settings.ADMIN_EXACT_COUNT_THRESHOLD = 100
+    monkeypatch.setattr(EstimatedCountPaginator, 'estimate', lambda self: 50)
+    paginator = EstimatedCountPaginator(Users.objects.order_by('id'), 2)
+    assert paginator.count == 3
+
+
+def test_large_estimate_skips_count(
+    users, monkeypatch, settings, django_assert_num_queries
+):
+    settings.ADMIN_EXACT_COUNT_THRESHOLD = 100
+    monkeypatch.setattr(EstimatedCountPaginator, 'estimate', lambda self: 5000)
+    paginator = EstimatedCountPaginator(Users.objects.order_by('id'), 2)
+    with django_assert_num_queries(0):
+        assert paginator.count == 5000
+        assert paginator.num_pages == 2500
@@ -0,0 +1,20 @@
+import gc
+
+from django.urls import resolve, reverse
+
+from core.preload import preload
+
+
+def test_preload_freezes_objects():
+    """Test la precarga deja los objetos importados fuera del recolector"""
+    try:
+        preload()
+        assert gc.get_freeze_count() > 0
+    finally:
+        gc.unfreeze()
+
+
+def test_lazy_admin_urls():
+    """Test las URLs del admin se resuelven aunque se carguen a demanda"""
+    assert reverse('admin:index') == '/admin/'
+    assert resolve('/admin/login/').view_name == 'admin:login'
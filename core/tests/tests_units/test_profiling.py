@@ -0,0 +1,56 @@
+import os
+import threading
+
+from core.profiling import SamplingProfiler
+
+
+def test_sample_tracked_threads_only():
+    """Test solo se muestrean los hilos que atienden un request"""
+    profiler = SamplingProfiler()
+    profiler.sample()
+    assert not profiler._stacks
+
+    with profiler.track():
+        profiler.sample()
+
+    [(stack, count)] = profiler._stacks.items()
+    assert count == 1
+    assert stack.split(';')[-1].startswith('sample (profiling.py:')
+    assert 'test_sample_tracked_threads_only (test_profiling.py:' in stack
+
+
+def test_flush_writes_folded_stacks(settings, tmp_path):
+    settings.PROFILING_DIR = str(tmp_path)
+    profiler = SamplingProfiler()
+    profiler._stacks['main (app.py:1);view (views.py:10)'] = 3
+
+    profiler.flush()
+
+    path = tmp_path / f'stacks-{os.getpid()}.folded'
+    assert path.read_text() == 'main (app.py:1);view (views.py:10) 3\n'
+    assert [p.name for p in tmp_path.iterdir()] == [path.name]
+
+
+
+def test_started_once_per_process():
+    """Test con varios hilos a la vez se inicia un solo hilo de muestreo"""
+    profiler = SamplingProfiler()
+    started = []
+    profiler.run = lambda: started.append(threading.get_ident())
+    barrier = threading.Barrier(8)
+
+    def first_request():
+        barrier.wait()
+        profiler.ensure_started()
+
+    threads = [threading.Thread(target=first_request) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # El hilo de muestreo termina enseguida con `run` reemplazado
+    for thread in threading.enumerate():
+        if thread.name == 'sampling-profiler':
+            thread.join()
+    assert len(started) == 1
@@ -0,0 +1,80 @@
+import datetime
+import decimal
+import io
+
+import pytest
+
+from django.utils import timezone
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.serializers import DateTimeField
+
+from core import renderers
+from core.renderers import FastJSONParser, FastJSONRenderer
+from core.serializers import UTCDateTimeField
+
+
+DATA = {
+    'id': 1,
+    'title': 'Tarea ñandú  ',
+    'created_at': datetime.datetime(2026, 1, 2, 3, 4, 5, 678901, tzinfo=datetime.timezone.utc),
+    'due_date': datetime.date(2026, 1, 2),
+    'amount': decimal.Decimal('1.50'),
+    'tags': ['home', 'work'],
+    2: None,
+}
+
+
+@pytest.fixture(params=['orjson', 'stdlib'])
+def backend(request, monkeypatch):
+    if request.param == 'orjson':
+        pytest.importorskip('orjson')
+    else:
+        monkeypatch.setattr(renderers, 'orjson', None)
+    return request.param
+
+
+class TestFastJSONRenderer:
+    def test_same_output_as_drf(self, backend):
+        """Test la salida es idéntica a la del JSONRenderer de DRF"""
+        assert FastJSONRenderer().render(DATA) == JSONRenderer().render(DATA)
+
+    def test_indent(self, backend):
+        rendered = FastJSONRenderer().render(
+            DATA, 'application/json; indent=4'
+        )
+        assert rendered == JSONRenderer().render(DATA, 'application/json; indent=4')
+
+    def test_none(self, backend):
+        assert FastJSONRenderer().render(None) == b''
+
+
+class TestFastJSONParser:
+    def test_parse(self, backend):
+        body = '{"title": "ñandú", "tags": ["a"], "version": 2}'.encode()
+        assert FastJSONParser().parse(io.BytesIO(body)) == JSONParser().parse(
+            io.BytesIO(body)
+        )
+
+    @pytest.mark.parametrize('body', [b'{"title":', b'{"value": NaN}'])
+    def test_invalid(self, backend, body):
+        with pytest.raises(ParseError):
+            FastJSONParser().parse(io.BytesIO(body))
+
+
+class TestUTCDateTimeField:
+    @pytest.mark.parametrize('value', [
+        datetime.datetime(2026, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc),
+        datetime.datetime(2026, 1, 2, 3, 4, 5, 678901, tzinfo=datetime.timezone.utc),
+        datetime.datetime(2026, 1, 2, 3, 4, 5, tzinfo=datetime.timezone(datetime.timedelta(hours=-3))),
+        None,
+    ])
+    def test_same_output_as_drf(self, value):
+        assert UTCDateTimeField().to_representation(value) == DateTimeField().to_representation(value)
+
+    def test_other_timezone(self):
+        """Test con otra zona horaria activa se convierte como en DRF"""
+        value = datetime.datetime(2026, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc)
+        with timezone.override('America/Argentina/Buenos_Aires'):
+            assert UTCDateTimeField().to_representation(value) == '2026-01-02T00:04:05-03:00'
@@ -0,0 +1,83 @@
+import pytest
+
+from rest_framework.test import APIRequestFactory
+
+from core.models import ThrottleBucket
+from core.throttling import ScopedTokenBucketThrottle, WriteTokenBucketThrottle
+
+
+class View:
+    throttle_scope = 'test'
+
+
+@pytest.fixture
+def rates(settings):
+    settings.REST_FRAMEWORK = dict(
+        settings.REST_FRAMEWORK,
+        DEFAULT_THROTTLE_RATES={'test': '2/min'}
+    )
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(ScopedTokenBucketThrottle, 'timer', lambda self: now[0])
+    return now
+
+
+def anonymous_request(method='post'):
+    from django.contrib.auth.models import AnonymousUser
+
+    request = getattr(APIRequestFactory(), method)('/')
+    request.user = AnonymousUser()
+    return request
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('rates')
+class TestScopedTokenBucketThrottle:
+    def test_burst_up_to_capacity(self, clock):
+        """Test se permite una ráfaga de hasta N requests"""
+        throttle = ScopedTokenBucketThrottle()
+        request = anonymous_request()
+        assert throttle.allow_request(request, View())
+        assert throttle.allow_request(request, View())
+        assert not throttle.allow_request(request, View())
+        assert throttle.wait() == pytest.approx(30)
+
+    def test_refill(self, clock):
+        """Test los tokens se recargan a N por periodo"""
+        throttle = ScopedTokenBucketThrottle()
+        request = anonymous_request()
+        throttle.allow_request(request, View())
+        throttle.allow_request(request, View())
+
+        clock[0] += 30
+        assert throttle.allow_request(request, View())
+        assert not throttle.allow_request(request, View())
+
+    def test_view_without_scope(self, clock):
+        """Test las vistas sin scope no se limitan"""
+        throttle = ScopedTokenBucketThrottle()
+        request = anonymous_request()
+        for _ in range(5):
+            assert throttle.allow_request(request, object())
+
+    def test_write_throttle_ignores_reads(self, clock):
+        """Test las lecturas no consumen tokens"""
+        throttle = WriteTokenBucketThrottle()
+        for _ in range(5):
+            assert throttle.allow_request(anonymous_request('get'), View())
+        assert throttle.allow_request(anonymous_request(), View())
+
+    def test_buckets_are_shared(self, clock):
+        """Test el estado se guarda en la base y lo ven todas las instancias"""
+        request = anonymous_request()
+        ScopedTokenBucketThrottle().allow_request(request, View())
+        ScopedTokenBucketThrottle().allow_request(request, View())
+
+        throttle = ScopedTokenBucketThrottle()
+        assert not throttle.allow_request(request, View())
+        bucket = ThrottleBucket.objects.get()
+        assert bucket.tokens == pytest.approx(0)
+        assert bucket.expires_at == pytest.approx(clock[0] + 60)
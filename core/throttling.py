@@ -0,0 +1,109 @@
+from django.db import connections, router
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class ScopedTokenBucketThrottle(SimpleRateThrottle):
+    """
+    Token bucket por usuario (o IP si es anónimo) para las vistas que
+    definen `throttle_scope`. La tasa `N/periodo` de
+    `DEFAULT_THROTTLE_RATES` da una capacidad de N requests de ráfaga que
+    se recargan a N por periodo. El estado vive en la tabla
+    `throttle_buckets`, compartida entre workers, y se consume con un solo
+    upsert atómico por request (ver `take_token`).
+    """
+    cache_format = 'throttle:%(scope)s:%(ident)s'
+
+    def __init__(self):
+        # El scope depende de la vista, se resuelve en allow_request
+        pass
+
+    def get_rate(self):
+        return api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+
+    def allow_request(self, request, view):
+        self.scope = getattr(view, 'throttle_scope', None)
+        if not self.scope:
+            return True
+        self.rate = self.get_rate()
+        if self.rate is None:
+            return True
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        now = self.timer()
+        capacity = self.num_requests
+        self.refill_rate = capacity / self.duration
+        self.tokens, granted = take_token(
+            self.key, capacity, self.refill_rate, now, self.duration
+        )
+        return granted
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            ident = request.user.pk
+        else:
+            ident = self.get_ident(request)
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+
+    def get_ident(self, request):
+        """
+        IP del cliente según nginx (REMOTE_ADDR). No usa X-Forwarded-For:
+        lo envía el cliente y con un valor distinto en cada request tendría
+        un bucket nuevo cada vez.
+        """
+        return request.META.get('REMOTE_ADDR')
+
+    def wait(self):
+        return (1 - self.tokens) / self.refill_rate
+
+
+class WriteTokenBucketThrottle(ScopedTokenBucketThrottle):
+    """
+    Igual que ScopedTokenBucketThrottle pero solo limita los métodos de
+    escritura; las lecturas no consumen tokens.
+    """
+    def allow_request(self, request, view):
+        if request.method in SAFE_METHODS:
+            return True
+        return super().allow_request(request, view)
+
+
+def take_token(key, capacity, refill_rate, now, duration):
+    """
+    Recarga el bucket `key` según el tiempo transcurrido y, si tiene al
+    menos un token, lo consume. Es un único `INSERT ... ON CONFLICT DO
+    UPDATE ... RETURNING`: la base serializa los requests concurrentes
+    sobre la misma fila. Devuelve (tokens que quedan, si se permitió).
+    """
+    from .models import ThrottleBucket
+
+    using = router.db_for_write(ThrottleBucket)
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    table = quote(ThrottleBucket._meta.db_table)
+    refilled = f'LEAST(%s, {table}.tokens + (%s - {table}.updated_at) * %s)'
+    refill_params = [capacity, now, refill_rate]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {table} (key, tokens, granted, updated_at, expires_at)'
+            f' VALUES (%s, %s, %s, %s, %s)'
+            f' ON CONFLICT (key) DO UPDATE SET'
+            f' tokens = CASE WHEN {refilled} >= 1'
+            f' THEN {refilled} - 1 ELSE {refilled} END,'
+            f' granted = {refilled} >= 1,'
+            f' updated_at = EXCLUDED.updated_at,'
+            f' expires_at = EXCLUDED.expires_at'
+            f' RETURNING tokens, granted',
+            [
+                key, capacity - 1, True, now, now + duration,
+                *refill_params, *refill_params, *refill_params,
+                *refill_params,
+            ],
+        )
+        tokens, granted = cursor.fetchone()
+    return tokens, bool(granted)
@@ -0,0 +1,9 @@
+from django.urls import path
+
+from .views import healthz_view, metrics_view, readyz_view
+
+urlpatterns = [
+    path('metrics', metrics_view, name='metrics'),
+    path('healthz', healthz_view, name='healthz'),
+    path('readyz', readyz_view, name='readyz'),
+]
@@ -0,0 +1,34 @@
+from django.http import HttpResponse, JsonResponse
+
+from . import health, metrics
+
+
+def metrics_view(request):
+    """
+    Métricas agregadas de todos los workers en formato Prometheus
+    """
+    body = metrics.render_prometheus(metrics.store.collect())
+    return HttpResponse(
+        body,
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
+
+
+def healthz_view(request):
+    """
+    Liveness: el proceso atiende requests. No toca la base.
+    """
+    return JsonResponse({'status': 'ok'})
+
+
+def readyz_view(request):
+    """
+    Readiness: la base responde y no hay migraciones pendientes. Responde
+    503 mientras alguno de los chequeos falle.
+    """
+    checks = health.readiness()
+    ready = all(checks.values())
+    return JsonResponse(
+        {'status': 'ready' if ready else 'unavailable', 'checks': checks},
+        status=200 if ready else 503
+    )
@@ -0,0 +1 @@
+from .dev import *  # noqa: F401,F403
@@ -0,0 +1,355 @@
+"""
+Django settings for setup project: configuración común a todos los
+entornos. Cada entorno tiene su módulo (dev, prod, bench) que parte de
+este; `setup.settings` equivale a `setup.settings.dev`.
+
+Generated by 'django-admin startproject' using Django 5.1.2.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/5.1/topics/settings/
+
+For the full list of settings and their values, see
+https://docs.djangoproject.com/en/5.1/ref/settings/
+"""
+
+from pathlib import Path
+from decouple import Csv, config
+from datetime import timedelta
+
+# Build paths inside the project like this: BASE_DIR / 'subdir'.
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+
+# SECURITY WARNING: keep the secret key used in production secret!
+SECRET_KEY = config('SECRET_KEY', default="", cast=str)
+
+# SECURITY WARNING: don't run with debug turned on in production!
+# Con DEBUG cada conexión guarda todas sus queries en `connection.queries`
+DEBUG = False
+
+ALLOWED_HOSTS = config('ALLOWED_HOSTS', default='*', cast=Csv())
+
+
+# Application definition
+
+INSTALLED_APPS = [
+    # Sin autodiscover al arrancar: se hace al primer request al admin
+    # (ver setup.urls)
+    'django.contrib.admin.apps.SimpleAdminConfig',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    # Índices con operator class (ver users.models) y AddIndexConcurrently
+    'django.contrib.postgres',
+    'rest_framework',
+    'rest_framework_simplejwt',
+    'rest_framework_simplejwt.token_blacklist',
+    # local apps
+    'core',
+    'users',
+    'tasks'
+]
+
+MIDDLEWARE = [
+    'core.middleware.RequestLogMiddleware',
+    'core.middleware.ProfilingMiddleware',
+    'core.middleware.MetricsMiddleware',
+    'core.middleware.CompressionMiddleware',
+    'core.middleware.LoadSheddingMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'core.middleware.AdminMiddleware',
+]
+
+# Middleware que solo corren en el admin (ver core.middleware.AdminMiddleware):
+# la API autentica con JWT y no usa sesión, CSRF ni mensajes.
+ADMIN_MIDDLEWARE = [
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+ADMIN_MIDDLEWARE_PATHS = ['/admin/']
+# Por debajo de esta cantidad estimada de filas el admin cuenta exacto
+# (ver core.paginator.EstimatedCountPaginator)
+ADMIN_EXACT_COUNT_THRESHOLD = 10000
+# Los checks del admin buscan estos middleware en MIDDLEWARE
+SILENCED_SYSTEM_CHECKS = ['admin.E408', 'admin.E409', 'admin.E410']
+
+ROOT_URLCONF = 'setup.urls'
+AUTH_USER_MODEL = "users.Users"
+
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [],
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.debug',
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+            ],
+        },
+    },
+]
+
+WSGI_APPLICATION = 'setup.wsgi.application'
+
+
+# Database
+# https://docs.djangoproject.com/en/5.1/ref/settings/#databases
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': config('POSTGRES_DB', default='todo_db'),
+        'USER': config('POSTGRES_USER', default='postgres'),
+        'PASSWORD': config('POSTGRES_PASSWORD', default='postgres'),
+        'HOST': config('POSTGRES_HOST', default='db'),
+        'PORT': config('POSTGRES_PORT', default='5432'),
+    }
+}
+
+
+# Password validation
+# https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
+    },
+]
+
+
+# Internationalization
+# https://docs.djangoproject.com/en/5.1/topics/i18n/
+
+LANGUAGE_CODE = 'en-us'
+
+TIME_ZONE = 'UTC'
+
+USE_I18N = True
+
+USE_TZ = True
+
+
+# Static files (CSS, JavaScript, Images)
+# https://docs.djangoproject.com/en/5.1/howto/static-files/
+
+STATIC_URL = 'static/'
+
+# Default primary key field type
+# https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
+
+DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+REST_FRAMEWORK = {
+    'DEFAULT_AUTHENTICATION_CLASSES': (
+        'rest_framework_simplejwt.authentication.JWTAuthentication',
+    ),
+    # Usan orjson si está instalado; si no, el JSON de DRF
+    'DEFAULT_RENDERER_CLASSES': (
+        'core.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'core.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
+    'DEFAULT_THROTTLE_RATES': {
+        'register': config('THROTTLE_RATE_REGISTER', default='5/min'),
+        'login': config('THROTTLE_RATE_LOGIN', default='10/min'),
+        'task_write': config('THROTTLE_RATE_TASK_WRITE', default='120/min'),
+    },
+}
+
+# Idempotency-Key
+# Las respuestas se guardan en la tabla idempotency_keys (ver
+# core.idempotency); las vencidas se borran con `manage.py purge_expired`
+IDEMPOTENCY_TTL = config('IDEMPOTENCY_TTL', default=60 * 60 * 24, cast=int)
+# Cuánto se considera "en curso" un request antes de permitir reintentarlo
+IDEMPOTENCY_LOCK_TTL = 60
+
+# Startup
+# Precarga URLs, vistas y clases de DRF en el master de uWSGI antes del
+# fork (ver core.preload)
+WSGI_PRELOAD = config('WSGI_PRELOAD', default=True, cast=bool)
+# Warm-up de cada worker después del fork (ver core.health.warm_up)
+WARM_UP_PATHS = ['/api/tasks/', '/api/tasks/1/']
+WARM_UP_SERIALIZERS = [
+    'tasks.serializers.TaskSerializer',
+    'tasks.serializers.WorkspaceSerializer',
+]
+
+# Compresión de respuestas
+# Las respuestas más chicas se envían sin comprimir
+COMPRESSION_MIN_SIZE = config('COMPRESSION_MIN_SIZE', default=1024, cast=int)
+# Niveles elegidos con benchmarks/test_compression.py: ganan casi todo el
+# tamaño de los niveles altos con una fracción del CPU
+COMPRESSION_LEVELS = {
+    'gzip': config('COMPRESSION_LEVEL_GZIP', default=6, cast=int),
+    'br': config('COMPRESSION_LEVEL_BR', default=4, cast=int),
+    'zstd': config('COMPRESSION_LEVEL_ZSTD', default=3, cast=int),
+}
+
+# Load shedding
+LOAD_SHEDDING_ENABLED = config('LOAD_SHEDDING_ENABLED', default=True, cast=bool)
+LOAD_SHEDDING_MAX_QUEUE_MS = config(
+    'LOAD_SHEDDING_MAX_QUEUE_MS',
+    default=2000,
+    cast=int
+)
+LOAD_SHEDDING_MAX_BACKLOG = config(
+    'LOAD_SHEDDING_MAX_BACKLOG',
+    default=64,
+    cast=int
+)
+LOAD_SHEDDING_RETRY_AFTER = 5
+LOAD_SHEDDING_EXEMPT_PATHS = ['/metrics', '/healthz', '/readyz', '/admin/']
+
+# Simple JWT settings
+ACCESS_TOKEN_LIFETIME_MINUTES = config(
+    "ACCESS_TOKEN_LIFETIME_MINUTES",
+    default=60,
+    cast=int
+)
+REFRESH_TOKEN_LIFETIME_DAYS = config(
+    "REFRESH_TOKEN_LIFETIME_DAYS",
+    default=1,
+    cast=int
+)
+SIMPLE_JWT = {
+    'AUTH_HEADER_TYPES': ('Bearer',),
+    "ACCESS_TOKEN_LIFETIME": timedelta(minutes=ACCESS_TOKEN_LIFETIME_MINUTES),
+    "REFRESH_TOKEN_LIFETIME": timedelta(days=REFRESH_TOKEN_LIFETIME_DAYS),
+    "ROTATE_REFRESH_TOKENS": True,
+    "BLACKLIST_AFTER_ROTATION": True,
+    "UPDATE_LAST_LOGIN": True,
+}
+
+# Logging
+# Logs JSON por stderr a través de una cola, para no bloquear los requests.
+LOG_LEVEL = config('LOG_LEVEL', default='INFO')
+LOG_REQUEST_SAMPLE_RATE = config(
+    'LOG_REQUEST_SAMPLE_RATE',
+    default=1.0,
+    cast=float
+)
+LOG_SLOW_REQUEST_MS = config('LOG_SLOW_REQUEST_MS', default=500, cast=int)
+LOG_SLOW_QUERY_MS = config('LOG_SLOW_QUERY_MS', default=100, cast=int)
+LOG_SLOW_QUERY_SAMPLE_RATE = config(
+    'LOG_SLOW_QUERY_SAMPLE_RATE',
+    default=1.0,
+    cast=float
+)
+LOG_SLOW_QUERY_MAX_SQL = 2000
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'filters': {
+        'request_context': {
+            '()': 'core.logs.RequestContextFilter',
+        },
+    },
+    'formatters': {
+        'json': {
+            '()': 'core.logs.JsonFormatter',
+        },
+    },
+    'handlers': {
+        'console': {
+            'class': 'core.logs.QueueStreamHandler',
+            'formatter': 'json',
+            'filters': ['request_context'],
+        },
+    },
+    'root': {
+        'handlers': ['console'],
+        'level': LOG_LEVEL,
+    },
+    'loggers': {
+        'django': {
+            'level': LOG_LEVEL,
+        },
+    },
+}
+
+# Metrics
+# Con METRICS_DIR cada worker vuelca sus métricas a un archivo y /metrics
+# agrega los de todos los procesos.
+METRICS_DIR = config('METRICS_DIR', default='')
+METRICS_FLUSH_INTERVAL = config('METRICS_FLUSH_INTERVAL', default=5, cast=int)
+METRICS_SERVER_TIMING = config('METRICS_SERVER_TIMING', default=True, cast=bool)
+
+# Profiling
+# Perfiles de requests (staff, `X-Profile: 1`) y stacks del profiler por
+# muestreo, uno por worker (ver core.profiling)
+PROFILING_DIR = config('PROFILING_DIR', default='/tmp/todo-profiles')
+PROFILING_SAMPLER = config('PROFILING_SAMPLER', default=False, cast=bool)
+PROFILING_SAMPLE_INTERVAL = config(
+    'PROFILING_SAMPLE_INTERVAL',
+    default=0.01,
+    cast=float
+)
+PROFILING_FLUSH_INTERVAL = config(
+    'PROFILING_FLUSH_INTERVAL',
+    default=30,
+    cast=int
+)
+
+# Subtasks
+# Límite de anidamiento: el camino materializado de las tareas está
+# indexado y un índice btree de Postgres no admite entradas muy largas.
+TASK_MAX_DEPTH = 100
+
+# Tags
+# Máximo de etiquetas por tarea y de etiquetas en el filtro `?tags=`
+TASK_MAX_TAGS = 20
+
+# Recurring tasks
+# Máximo de días de la ventana de `GET /api/tasks/occurrences/`
+TASK_OCCURRENCES_MAX_DAYS = 92
+
+# Task stats
+# Máximo de días del rango de `GET /api/tasks/stats/`
+TASK_STATS_MAX_DAYS = 366
+
+# Batch
+# Máximo de operaciones por request a `POST /api/batch/`
+BATCH_MAX_OPERATIONS = config('BATCH_MAX_OPERATIONS', default=50, cast=int)
+
+# Task events (SSE)
+# "local" solo notifica dentro del proceso; "postgres" usa LISTEN/NOTIFY
+# para llevar los eventos de los workers de uWSGI, que escriben, al
+# proceso ASGI que sirve el stream.
+TASK_EVENTS_BACKEND = config('TASK_EVENTS_BACKEND', default='local')
+TASK_EVENTS_PG_CHANNEL = 'task_events'
+TASK_EVENTS_HEARTBEAT = config('TASK_EVENTS_HEARTBEAT', default=15, cast=int)
+TASK_EVENTS_MAX_STREAM_SECONDS = config(
+    'TASK_EVENTS_MAX_STREAM_SECONDS',
+    default=300,
+    cast=int
+)
+TASK_EVENTS_RETRY_MS = 3000
+TASK_EVENTS_QUEUE_SIZE = 100
+# Vigencia del registro de canales escuchados (task_event_channels), que
+# cada proceso ASGI renueva mientras tenga clientes, y cada cuánto lo
+# releen los workers que publican eventos
+TASK_EVENTS_CHANNEL_TTL = 30
+TASK_EVENTS_CHANNELS_CACHE_SECONDS = 2
@@ -0,0 +1,9 @@
+"""
+Benchmarks y pruebas de carga: la configuración de producción sin los
+límites que cortarían la carga generada (throttling y load shedding).
+"""
+from .prod import *  # noqa: F401,F403
+from .prod import REST_FRAMEWORK
+
+REST_FRAMEWORK = {**REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': {}}
+LOAD_SHEDDING_ENABLED = False
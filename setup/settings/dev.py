@@ -0,0 +1,7 @@
+"""
+Desarrollo local y tests: DEBUG activo salvo que se desactive por entorno.
+"""
+from .base import *  # noqa: F401,F403
+from .base import config
+
+DEBUG = config('DEBUG', default=True, cast=bool)
@@ -0,0 +1,37 @@
+"""
+Producción (uWSGI). Valida con `python manage.py check --deploy --tag
+performance`, que falla si queda activa alguna opción que degrada la
+performance (ver core.checks).
+"""
+from .base import *  # noqa: F401,F403
+from .base import DATABASES, TEMPLATES, config
+
+DEBUG = False
+
+# Conexiones persistentes por worker, verificadas antes de reusarlas
+CONN_MAX_AGE = config('CONN_MAX_AGE', default=60, cast=int)
+DATABASES = {
+    alias: {**database, 'CONN_MAX_AGE': CONN_MAX_AGE, 'CONN_HEALTH_CHECKS': True}
+    for alias, database in DATABASES.items()
+}
+
+# El stream de eventos lo sirve el proceso ASGI (uvicorn): los eventos
+# de los workers de uWSGI le llegan por LISTEN/NOTIFY
+TASK_EVENTS_BACKEND = config('TASK_EVENTS_BACKEND', default='postgres')
+
+# Templates compilados una sola vez por worker
+TEMPLATES = [
+    {
+        **TEMPLATES[0],
+        'APP_DIRS': False,
+        'OPTIONS': {
+            **TEMPLATES[0]['OPTIONS'],
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
+        },
+    },
+]
@@ -1,12 +1,30 @@
-from django.contrib import admin
 from django.urls import path
+from django.utils.functional import cached_property
 
+from core.urls import urlpatterns as core_urls
 from users.urls import urlpatterns as users_urls
 from tasks.urls import urlpatterns as tasks_urls
 
+
+class LazyAdminURLConf:
+    """
+    URLconf del admin que importa los `admin.py` de las apps (autodiscover)
+    y arma las URLs del admin recién cuando se resuelve una URL bajo
+    /admin/, así los workers que solo atienden la API no lo hacen.
+    """
+    @cached_property
+    def urlpatterns(self):
+        from django.contrib import admin
+
+        admin.autodiscover()
+        return admin.site.urls[0]
+
+
 urlpatterns = [
-    path('admin/', admin.site.urls),
+    # Una tupla en lugar de include(), que evaluaría las URLs en el momento
+    path('admin/', (LazyAdminURLConf(), 'admin', 'admin')),
 ]
 
+urlpatterns += core_urls
 urlpatterns += users_urls
 urlpatterns += tasks_urls
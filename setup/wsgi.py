@@ -9,8 +9,16 @@ https://docs.djangoproject.com/en/5.1/howto/deployment/wsgi/
 
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'setup.settings')
 
 application = get_wsgi_application()
+
+from core.health import register_warm_up  # noqa: E402
+from core.preload import preload  # noqa: E402
+
+if settings.WSGI_PRELOAD:
+    preload()
+register_warm_up()
@@ -1,19 +1,17 @@
 #!/bin/bash
 set -e
 
-echo "Waiting for postgres..."
-while ! nc -z db 5432; do
-  sleep 0.1
-done
-echo "PostgreSQL started"
-
 mkdir -p /var/log/supervisor
 mkdir -p /var/log/django
 mkdir -p /var/log/gunicorn
 
-echo "Applying migrations..."
-python manage.py makemigrations
-python manage.py migrate
+echo "Checking settings..."
+python manage.py check --deploy --tag performance
+
+# Las migraciones las aplica el job `migrate` (manage.py migrate_locked);
+# acá solo se espera a que la base tenga el esquema al día.
+echo "Waiting for the database schema..."
+python manage.py wait_for_schema --timeout "${SCHEMA_WAIT_TIMEOUT:-300}"
 
 echo "Starting supervisord..."
 exec /usr/bin/supervisord -n -c /etc/supervisor/conf.d/supervisord.conf
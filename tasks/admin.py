@@ -0,0 +1,26 @@
+from django.contrib import admin
+
+from core.paginator import EstimatedCountPaginator
+from .models import Task
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    """
+    Listado pensado para millones de tareas: sin COUNT(*) de la tabla, el
+    usuario en el mismo SELECT, filtros y orden resueltos por índices
+    (status/priority con id, y user desde el admin de usuarios) y widgets
+    que no cargan todas las filas relacionadas.
+    """
+    list_display = (
+        'id', 'title', 'user', 'status', 'priority', 'created_at', 'completed_at'
+    )
+    list_select_related = ('user',)
+    list_filter = ('status', 'priority')
+    ordering = ('-id',)
+    sortable_by = ('id',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    autocomplete_fields = ('user',)
+    raw_id_fields = ('parent', 'series', 'workspace', 'tags')
+    readonly_fields = ('created_at', 'updated_at', 'version', 'path')
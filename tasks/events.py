@@ -0,0 +1,340 @@
+import asyncio
+import json
+import select
+import threading
+import time
+import logging
+from collections import defaultdict, deque
+from datetime import timedelta
+from itertools import count
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import TaskEventChannel
+
+
+logger = logging.getLogger(__name__)
+
+# pg_notify rechaza payloads de más de 8000 bytes
+PG_NOTIFY_MAX_PAYLOAD = 7900
+
+
+def user_channel(user_id):
+    return f'user:{user_id}'
+
+
+def workspace_channel(workspace_id):
+    return f'workspace:{workspace_id}'
+
+
+class Subscription:
+    """
+    Cola de eventos de un cliente conectado al stream. Los eventos llegan
+    desde cualquier hilo (el listener de Postgres o el que confirmó la
+    transacción) y se consumen desde el event loop del servidor ASGI.
+    Si el cliente no consume a tiempo se descartan eventos y se marca
+    `overflowed` para que el stream le pida resincronizar.
+    """
+    def __init__(self, broker, channels, maxsize):
+        self.broker = broker
+        self.channels = frozenset(channels)
+        self.maxsize = maxsize
+        self.overflowed = False
+        self._events = deque()
+        self._lock = threading.Lock()
+        self._loop = None
+        self._ready = None
+
+    def put(self, event):
+        with self._lock:
+            if len(self._events) >= self.maxsize:
+                self.overflowed = True
+                return
+            self._events.append(event)
+            loop, ready = self._loop, self._ready
+        if loop is not None:
+            try:
+                loop.call_soon_threadsafe(ready.set)
+            except RuntimeError:
+                # El loop ya se cerró: el cliente se desconectó
+                pass
+
+    def get_nowait(self):
+        with self._lock:
+            return self._events.popleft() if self._events else None
+
+    async def get(self, timeout):
+        """Próximo evento, o None si no llega ninguno en `timeout` segundos"""
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.get_running_loop()
+                self._ready = asyncio.Event()
+        while True:
+            self._ready.clear()
+            event = self.get_nowait()
+            if event is not None:
+                return event
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return self.get_nowait()
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class EventBroker:
+    """
+    Fan-out en memoria de eventos de tareas hacia las suscripciones
+    del proceso actual.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = defaultdict(set)
+        self._ids = count(1)
+
+    def subscribe(self, channels, maxsize=None):
+        if maxsize is None:
+            maxsize = settings.TASK_EVENTS_QUEUE_SIZE
+        subscription = Subscription(self, channels, maxsize)
+        with self._lock:
+            for channel in subscription.channels:
+                self._subscriptions[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for channel in subscription.channels:
+                subscribers = self._subscriptions.get(channel)
+                if subscribers is None:
+                    continue
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscriptions[channel]
+
+    def has_subscribers(self, channel):
+        return channel in self._subscriptions
+
+    def channels(self):
+        with self._lock:
+            return list(self._subscriptions)
+
+    def dispatch(self, channel, event):
+        with self._lock:
+            subscribers = list(self._subscriptions.get(channel, ()))
+        if not subscribers:
+            return
+        event = dict(event, id=next(self._ids))
+        for subscription in subscribers:
+            subscription.put(event)
+
+
+broker = EventBroker()
+
+
+class PostgresListener(threading.Thread):
+    """
+    Hilo que escucha NOTIFY en Postgres y reenvía los eventos al broker
+    local, de modo que todos los workers reciben los cambios hechos por
+    cualquier otro proceso.
+    """
+    daemon = True
+
+    def __init__(self, channel):
+        super().__init__(name='task-events-listener')
+        self.channel = channel
+        self.renewed = 0.0
+
+    def run(self):
+        while True:
+            try:
+                self.listen()
+            except Exception:
+                logger.exception('Task events listener failed, reconnecting')
+                time.sleep(1)
+
+    def listen(self):
+        conn = connection.get_new_connection(
+            connection.get_connection_params()
+        )
+        conn.autocommit = True
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(f'LISTEN "{self.channel}"')
+            renew_every = settings.TASK_EVENTS_CHANNEL_TTL / 3
+            while True:
+                if time.monotonic() - self.renewed >= renew_every:
+                    self.renew_channels(conn)
+                if select.select([conn], [], [], renew_every) == ([], [], []):
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    self.forward(conn.notifies.pop(0).payload)
+        finally:
+            conn.close()
+
+    def renew_channels(self, conn):
+        """
+        Extiende la vigencia en `task_event_channels` de los canales con
+        clientes conectados a este proceso y borra los vencidos.
+        """
+        self.renewed = time.monotonic()
+        channels = broker.channels()
+        with conn.cursor() as cursor:
+            if channels:
+                register_channels(cursor, channels)
+            cursor.execute(
+                'DELETE FROM task_event_channels WHERE expires_at < now()'
+            )
+
+    def forward(self, payload):
+        try:
+            message = json.loads(payload)
+            broker.dispatch(message['channel'], message['event'])
+        except (ValueError, KeyError):
+            logger.warning('Invalid task event payload: %r', payload)
+
+
+_listener = None
+_listener_lock = threading.Lock()
+
+
+def register_channels(cursor, channels):
+    """
+    Marca los canales como escuchados durante TASK_EVENTS_CHANNEL_TTL
+    segundos, con un solo INSERT ... ON CONFLICT.
+    """
+    expires_at = timezone.now() + timedelta(
+        seconds=settings.TASK_EVENTS_CHANNEL_TTL
+    )
+    values = ', '.join(['(%s, %s)'] * len(channels))
+    cursor.execute(
+        f'INSERT INTO task_event_channels (channel, expires_at) VALUES {values}'
+        f' ON CONFLICT (channel) DO UPDATE SET expires_at = EXCLUDED.expires_at',
+        [param for channel in channels for param in (channel, expires_at)],
+    )
+
+
+def subscribe(channels):
+    """
+    Suscribe a los canales. Con el backend de Postgres los registra para
+    que los demás procesos empiecen a notificarlos (ver has_listeners).
+    """
+    subscription = broker.subscribe(channels)
+    if uses_postgres():
+        with connection.cursor() as cursor:
+            register_channels(cursor, sorted(subscription.channels))
+    return subscription
+
+
+_listened = (0.0, frozenset())
+_listened_lock = threading.Lock()
+
+
+def listened_channels():
+    """
+    Canales con algún cliente conectado en cualquier proceso, según
+    `task_event_channels`. Se relee cada TASK_EVENTS_CHANNELS_CACHE_SECONDS
+    segundos por proceso.
+    """
+    global _listened
+    refreshed, channels = _listened
+    if time.monotonic() - refreshed < settings.TASK_EVENTS_CHANNELS_CACHE_SECONDS:
+        return channels
+    with _listened_lock:
+        channels = frozenset(
+            TaskEventChannel.objects.filter(
+                expires_at__gt=timezone.now()
+            ).values_list('channel', flat=True)
+        )
+        _listened = (time.monotonic(), channels)
+    return channels
+
+
+def has_listeners(channels):
+    """
+    Si algún cliente escucha alguno de los canales. Sin listeners no se
+    serializa ni se notifica el evento.
+    """
+    if uses_postgres():
+        return not listened_channels().isdisjoint(channels)
+    return any(broker.has_subscribers(channel) for channel in channels)
+
+
+def uses_postgres():
+    return settings.TASK_EVENTS_BACKEND == 'postgres'
+
+
+def ensure_listener():
+    global _listener
+    if not uses_postgres():
+        return
+    with _listener_lock:
+        if _listener is None or not _listener.is_alive():
+            _listener = PostgresListener(settings.TASK_EVENTS_PG_CHANNEL)
+            _listener.start()
+
+
+def _send(channel, event):
+    if not uses_postgres():
+        broker.dispatch(channel, event)
+        return
+    payload = json.dumps({'channel': channel, 'event': event})
+    if len(payload.encode()) > PG_NOTIFY_MAX_PAYLOAD:
+        event = {key: value for key, value in event.items() if key != 'task'}
+        payload = json.dumps({'channel': channel, 'event': event})
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT pg_notify(%s, %s)',
+            [settings.TASK_EVENTS_PG_CHANNEL, payload]
+        )
+
+
+def publish(channels, event):
+    """
+    Publica un evento en los canales indicados una vez confirmada la
+    transacción en curso, para no notificar cambios que luego se revierten.
+    `event` puede ser una función, que se evalúa recién al confirmar.
+    """
+    def send():
+        payload = event() if callable(event) else event
+        for channel in channels:
+            _send(channel, payload)
+
+    transaction.on_commit(send)
+
+
+def format_sse(event):
+    data = json.dumps(event, separators=(',', ':'))
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {data}\n\n"
+
+
+async def stream(subscription, heartbeat=None, max_duration=None):
+    """
+    Generador asíncrono de mensajes SSE para una suscripción: mientras
+    espera eventos no ocupa ningún hilo del servidor ASGI. Corta el stream
+    tras `max_duration` segundos para que el cliente reconecte.
+    """
+    if heartbeat is None:
+        heartbeat = settings.TASK_EVENTS_HEARTBEAT
+    if max_duration is None:
+        max_duration = settings.TASK_EVENTS_MAX_STREAM_SECONDS
+    deadline = time.monotonic() + max_duration
+    try:
+        yield f'retry: {settings.TASK_EVENTS_RETRY_MS}\n\n'
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            event = await subscription.get(timeout=min(heartbeat, remaining))
+            if subscription.overflowed:
+                subscription.overflowed = False
+                yield 'event: resync\ndata: {}\n\n'
+            if event is None:
+                yield ': keep-alive\n\n'
+            else:
+                yield format_sse(event)
+    finally:
+        subscription.close()
@@ -0,0 +1,10 @@
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class VersionConflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = (
+        'The task was modified by another request. Reload it and retry.'
+    )
+    default_code = 'version_conflict'
@@ -0,0 +1,60 @@
+from django.core import exceptions
+from django.db import models
+
+
+class CodedChoiceField(models.Field):
+    """
+    Choice de texto guardado como SMALLINT. Desde Python (modelo, filtros,
+    serializers) se usa el valor de texto; solo la base ve el código, que
+    ocupa 2 bytes por fila y por entrada de índice en lugar del string.
+
+        status = CodedChoiceField(
+            codes={'pending': 1, 'completed': 2},
+            choices=[('pending', 'Pending'), ('completed', 'Completed')],
+        )
+
+    Los códigos definen el orden de la columna en ORDER BY y en los índices.
+    """
+    description = 'Text choice stored as a small integer code'
+
+    def __init__(self, *args, codes=None, **kwargs):
+        self.codes = dict(codes or {})
+        self.names = {code: name for name, code in self.codes.items()}
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        kwargs['codes'] = self.codes
+        return name, path, args, kwargs
+
+    def get_internal_type(self):
+        return 'SmallIntegerField'
+
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return value
+        return self.names.get(value, value)
+
+    def to_python(self, value):
+        if value is None or value in self.codes:
+            return value
+        if value in self.names:
+            return self.names[value]
+        raise exceptions.ValidationError(
+            self.error_messages['invalid_choice'],
+            code='invalid_choice',
+            params={'value': value},
+        )
+
+    def get_prep_value(self, value):
+        value = super().get_prep_value(value)
+        if value is None or value in self.names:
+            return value
+        try:
+            return self.codes[value]
+        except (KeyError, TypeError):
+            raise exceptions.ValidationError(
+                self.error_messages['invalid_choice'],
+                code='invalid_choice',
+                params={'value': value},
+            )
@@ -0,0 +1,122 @@
+from django.core.management.base import BaseCommand
+from django.db import connections, router, transaction
+
+from tasks import rollups
+from tasks.models import Task, TaskCompletionTimes, TaskDailyStats, TaskStatsRebuild
+
+
+ROLLUP_MODELS = (TaskDailyStats, TaskCompletionTimes)
+
+
+class Command(BaseCommand):
+    help = (
+        'Reconstruye los rollups diarios (task_daily_stats y '
+        'task_completion_times) a partir de las tareas existentes, '
+        'recorriéndolas por id en lotes.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size', type=int, default=5000,
+            help='Tareas por lote',
+        )
+
+    def handle(self, *args, chunk_size, verbosity, **options):
+        using = router.db_for_write(TaskDailyStats)
+        # Los rollups se arman en tablas aparte, con una transacción por
+        # lote: /stats sigue leyendo los anteriores y las escrituras de
+        # tareas no esperan al comando más que lo que dura un lote. Las que
+        # llegan mientras tanto aplican sus deltas también en las tablas
+        # nuevas si el comando ya recorrió la tarea (ver
+        # rollups.rebuilt_until); si no, la cuenta el comando al llegar.
+        self.start(using)
+        processed = 0
+        while True:
+            with transaction.atomic(using=using):
+                rebuild = (
+                    TaskStatsRebuild.objects.using(using)
+                    .select_for_update()
+                    .get()
+                )
+                count = self.process_chunk(using, rebuild, chunk_size)
+                if not count:
+                    # En la misma transacción que el último lote vacío: las
+                    # tareas nuevas que no vio el comando aplican sus deltas
+                    # después, sobre los rollups ya reconstruidos
+                    self.finish(using)
+                    break
+            processed += count
+            if verbosity > 1:
+                self.stdout.write(
+                    f'{processed} tasks processed (id {rebuild.last_task_id}).'
+                )
+
+        if verbosity:
+            self.stdout.write(f'Task stats rebuilt from {processed} tasks.')
+
+    def start(self, using):
+        """
+        Crea las tablas vacías y la fila de avance. Espera a que terminen
+        las escrituras de tareas en curso: las siguientes ya ven la fila.
+        """
+        connection = connections[using]
+        quote = connection.ops.quote_name
+        with transaction.atomic(using=using), connection.cursor() as cursor:
+            cursor.execute(
+                f'LOCK TABLE {quote(Task._meta.db_table)} IN SHARE MODE'
+            )
+            for model in ROLLUP_MODELS:
+                table = model._meta.db_table
+                rebuilt = quote(table + rollups.REBUILD_SUFFIX)
+                cursor.execute(f'DROP TABLE IF EXISTS {rebuilt}')
+                cursor.execute(
+                    f'CREATE UNLOGGED TABLE {rebuilt} '
+                    f'(LIKE {quote(table)} INCLUDING ALL)'
+                )
+            TaskStatsRebuild.objects.using(using).all().delete()
+            TaskStatsRebuild.objects.using(using).create()
+
+    def process_chunk(self, using, rebuild, chunk_size):
+        """Suma a las tablas nuevas el siguiente lote de tareas"""
+        rows = list(
+            Task.objects.using(using)
+            .filter(id__gt=rebuild.last_task_id)
+            .order_by('id')
+            .values_list('id', 'user_id', 'created_at', 'status', 'completed_at')
+            [:chunk_size]
+        )
+        if not rows:
+            return 0
+        deltas = rollups.Deltas()
+        for _, user_id, created_at, status, completed_at in rows:
+            deltas.created(user_id, created_at)
+            if status == 'completed' and completed_at is not None:
+                deltas.completed(user_id, created_at, completed_at)
+        deltas.write(using, rollups.REBUILD_SUFFIX)
+        rebuild.last_task_id = rows[-1][0]
+        rebuild.save(using=using, update_fields=['last_task_id'])
+        return len(rows)
+
+    def finish(self, using):
+        """
+        Reemplaza los rollups por los reconstruidos. Copia filas de
+        rollups, no de tareas, así que es corto comparado con el recorrido.
+        """
+        connection = connections[using]
+        quote = connection.ops.quote_name
+        with connection.cursor() as cursor:
+            for model in ROLLUP_MODELS:
+                table = quote(model._meta.db_table)
+                rebuilt = quote(model._meta.db_table + rollups.REBUILD_SUFFIX)
+                columns = ', '.join(
+                    quote(field.column)
+                    for field in model._meta.concrete_fields
+                    if not field.primary_key
+                )
+                cursor.execute(f'DELETE FROM {table}')
+                cursor.execute(
+                    f'INSERT INTO {table} ({columns}) '
+                    f'SELECT {columns} FROM {rebuilt}'
+                )
+                cursor.execute(f'DROP TABLE {rebuilt}')
+        TaskStatsRebuild.objects.using(using).all().delete()
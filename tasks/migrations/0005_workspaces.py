@@ -0,0 +1,55 @@
+# Generated by Django 5.0 on 2026-10-18 22:33
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0004_tags'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Workspace',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='owned_workspaces', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Workspace',
+                'verbose_name_plural': 'Workspaces',
+                'db_table': 'workspaces',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='workspace',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='tasks', to='tasks.workspace'),
+        ),
+        migrations.CreateModel(
+            name='WorkspaceMembership',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('role', models.CharField(choices=[('owner', 'Owner'), ('member', 'Member')], default='member', max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='workspace_memberships', to=settings.AUTH_USER_MODEL)),
+                ('workspace', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='memberships', to='tasks.workspace')),
+            ],
+            options={
+                'verbose_name': 'Workspace membership',
+                'verbose_name_plural': 'Workspace memberships',
+                'db_table': 'workspace_memberships',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='workspacemembership',
+            constraint=models.UniqueConstraint(fields=('user', 'workspace'), name='workspace_memberships_user_workspace_unique'),
+        ),
+    ]
@@ -0,0 +1,125 @@
+from django.db import migrations, models
+from django.db.models import Case, Value, When
+
+import tasks.fields
+
+
+STATUS_CODES = {
+    'pending': 1,
+    'in_progress': 2,
+    'completed': 3,
+    'cancelled': 4,
+}
+PRIORITY_CODES = {
+    'low': 1,
+    'medium': 2,
+    'high': 3,
+}
+STATUS_CHOICES = [
+    ('pending', 'Pending'),
+    ('in_progress', 'In Progress'),
+    ('completed', 'Completed'),
+    ('cancelled', 'Cancelled'),
+]
+PRIORITY_CHOICES = [
+    ('low', 'Low'),
+    ('medium', 'Medium'),
+    ('high', 'High'),
+]
+
+
+def encode(apps, schema_editor):
+    """
+    Copia los valores de texto a las columnas de códigos con un único
+    UPDATE ... CASE, sin traer filas a Python.
+    """
+    Task = apps.get_model('tasks', 'Task')
+    Task.objects.update(
+        status_code=Case(*(
+            When(status=name, then=Value(code))
+            for name, code in STATUS_CODES.items()
+        )),
+        priority_code=Case(*(
+            When(priority=name, then=Value(code))
+            for name, code in PRIORITY_CODES.items()
+        )),
+    )
+
+
+def decode(apps, schema_editor):
+    Task = apps.get_model('tasks', 'Task')
+    Task.objects.update(
+        status=Case(*(
+            When(status_code=name, then=Value(name))
+            for name in STATUS_CODES
+        )),
+        priority=Case(*(
+            When(priority_code=name, then=Value(name))
+            for name in PRIORITY_CODES
+        )),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0007_task_ordering_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='task',
+            name='tasks_user_status_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='task',
+            name='tasks_user_priority_idx',
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='status_code',
+            field=tasks.fields.CodedChoiceField(choices=STATUS_CHOICES, codes=STATUS_CODES, null=True),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='priority_code',
+            field=tasks.fields.CodedChoiceField(choices=PRIORITY_CHOICES, codes=PRIORITY_CODES, null=True),
+        ),
+        migrations.RunPython(encode, decode),
+        migrations.RemoveField(
+            model_name='task',
+            name='status',
+        ),
+        migrations.RemoveField(
+            model_name='task',
+            name='priority',
+        ),
+        migrations.RenameField(
+            model_name='task',
+            old_name='status_code',
+            new_name='status',
+        ),
+        migrations.RenameField(
+            model_name='task',
+            old_name='priority_code',
+            new_name='priority',
+        ),
+        migrations.AlterField(
+            model_name='task',
+            name='status',
+            field=tasks.fields.CodedChoiceField(choices=STATUS_CHOICES, codes=STATUS_CODES, default='pending'),
+        ),
+        migrations.AlterField(
+            model_name='task',
+            name='priority',
+            field=tasks.fields.CodedChoiceField(choices=PRIORITY_CHOICES, codes=PRIORITY_CODES, default='medium'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['user', 'status', 'id'], name='tasks_user_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['user', 'priority', 'id'], name='tasks_user_priority_idx'),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.0 on 2026-10-18 23:24
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0008_task_coded_status_priority'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskCompletionTimes',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('bucket', models.SmallIntegerField()),
+                ('count', models.IntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='task_completion_times', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Task completion times',
+                'verbose_name_plural': 'Task completion times',
+                'db_table': 'task_completion_times',
+            },
+        ),
+        migrations.CreateModel(
+            name='TaskDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('created', models.IntegerField(default=0)),
+                ('completed', models.IntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='task_daily_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Task daily stats',
+                'verbose_name_plural': 'Task daily stats',
+                'db_table': 'task_daily_stats',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='taskcompletiontimes',
+            constraint=models.UniqueConstraint(fields=('user', 'date', 'bucket'), name='task_completion_times_user_date_bucket_unique'),
+        ),
+        migrations.AddConstraint(
+            model_name='taskdailystats',
+            constraint=models.UniqueConstraint(fields=('user', 'date'), name='task_daily_stats_user_date_unique'),
+        ),
+    ]
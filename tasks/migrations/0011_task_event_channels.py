@@ -0,0 +1,25 @@
+# Generated by Django 5.0 on 2026-10-18 23:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0010_task_admin_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskEventChannel',
+            fields=[
+                ('channel', models.CharField(max_length=100, primary_key=True, serialize=False)),
+                ('expires_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Task event channel',
+                'verbose_name_plural': 'Task event channels',
+                'db_table': 'task_event_channels',
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.0 on 2026-10-19 00:04
+
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY no puede correr dentro de una transacción
+    atomic = False
+
+    dependencies = [
+        ('tasks', '0011_task_event_channels'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='task',
+            index=models.Index(condition=models.Q(('workspace__isnull', False)), fields=['workspace', 'created_at', 'id'], name='tasks_workspace_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='task',
+            index=models.Index(condition=models.Q(('workspace__isnull', False)), fields=['workspace', 'updated_at', 'id'], name='tasks_workspace_updated_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='task',
+            index=models.Index(condition=models.Q(('workspace__isnull', False)), fields=['workspace', 'due_date', 'id'], name='tasks_workspace_due_date_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='task',
+            index=models.Index(condition=models.Q(('workspace__isnull', False)), fields=['workspace', 'status', 'id'], name='tasks_workspace_status_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='task',
+            index=models.Index(condition=models.Q(('workspace__isnull', False)), fields=['workspace', 'priority', 'id'], name='tasks_workspace_priority_idx'),
+        ),
+    ]
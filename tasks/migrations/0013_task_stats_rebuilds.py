@@ -0,0 +1,25 @@
+# Generated by Django 5.0 on 2026-10-19 01:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0012_task_workspace_ordering_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskStatsRebuild',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_task_id', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Task stats rebuild',
+                'verbose_name_plural': 'Task stats rebuilds',
+                'db_table': 'task_stats_rebuilds',
+            },
+        ),
+    ]
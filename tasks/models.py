@@ -1,6 +1,147 @@
-from django.db import models
+from django.db import models, router, transaction
+from django.db.models import F, Lookup, Q, Subquery, Value
+from django.db.models.functions import Concat, Substr
 
 from users.models import Users
+from .fields import CodedChoiceField
+from .recurrence import RecurrenceRule
+
+
+class StaleTaskError(Exception):
+    """
+    La tarea fue modificada por otro request desde que se leyó.
+    """
+
+
+class AnyOf(Lookup):
+    """
+    `lhs IN (subquery)` escrito como `lhs = ANY(ARRAY(subquery))`: la
+    subquery se evalúa una sola vez y el planner puede usar el índice de
+    `lhs` aunque la condición esté combinada con OR.
+    """
+    lookup_name = 'any_of'
+    prepare_rhs = False
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} = ANY(ARRAY{rhs})', (*lhs_params, *rhs_params)
+
+
+class Workspace(models.Model):
+    name = models.CharField(max_length=200)
+    owner = models.ForeignKey(
+        Users,
+        on_delete=models.CASCADE,
+        related_name='owned_workspaces'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['name']
+        db_table = 'workspaces'
+        verbose_name = 'Workspace'
+        verbose_name_plural = 'Workspaces'
+
+    def __str__(self):
+        return self.name
+
+    @staticmethod
+    def ids_for(user):
+        """Subquery con los ids de los workspaces de los que el usuario es miembro"""
+        return WorkspaceMembership.objects.filter(
+            user=user
+        ).values('workspace_id')
+
+
+class WorkspaceMembership(models.Model):
+    ROLE_CHOICES = [
+        ('owner', 'Owner'),
+        ('member', 'Member')
+    ]
+
+    workspace = models.ForeignKey(
+        Workspace,
+        on_delete=models.CASCADE,
+        related_name='memberships'
+    )
+    user = models.ForeignKey(
+        Users,
+        on_delete=models.CASCADE,
+        related_name='workspace_memberships'
+    )
+    role = models.CharField(
+        max_length=10,
+        choices=ROLE_CHOICES,
+        default='member'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'workspace_memberships'
+        verbose_name = 'Workspace membership'
+        verbose_name_plural = 'Workspace memberships'
+        constraints = [
+            # (user, workspace): también es el índice que resuelve
+            # "workspaces del usuario" en cada request
+            models.UniqueConstraint(
+                fields=['user', 'workspace'],
+                name='workspace_memberships_user_workspace_unique'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user} - {self.workspace}"
+
+
+class Tag(models.Model):
+    name = models.CharField(max_length=50)
+    user = models.ForeignKey(
+        Users,
+        on_delete=models.CASCADE,
+        related_name='tags'
+    )
+
+    class Meta:
+        ordering = ['name']
+        db_table = 'tags'
+        verbose_name = 'Tag'
+        verbose_name_plural = 'Tags'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'name'],
+                name='tags_user_name_unique'
+            ),
+        ]
+
+    def __str__(self):
+        return self.name
+
+    @classmethod
+    def for_names(cls, user, names):
+        """
+        Devuelve las etiquetas del usuario con esos nombres, creando las que
+        falten con un solo INSERT.
+        """
+        names = list(names)
+        if not names:
+            return []
+        existing = {
+            tag.name: tag
+            for tag in cls.objects.filter(user=user, name__in=names)
+        }
+        missing = [name for name in names if name not in existing]
+        if missing:
+            # Otro request puede crear la misma etiqueta en paralelo
+            cls.objects.bulk_create(
+                [cls(user=user, name=name) for name in missing],
+                ignore_conflicts=True
+            )
+            existing.update(
+                (tag.name, tag)
+                for tag in cls.objects.filter(user=user, name__in=missing)
+            )
+        return [existing[name] for name in names]
 
 
 class Task(models.Model):
@@ -17,19 +158,33 @@ class Task(models.Model):
         ('high', 'High')
     ]
 
+    # Códigos guardados en la base: el orden de status sigue el flujo de la
+    # tarea y el de priority su severidad
+    STATUS_CODES = {
+        'pending': 1,
+        'in_progress': 2,
+        'completed': 3,
+        'cancelled': 4
+    }
+    PRIORITY_CODES = {
+        'low': 1,
+        'medium': 2,
+        'high': 3
+    }
+
     title = models.CharField(max_length=200)
     description = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     due_date = models.DateTimeField(null=True, blank=True)
     completed_at = models.DateTimeField(null=True, blank=True)
-    status = models.CharField(
-        max_length=20,
+    status = CodedChoiceField(
+        codes=STATUS_CODES,
         choices=STATUS_CHOICES,
         default='pending'
     )
-    priority = models.CharField(
-        max_length=10,
+    priority = CodedChoiceField(
+        codes=PRIORITY_CODES,
         choices=PRIORITY_CHOICES,
         default='medium'
     )
@@ -38,12 +193,390 @@ class Task(models.Model):
         on_delete=models.CASCADE,
         related_name='tasks'
     )
+    version = models.PositiveIntegerField(default=1)
+    parent = models.ForeignKey(
+        'self',
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name='children'
+    )
+    tags = models.ManyToManyField(Tag, blank=True, related_name='tasks')
+    workspace = models.ForeignKey(
+        Workspace,
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name='tasks'
+    )
+    # Regla RRULE de una tarea recurrente; `due_date` es la primera ocurrencia
+    recurrence = models.CharField(max_length=200, blank=True, default='')
+    # Ocurrencia materializada de una serie (al completarla o modificarla)
+    series = models.ForeignKey(
+        'self',
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name='occurrences'
+    )
+    occurrence_date = models.DateTimeField(null=True, blank=True)
+    # Camino materializado con los ids de los ancestros ("1/5/23/"), para
+    # obtener un subárbol completo con un solo `LIKE 'prefijo%'`.
+    path = models.TextField(default='', editable=False)
 
     class Meta:
         ordering = ['-created_at']
         db_table = 'tasks'
         verbose_name = 'Task'
         verbose_name_plural = 'Tasks'
+        indexes = [
+            models.Index(
+                fields=['path'],
+                name='tasks_path_idx',
+                opclasses=['text_pattern_ops']
+            ),
+            models.Index(
+                fields=['user'],
+                condition=~Q(recurrence=''),
+                name='tasks_recurring_user_idx'
+            ),
+            # Un índice por cada `?ordering=` permitido
+            models.Index(
+                fields=['user', 'created_at', 'id'],
+                name='tasks_user_created_idx'
+            ),
+            models.Index(
+                fields=['user', 'updated_at', 'id'],
+                name='tasks_user_updated_idx'
+            ),
+            models.Index(
+                fields=['user', 'due_date', 'id'],
+                name='tasks_user_due_date_idx'
+            ),
+            models.Index(
+                fields=['user', 'status', 'id'],
+                name='tasks_user_status_idx'
+            ),
+            models.Index(
+                fields=['user', 'priority', 'id'],
+                name='tasks_user_priority_idx'
+            ),
+            # Los mismos para las tareas de workspaces (ver visibility_branches)
+            models.Index(
+                fields=['workspace', 'created_at', 'id'],
+                condition=Q(workspace__isnull=False),
+                name='tasks_workspace_created_idx'
+            ),
+            models.Index(
+                fields=['workspace', 'updated_at', 'id'],
+                condition=Q(workspace__isnull=False),
+                name='tasks_workspace_updated_idx'
+            ),
+            models.Index(
+                fields=['workspace', 'due_date', 'id'],
+                condition=Q(workspace__isnull=False),
+                name='tasks_workspace_due_date_idx'
+            ),
+            models.Index(
+                fields=['workspace', 'status', 'id'],
+                condition=Q(workspace__isnull=False),
+                name='tasks_workspace_status_idx'
+            ),
+            models.Index(
+                fields=['workspace', 'priority', 'id'],
+                condition=Q(workspace__isnull=False),
+                name='tasks_workspace_priority_idx'
+            ),
+            # Filtros del admin, sobre todas las tareas
+            models.Index(
+                fields=['status', 'id'],
+                name='tasks_status_idx'
+            ),
+            models.Index(
+                fields=['priority', 'id'],
+                name='tasks_priority_idx'
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['series', 'occurrence_date'],
+                name='tasks_series_occurrence_unique'
+            ),
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.status}"
+
+    @staticmethod
+    def visible_to(user):
+        """
+        Condición de acceso a tareas: propias o de un workspace del que el
+        usuario es miembro. Es una sola condición SQL sobre índices
+        (`user_id` y `workspace_id`), sin importar la cantidad de miembros.
+        """
+        return Q(user=user) | Q(
+            AnyOf(F('workspace_id'), Subquery(Workspace.ids_for(user)))
+        )
+
+    @staticmethod
+    def visibility_branches(user):
+        """
+        La condición de `visible_to` partida en ramas disjuntas: tareas
+        propias y, por cada workspace del usuario, las de otros usuarios en
+        ese workspace. Con el OR, Postgres no puede recorrer un índice en el
+        orden del listado; cada rama por separado sí, por (user, campo, id)
+        o por (workspace, campo, id) con el workspace fijo. Un solo índice
+        no da un orden global entre varios workspaces, por eso hay una rama
+        por workspace. La paginación las combina con UNION ALL.
+        """
+        workspace_ids = Workspace.ids_for(user).values_list(
+            'workspace_id', flat=True
+        )
+        return [Q(user=user)] + [
+            Q(workspace_id=workspace_id) & ~Q(user=user)
+            for workspace_id in workspace_ids
+        ]
+
+    @property
+    def rule(self):
+        return RecurrenceRule.parse(self.recurrence) if self.recurrence else None
+
+    def occurrences_between(self, after, before):
+        """
+        Fechas de las ocurrencias de la serie dentro de [`after`, `before`),
+        calculadas sin tocar la base.
+        """
+        if not self.recurrence or self.due_date is None:
+            return []
+        return list(self.rule.between(self.due_date, after, before))
+
+    def materialize(self, occurrence):
+        """
+        Devuelve la fila de la ocurrencia `occurrence` de la serie,
+        creándola si todavía no existe.
+        """
+        instance, _ = Task.objects.get_or_create(
+            series=self,
+            occurrence_date=occurrence,
+            defaults={
+                'title': self.title,
+                'description': self.description,
+                'priority': self.priority,
+                'due_date': occurrence,
+                'user': self.user,
+                'workspace': self.workspace,
+            }
+        )
+        return instance
+
+    def save(self, *args, **kwargs):
+        """
+        Las actualizaciones son condicionales a la versión leída
+        (`UPDATE ... WHERE version = n`) e incrementan `version`. Si otro
+        request guardó antes, se lanza StaleTaskError en lugar de pisar
+        sus cambios.
+        """
+        using = kwargs.get('using') or router.db_for_write(Task, instance=self)
+        if not transaction.get_connection(using).in_atomic_block:
+            # Los deltas de los rollups (post_save) se aplican en la misma
+            # transacción que la tarea (ver tasks.rollups.rebuilt_until)
+            with transaction.atomic(using=using):
+                return self.save(*args, **kwargs)
+        if self._state.adding:
+            self.path = self.build_path()
+            super().save(*args, **kwargs)
+            self._loaded_parent_id = self.parent_id
+            return
+        old_prefix = self.descendants_prefix
+        moved = self.parent_id != getattr(self, '_loaded_parent_id', None)
+        if moved:
+            self.path = self.build_path()
+        expected = self.version
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'version'}
+        self.version = expected + 1
+        self._expected_version = expected
+        connection = transaction.get_connection(using)
+        needs_rollback = connection.needs_rollback
+        try:
+            super().save(*args, **kwargs)
+        except StaleTaskError:
+            self.version = expected
+            # El UPDATE sin filas afectadas no es un error de base de datos:
+            # la transacción sigue siendo válida para quien llamó a save().
+            if connection.in_atomic_block:
+                transaction.set_rollback(needs_rollback, using=using)
+            raise
+        finally:
+            del self._expected_version
+        if moved:
+            self.move_descendants(old_prefix)
+            self._loaded_parent_id = self.parent_id
+
+    def build_path(self):
+        if self.parent_id is None:
+            return ''
+        return self.parent.descendants_prefix
+
+    @property
+    def descendants_prefix(self):
+        return f'{self.path}{self.pk}/'
+
+    @property
+    def depth(self):
+        return self.path.count('/')
+
+    def get_descendants(self):
+        return Task.objects.filter(path__startswith=self.descendants_prefix)
+
+    def get_subtree(self):
+        return Task.objects.filter(
+            Q(pk=self.pk) | Q(path__startswith=self.descendants_prefix)
+        )
+
+    def move_descendants(self, old_prefix):
+        """
+        Reescribe en un solo UPDATE el camino de todos los descendientes
+        después de cambiar el padre de la tarea.
+        """
+        Task.objects.filter(path__startswith=old_prefix).update(
+            path=Concat(
+                Value(self.descendants_prefix),
+                Substr('path', len(old_prefix) + 1),
+                output_field=models.TextField()
+            )
+        )
+
+    def delete(self, *args, **kwargs):
+        """
+        Borra la tarea con todo su subárbol obtenido por camino, en una
+        cantidad de queries que no depende de la profundidad.
+        """
+        return self.get_subtree().delete()
+
+    def _do_update(self, base_qs, using, pk_val, values, update_fields,
+                   forced_update):
+        expected = getattr(self, '_expected_version', None)
+        if expected is None:
+            return super()._do_update(
+                base_qs, using, pk_val, values, update_fields, forced_update
+            )
+        updated = super()._do_update(
+            base_qs.filter(version=expected),
+            using,
+            pk_val,
+            values,
+            update_fields,
+            forced_update
+        )
+        if not updated:
+            raise StaleTaskError(
+                f'Task {pk_val} is no longer at version {expected}'
+            )
+        return updated
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Estado leído de la base, para detectar transiciones al guardar
+        instance._loaded_status = instance.__dict__.get('status')
+        instance._loaded_completed_at = instance.__dict__.get('completed_at')
+        instance._loaded_parent_id = instance.__dict__.get('parent_id')
+        return instance
+
+
+class TaskDailyStats(models.Model):
+    """
+    Tareas creadas y completadas por usuario y día (UTC). Se mantiene al
+    guardar cada tarea (ver tasks.rollups) y se reconstruye con el comando
+    `backfill_task_stats`.
+    """
+    user = models.ForeignKey(
+        Users,
+        on_delete=models.CASCADE,
+        related_name='task_daily_stats'
+    )
+    date = models.DateField()
+    created = models.IntegerField(default=0)
+    completed = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = 'task_daily_stats'
+        verbose_name = 'Task daily stats'
+        verbose_name_plural = 'Task daily stats'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'date'],
+                name='task_daily_stats_user_date_unique'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user} - {self.date}"
+
+
+class TaskCompletionTimes(models.Model):
+    """
+    Histograma por usuario y día de completado del tiempo entre
+    `created_at` y `completed_at`, en buckets logarítmicos (ver
+    tasks.rollups.completion_bucket).
+    """
+    user = models.ForeignKey(
+        Users,
+        on_delete=models.CASCADE,
+        related_name='task_completion_times'
+    )
+    date = models.DateField()
+    bucket = models.SmallIntegerField()
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = 'task_completion_times'
+        verbose_name = 'Task completion times'
+        verbose_name_plural = 'Task completion times'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'date', 'bucket'],
+                name='task_completion_times_user_date_bucket_unique'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user} - {self.date} - {self.bucket}"
+
+
+class TaskStatsRebuild(models.Model):
+    """
+    Avance de `backfill_task_stats`: una fila mientras corre, con el id de
+    la última tarea que ya sumó a las tablas en reconstrucción. Las
+    escrituras de tareas la leen para saber si también deben aplicar sus
+    deltas ahí (ver tasks.rollups.rebuilt_until).
+    """
+    last_task_id = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = 'task_stats_rebuilds'
+        verbose_name = 'Task stats rebuild'
+        verbose_name_plural = 'Task stats rebuilds'
+
+    def __str__(self):
+        return f"Rebuild up to task {self.last_task_id}"
+
+
+class TaskEventChannel(models.Model):
+    """
+    Canales del stream de eventos con clientes conectados en algún proceso
+    ASGI. Cada proceso renueva `expires_at` de sus canales; los workers que
+    escriben solo notifican los canales vigentes (ver tasks.events).
+    """
+    channel = models.CharField(max_length=100, primary_key=True)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'task_event_channels'
+        verbose_name = 'Task event channel'
+        verbose_name_plural = 'Task event channels'
+
+    def __str__(self):
+        return self.channel
@@ -0,0 +1,148 @@
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination
+
+
+# Orden permitido en `?ordering=`. Cada campo tiene un índice
+# (user, campo, id) en Task.Meta.indexes.
+ORDERING_FIELDS = ('due_date', 'priority', 'status', 'updated_at', 'created_at')
+NULLABLE_FIELDS = {'due_date'}
+DEFAULT_ORDERING = '-created_at'
+
+
+def ordering_expressions(field, descending):
+    """
+    ORDER BY para `field` con `id` como desempate, de modo que cada fila
+    tenga una posición única. Los NULL van al final en orden ascendente y
+    al principio en descendente, como en los índices de Postgres, en
+    cualquier base de datos.
+    """
+    if descending:
+        return [F(field).desc(nulls_first=True), F('id').desc()]
+    return [F(field).asc(nulls_last=True), F('id').asc()]
+
+
+def keyset_filter(field, value, pk, descending):
+    """
+    Filas posteriores a la posición (`value`, `pk`) en el orden indicado.
+    La condición `campo >= valor` (o `<=`) acota el rango del índice; el
+    resto solo resuelve los empates por `id`.
+    """
+    nullable = field in NULLABLE_FIELDS
+    if value is None:
+        if descending:
+            return Q(**{f'{field}__isnull': False}) | Q(
+                **{f'{field}__isnull': True, 'id__lt': pk}
+            )
+        return Q(**{f'{field}__isnull': True, 'id__gt': pk})
+    if descending:
+        return Q(**{f'{field}__lte': value}) & (
+            Q(**{f'{field}__lt': value}) | Q(id__lt=pk)
+        )
+    after = Q(**{f'{field}__gte': value}) & (
+        Q(**{f'{field}__gt': value}) | Q(id__gt=pk)
+    )
+    if nullable:
+        after |= Q(**{f'{field}__isnull': True})
+    return after
+
+
+class TaskCursorPagination(CursorPagination):
+    """
+    Paginación por cursor opcional: solo se activa si el request trae
+    `cursor` o `page_size`, así el listado sin parámetros sigue devolviendo
+    todas las tareas. Usa el orden de `?ordering=` de la vista y pagina por
+    (campo, id), sin OFFSET, por lo que cada página cuesta lo mismo.
+
+    Si la vista define `get_keyset_branches`, cada rama se pagina por
+    separado (orden, posición del cursor y LIMIT) y se combinan con
+    UNION ALL: así cada una recorre su índice en orden y se detiene en la
+    página, algo que un OR entre las ramas no permite.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if (
+            self.cursor_query_param not in request.query_params
+            and self.page_size_query_param not in request.query_params
+        ):
+            return None
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        ordering = view.get_ordering()
+        self.field = ordering.lstrip('-')
+        self.descending = ordering.startswith('-')
+
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor.reverse
+        descending = self.descending != reverse
+        ordering = ordering_expressions(self.field, descending)
+        after = None
+        if self.cursor is not None and self.cursor.position is not None:
+            try:
+                value, pk = json.loads(self.cursor.position)
+                after = keyset_filter(self.field, value, pk, descending)
+            except (TypeError, ValueError):
+                raise NotFound(self.invalid_cursor_message)
+
+        get_branches = getattr(view, 'get_keyset_branches', None)
+        branches = get_branches() if get_branches else [queryset]
+        limit = self.page_size + 1
+        pages = []
+        for branch in branches:
+            if after is not None:
+                branch = branch.filter(after)
+            pages.append(branch.order_by(*ordering)[:limit])
+        if len(pages) > 1:
+            page = pages[0].union(*pages[1:], all=True).order_by(*ordering)
+        else:
+            page = pages[0]
+        try:
+            results = list(page[:limit])
+        except ValidationError:
+            # Un valor del cursor que no corresponde al campo
+            raise NotFound(self.invalid_cursor_message)
+        self.page = results[:self.page_size]
+        has_following = len(results) > self.page_size
+        if reverse:
+            self.page.reverse()
+            self.has_next = True
+            self.has_previous = has_following
+        else:
+            self.has_next = has_following
+            self.has_previous = self.cursor is not None
+        return self.page
+
+    def position(self, instance):
+        value = getattr(instance, self.field)
+        if hasattr(value, 'isoformat'):
+            value = value.isoformat()
+        return json.dumps([value, instance.pk], separators=(',', ':'))
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if self.page:
+            position = self.position(self.page[-1])
+        else:
+            position = self.cursor.position
+        return self.encode_cursor(
+            Cursor(offset=0, reverse=False, position=position)
+        )
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if self.page:
+            position = self.position(self.page[0])
+        else:
+            position = self.cursor.position
+        return self.encode_cursor(
+            Cursor(offset=0, reverse=True, position=position)
+        )
@@ -0,0 +1,157 @@
+"""
+Reglas de recurrencia con un subconjunto de RRULE (RFC 5545):
+
+    FREQ=DAILY|WEEKLY|MONTHLY;INTERVAL=n;BYDAY=MO,WE;COUNT=n;UNTIL=20261231T000000Z
+
+Las ocurrencias no se guardan: se calculan a pedido dentro de una ventana
+de fechas, saltando directamente al primer período de la ventana. Se
+calculan en UTC a partir de la fecha de inicio de la serie.
+"""
+import calendar
+from datetime import datetime, timedelta, timezone
+
+
+FREQUENCIES = ('DAILY', 'WEEKLY', 'MONTHLY')
+WEEKDAYS = ('MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU')
+UNTIL_FORMAT = '%Y%m%dT%H%M%SZ'
+
+
+class RecurrenceRule:
+    def __init__(self, freq, interval=1, byday=(), count=None, until=None):
+        if freq not in FREQUENCIES:
+            raise ValueError(f'FREQ must be one of {", ".join(FREQUENCIES)}.')
+        if interval < 1:
+            raise ValueError('INTERVAL must be a positive integer.')
+        if count is not None and count < 1:
+            raise ValueError('COUNT must be a positive integer.')
+        if count is not None and until is not None:
+            raise ValueError('COUNT and UNTIL cannot be used together.')
+        if byday and freq != 'WEEKLY':
+            raise ValueError('BYDAY is only supported with FREQ=WEEKLY.')
+        self.freq = freq
+        self.interval = interval
+        self.byday = tuple(sorted(set(byday)))
+        self.count = count
+        self.until = until
+
+    @classmethod
+    def parse(cls, text):
+        """
+        Convierte el texto de la regla en un RecurrenceRule. Lanza
+        ValueError si la regla es inválida o usa partes no soportadas.
+        """
+        parts = {}
+        for part in text.strip().upper().removeprefix('RRULE:').split(';'):
+            name, sep, value = part.partition('=')
+            if not sep or not value:
+                raise ValueError(f'Invalid rule part: "{part}".')
+            if name in parts:
+                raise ValueError(f'{name} is repeated.')
+            parts[name] = value
+
+        kwargs = {'freq': parts.pop('FREQ', None)}
+        try:
+            if 'INTERVAL' in parts:
+                kwargs['interval'] = int(parts.pop('INTERVAL'))
+            if 'COUNT' in parts:
+                kwargs['count'] = int(parts.pop('COUNT'))
+        except ValueError:
+            raise ValueError('INTERVAL and COUNT must be integers.')
+        if 'BYDAY' in parts:
+            days = parts.pop('BYDAY').split(',')
+            if not set(days) <= set(WEEKDAYS):
+                raise ValueError(f'BYDAY values must be in {", ".join(WEEKDAYS)}.')
+            kwargs['byday'] = [WEEKDAYS.index(day) for day in days]
+        if 'UNTIL' in parts:
+            try:
+                kwargs['until'] = datetime.strptime(
+                    parts.pop('UNTIL'), UNTIL_FORMAT
+                ).replace(tzinfo=timezone.utc)
+            except ValueError:
+                raise ValueError('UNTIL must have the form YYYYMMDDTHHMMSSZ.')
+        if parts:
+            raise ValueError(f'Unsupported rule parts: {", ".join(parts)}.')
+        return cls(**kwargs)
+
+    def __str__(self):
+        parts = [f'FREQ={self.freq}']
+        if self.interval != 1:
+            parts.append(f'INTERVAL={self.interval}')
+        if self.byday:
+            parts.append('BYDAY=' + ','.join(WEEKDAYS[day] for day in self.byday))
+        if self.count is not None:
+            parts.append(f'COUNT={self.count}')
+        if self.until is not None:
+            parts.append(f'UNTIL={self.until.strftime(UNTIL_FORMAT)}')
+        return ';'.join(parts)
+
+    def _period(self, start, index):
+        """
+        Inicio del período `index` (día, semana o mes) de la serie y sus
+        ocurrencias.
+        """
+        if self.freq == 'DAILY':
+            day = start + timedelta(days=index * self.interval)
+            return day, [day]
+        if self.freq == 'WEEKLY':
+            if not self.byday:
+                week = start + timedelta(weeks=index * self.interval)
+                return week, [week]
+            week = start - timedelta(days=start.weekday())
+            week += timedelta(weeks=index * self.interval)
+            return week, [
+                day for day in (week + timedelta(days=d) for d in self.byday)
+                if day >= start
+            ]
+        month = start.month - 1 + index * self.interval
+        year = start.year + month // 12
+        month = month % 12 + 1
+        first = start.replace(year=year, month=month, day=1)
+        # Como en RRULE, los meses sin ese día no tienen ocurrencia
+        if start.day > calendar.monthrange(year, month)[1]:
+            return first, []
+        return first, [first.replace(day=start.day)]
+
+    def _skip(self, start, after):
+        """
+        Primer período que puede tener ocurrencias desde `after` y la
+        cantidad de ocurrencias de los períodos anteriores.
+        """
+        if self.freq == 'MONTHLY' or after <= start:
+            return 0, 0
+        days = 1 if self.freq == 'DAILY' else 7
+        index = max(0, (after - start).days // (days * self.interval) - 1)
+        if index == 0:
+            return 0, 0
+        if self.freq == 'DAILY' or not self.byday:
+            return index, index
+        first = len(self._period(start, 0)[1])
+        return index, first + (index - 1) * len(self.byday)
+
+    def between(self, start, after, before):
+        """
+        Ocurrencias de la serie que empieza en `start` dentro de
+        [`after`, `before`), en orden.
+        """
+        index, seen = self._skip(start, after)
+        while True:
+            period, occurrences = self._period(start, index)
+            if period >= before:
+                return
+            for occurrence in occurrences:
+                seen += 1
+                if self.count is not None and seen > self.count:
+                    return
+                if self.until is not None and occurrence > self.until:
+                    return
+                if occurrence >= before:
+                    return
+                if occurrence >= after:
+                    yield occurrence
+            index += 1
+
+    def includes(self, start, occurrence):
+        """Indica si `occurrence` es una ocurrencia de la serie"""
+        return any(
+            self.between(start, occurrence, occurrence + timedelta(seconds=1))
+        )
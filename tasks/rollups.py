@@ -0,0 +1,283 @@
+"""
+Rollups diarios de productividad: tareas creadas y completadas por usuario
+y día (UTC), y el histograma de tiempos hasta completarlas. Se actualizan
+con deltas en cada transición de una tarea, con un
+`INSERT ... ON CONFLICT DO UPDATE` por tabla, de modo que las consultas
+por rango no recorren la tabla `tasks`. Las vistas de escritura corren en
+`deferred()`: los deltas de todas las tareas del request se aplican juntos
+al final, en la misma transacción que las tareas.
+
+Las tareas borradas siguen contando en los días en que se crearon o
+completaron.
+"""
+import datetime
+import math
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import connections, router, transaction
+from django.db.models import Sum
+
+from .models import TaskCompletionTimes, TaskDailyStats, TaskStatsRebuild
+
+
+# Cuatro buckets por cada duplicación del tiempo: la mediana estimada
+# difiere de la real en menos de un 10%
+BUCKETS_PER_DOUBLING = 4
+
+# Filas por INSERT
+UPSERT_BATCH_SIZE = 200
+
+# Sufijo de las tablas que arma `backfill_task_stats` mientras corre
+REBUILD_SUFFIX = '_rebuild'
+
+# Deltas pendientes del bloque `deferred` activo
+_pending = ContextVar('rollup_deltas', default=None)
+
+
+def completion_bucket(seconds):
+    return int(BUCKETS_PER_DOUBLING * math.log2(1 + max(seconds, 0)))
+
+
+def bucket_seconds(bucket):
+    """Valor representativo del bucket: la media geométrica de sus límites"""
+    return 2 ** ((bucket + 0.5) / BUCKETS_PER_DOUBLING) - 1
+
+
+def median_seconds(bucket_counts):
+    """
+    Mediana estimada a partir de pares (bucket, cantidad) ordenados por
+    bucket, o None si no hay tareas completadas.
+    """
+    total = sum(count for _, count in bucket_counts)
+    if total <= 0:
+        return None
+    seen = 0
+    for bucket, count in bucket_counts:
+        seen += count
+        if seen * 2 >= total:
+            return round(bucket_seconds(bucket))
+
+
+def utc_date(value):
+    return value.astimezone(datetime.timezone.utc).date()
+
+
+class Deltas:
+    """
+    Cambios a aplicar en los rollups, agrupados por fila. Con `task_id` se
+    guardan además los de cada tarea, para la reconstrucción en curso (ver
+    `save`).
+    """
+    def __init__(self):
+        self.days = defaultdict(lambda: [0, 0])
+        self.times = defaultdict(int)
+        self.tasks = {}
+
+    def __bool__(self):
+        return any(any(values) for values in self.days.values()) or any(
+            self.times.values()
+        )
+
+    def task(self, task_id):
+        if task_id not in self.tasks:
+            self.tasks[task_id] = Deltas()
+        return self.tasks[task_id]
+
+    def created(self, user_id, created_at, sign=1, task_id=None):
+        self.days[user_id, utc_date(created_at)][0] += sign
+        if task_id is not None:
+            self.task(task_id).created(user_id, created_at, sign)
+
+    def completed(self, user_id, created_at, completed_at, sign=1, task_id=None):
+        date = utc_date(completed_at)
+        self.days[user_id, date][1] += sign
+        bucket = completion_bucket((completed_at - created_at).total_seconds())
+        self.times[user_id, date, bucket] += sign
+        if task_id is not None:
+            self.task(task_id).completed(user_id, created_at, completed_at, sign)
+
+    def update(self, other):
+        """Suma los deltas de `other`"""
+        for key, (created, completed) in other.days.items():
+            self.days[key][0] += created
+            self.days[key][1] += completed
+        for key, count in other.times.items():
+            self.times[key] += count
+        for task_id, deltas in other.tasks.items():
+            self.task(task_id).update(deltas)
+
+    def save(self, using=None):
+        """
+        Aplica los deltas. Mientras corre `backfill_task_stats` aplica
+        también a las tablas en reconstrucción los de las tareas que el
+        comando ya recorrió; los de las demás los va a contar el comando.
+        """
+        if not self:
+            return
+        last_task_id = rebuilt_until(using)
+        self.write(using)
+        if last_task_id is not None:
+            rebuilt = Deltas()
+            for task_id, deltas in self.tasks.items():
+                if task_id <= last_task_id:
+                    rebuilt.update(deltas)
+            rebuilt.write(using, REBUILD_SUFFIX)
+
+    def write(self, using=None, suffix=''):
+        upsert(
+            TaskDailyStats,
+            ['user', 'date'],
+            ['created', 'completed'],
+            [
+                (*key, *values)
+                for key, values in self.days.items() if any(values)
+            ],
+            using,
+            suffix,
+        )
+        upsert(
+            TaskCompletionTimes,
+            ['user', 'date', 'bucket'],
+            ['count'],
+            [(*key, count) for key, count in self.times.items() if count],
+            using,
+            suffix,
+        )
+
+
+def rebuilt_until(using=None):
+    """
+    Id de la última tarea que recorrió `backfill_task_stats`, o None si no
+    está corriendo. La fila queda bloqueada (FOR SHARE) hasta el final de
+    la transacción, así el comando no avanza al siguiente lote mientras se
+    aplican estos deltas.
+    """
+    using = using or router.db_for_write(TaskStatsRebuild)
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT {} FROM {} FOR SHARE'.format(
+                connection.ops.quote_name('last_task_id'),
+                connection.ops.quote_name(TaskStatsRebuild._meta.db_table),
+            )
+        )
+        row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def record(deltas, using=None):
+    """
+    Aplica `deltas`, o los suma a los del bloque `deferred` activo para
+    guardarlos al final del request.
+    """
+    pending = _pending.get()
+    if pending is not None:
+        pending.update(deltas)
+    else:
+        deltas.save(using)
+
+
+@contextmanager
+def deferred(using=None):
+    """
+    Corre el bloque en una transacción y aplica al final, con un upsert por
+    tabla, los deltas de todas las tareas guardadas en él. Así los rollups
+    cambian en la misma transacción que las tareas (ver el comando
+    backfill_task_stats). Dentro de otro bloque `deferred` (por ejemplo,
+    las operaciones de un batch) los deltas se suman a los de ese.
+    """
+    if _pending.get() is not None:
+        yield
+        return
+    deltas = Deltas()
+    token = _pending.set(deltas)
+    try:
+        with transaction.atomic(using=using):
+            yield
+            _pending.reset(token)
+            token = None
+            if not transaction.get_rollback(using=using):
+                deltas.save(using)
+    finally:
+        if token is not None:
+            _pending.reset(token)
+
+
+def upsert(model, key_fields, counter_fields, rows, using=None, suffix=''):
+    """
+    Suma los contadores de cada fila (claves..., contadores...), creándola
+    si no existe. Es una sola query atómica por lote, sin carreras entre
+    requests que actualizan el mismo día. Con `suffix` escribe en la tabla
+    `<tabla del modelo><suffix>`.
+    """
+    if not rows:
+        return
+    using = using or router.db_for_write(model)
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    table = quote(model._meta.db_table + suffix)
+    fields = [model._meta.get_field(name) for name in (*key_fields, *counter_fields)]
+    columns = ', '.join(quote(field.column) for field in fields)
+    keys = ', '.join(quote(field.column) for field in fields[:len(key_fields)])
+    updates = ', '.join(
+        f'{column} = {table}.{column} + EXCLUDED.{column}'
+        for column in map(quote, (field.column for field in fields[len(key_fields):]))
+    )
+    placeholder = '(' + ', '.join(['%s'] * len(fields)) + ')'
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+            batch = rows[start:start + UPSERT_BATCH_SIZE]
+            params = []
+            for row in batch:
+                params.extend(
+                    field.get_db_prep_value(value, connection)
+                    for field, value in zip(fields, row)
+                )
+            cursor.execute(
+                f'INSERT INTO {table} ({columns})'
+                f' VALUES {", ".join([placeholder] * len(batch))}'
+                f' ON CONFLICT ({keys}) DO UPDATE SET {updates}',
+                params,
+            )
+
+
+def daily_stats(user, start, end):
+    """
+    Tareas creadas y completadas por día entre `start` y `end` (inclusive)
+    y la mediana del tiempo hasta completarlas, en dos queries sobre los
+    rollups.
+    """
+    rows = {
+        row.date: row
+        for row in TaskDailyStats.objects.filter(
+            user=user, date__range=(start, end)
+        )
+    }
+    bucket_counts = list(
+        TaskCompletionTimes.objects.filter(
+            user=user, date__range=(start, end)
+        )
+        .values('bucket')
+        .annotate(total=Sum('count'))
+        .order_by('bucket')
+        .values_list('bucket', 'total')
+    )
+    days = []
+    for offset in range((end - start).days + 1):
+        date = start + datetime.timedelta(days=offset)
+        row = rows.get(date)
+        days.append({
+            'date': date.isoformat(),
+            'created': row.created if row else 0,
+            'completed': row.completed if row else 0,
+        })
+    return {
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'created': sum(day['created'] for day in days),
+        'completed': sum(day['completed'] for day in days),
+        'median_completion_seconds': median_seconds(bucket_counts),
+        'days': days,
+    }
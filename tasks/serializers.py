@@ -1,11 +1,64 @@
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
 from rest_framework import serializers
 
-from .models import Task
+from core.serializers import (
+    TimedListSerializer,
+    TimedSerializerMixin,
+    UTCDateTimeField,
+)
+from users.models import Users
+from .models import Tag, Task, Workspace, WorkspaceMembership
+from .recurrence import RecurrenceRule
 
 
-class TaskSerializer(serializers.ModelSerializer):
+class ParentTaskField(serializers.PrimaryKeyRelatedField):
+    """
+    Solo permite elegir como padre tareas visibles para el usuario del request.
+    """
+    def get_queryset(self):
+        request = self.context.get('request')
+        if request is None:
+            return Task.objects.none()
+        return Task.objects.filter(Task.visible_to(request.user))
+
+
+class WorkspaceField(serializers.PrimaryKeyRelatedField):
+    """
+    Solo permite elegir workspaces de los que el usuario es miembro.
+    """
+    def get_queryset(self):
+        request = self.context.get('request')
+        if request is None:
+            return Workspace.objects.none()
+        return Workspace.objects.filter(memberships__user=request.user)
+
+
+class TagListField(serializers.ListField):
+    """
+    Etiquetas de la tarea como lista de nombres. Para listados se espera
+    que vengan precargadas con `prefetch_related('tags')`.
+    """
+    child = serializers.CharField(max_length=50)
+
+    def to_representation(self, value):
+        return [tag.name for tag in value.all()]
+
+
+class TaskSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    serializer_field_mapping = {
+        **serializers.ModelSerializer.serializer_field_mapping,
+        models.DateTimeField: UTCDateTimeField,
+    }
+    version = serializers.IntegerField(required=False, min_value=1)
+    parent = ParentTaskField(required=False, allow_null=True)
+    tags = TagListField(required=False, max_length=settings.TASK_MAX_TAGS)
+    workspace = WorkspaceField(required=False, allow_null=True)
+
     class Meta:
         model = Task
+        list_serializer_class = TimedListSerializer
         fields = [
             'id',
             'title',
@@ -15,10 +68,188 @@ class TaskSerializer(serializers.ModelSerializer):
             'due_date',
             'completed_at',
             'status',
-            'priority'
+            'priority',
+            'version',
+            'parent',
+            'tags',
+            'workspace',
+            'recurrence',
+            'series',
+            'occurrence_date'
         ]
-        read_only_fields = ['created_at', 'updated_at', 'completed_at']
+        read_only_fields = [
+            'created_at',
+            'updated_at',
+            'completed_at',
+            'series',
+            'occurrence_date'
+        ]
+
+    def validate_parent(self, parent):
+        if parent is None:
+            return parent
+        task = self.instance
+        if task is not None and (
+            parent.pk == task.pk
+            or parent.path.startswith(task.descendants_prefix)
+        ):
+            raise serializers.ValidationError(
+                'A task cannot be moved under itself or one of its subtasks.'
+            )
+        height = 0
+        if task is not None and parent.pk != task.parent_id:
+            paths = task.get_descendants().values_list('path', flat=True)
+            height = max(
+                (path.count('/') - task.depth for path in paths),
+                default=0
+            )
+        if parent.depth + 1 + height >= settings.TASK_MAX_DEPTH:
+            raise serializers.ValidationError(
+                f'Subtasks cannot be nested more than '
+                f'{settings.TASK_MAX_DEPTH} levels deep.'
+            )
+        return parent
+
+    def validate(self, attrs):
+        if attrs.get('recurrence'):
+            due_date = attrs.get(
+                'due_date', getattr(self.instance, 'due_date', None)
+            )
+            if due_date is None:
+                raise serializers.ValidationError({
+                    'due_date': 'Recurring tasks need a due date for their '
+                                'first occurrence.'
+                })
+            if getattr(self.instance, 'series_id', None) is not None:
+                raise serializers.ValidationError({
+                    'recurrence': 'An occurrence cannot be recurring.'
+                })
+        if 'parent' not in attrs and 'workspace' not in attrs:
+            return attrs
+        if 'parent' in attrs:
+            parent = attrs['parent']
+        else:
+            parent = getattr(self.instance, 'parent', None)
+        if 'workspace' in attrs:
+            workspace_id = getattr(attrs['workspace'], 'pk', None)
+        else:
+            workspace_id = getattr(self.instance, 'workspace_id', None)
+        if parent is not None and parent.workspace_id != workspace_id:
+            raise serializers.ValidationError({
+                'parent': 'Subtasks must belong to the same workspace '
+                          'as their parent.'
+            })
+        return attrs
+
+    def validate_recurrence(self, recurrence):
+        if not recurrence:
+            return ''
+        try:
+            return str(RecurrenceRule.parse(recurrence))
+        except ValueError as exc:
+            raise serializers.ValidationError(str(exc))
+
+    def validate_tags(self, tags):
+        return list(dict.fromkeys(tags))
 
     def create(self, validated_data):
+        validated_data.pop('version', None)
+        tags = validated_data.pop('tags', None)
         validated_data['user'] = self.context['request'].user
-        return super().create(validated_data)
+        if validated_data.get('status') == 'completed':
+            validated_data['completed_at'] = timezone.now()
+        task = super().create(validated_data)
+        tags = Tag.for_names(task.user, tags or [])
+        if tags:
+            task.tags.set(tags)
+        # La tarea es nueva: sus etiquetas son exactamente estas, así la
+        # respuesta no las vuelve a leer de la base
+        prefetched = Tag.objects.filter(tasks=task)
+        prefetched._result_cache = sorted(tags, key=lambda tag: tag.name)
+        prefetched._prefetch_done = True
+        task._prefetched_objects_cache = {'tags': prefetched}
+        return task
+
+    def update(self, instance, validated_data):
+        tags = validated_data.pop('tags', None)
+        status = validated_data.get('status', instance.status)
+        if status != instance.status:
+            # Igual que /complete y /reopen, para que los rollups tengan
+            # el momento en que se completó
+            if status == 'completed':
+                validated_data['completed_at'] = timezone.now()
+            elif instance.status == 'completed':
+                validated_data['completed_at'] = None
+        task = super().update(instance, validated_data)
+        if tags is not None:
+            task.tags.set(Tag.for_names(task.user, tags))
+        return task
+
+
+class OccurrenceSerializer(serializers.Serializer):
+    """
+    Ocurrencia de una tarea recurrente. Las que no están materializadas
+    no tienen `id`.
+    """
+    id = serializers.IntegerField(allow_null=True)
+    series = serializers.IntegerField(source='series_id')
+    occurrence_date = UTCDateTimeField()
+    title = serializers.CharField()
+    description = serializers.CharField()
+    status = serializers.CharField()
+    priority = serializers.CharField()
+    due_date = UTCDateTimeField()
+    completed_at = UTCDateTimeField(allow_null=True)
+
+
+class WorkspaceSerializer(serializers.ModelSerializer):
+    owner = serializers.PrimaryKeyRelatedField(read_only=True)
+
+    class Meta:
+        model = Workspace
+        fields = ['id', 'name', 'owner', 'created_at']
+        read_only_fields = ['created_at']
+
+    def create(self, validated_data):
+        validated_data['owner'] = self.context['request'].user
+        workspace = super().create(validated_data)
+        WorkspaceMembership.objects.create(
+            workspace=workspace, user=workspace.owner, role='owner'
+        )
+        return workspace
+
+
+class WorkspaceMembershipSerializer(serializers.ModelSerializer):
+    user = serializers.SlugRelatedField(
+        slug_field='email',
+        queryset=Users.objects.all()
+    )
+
+    class Meta:
+        model = WorkspaceMembership
+        fields = ['id', 'user', 'role', 'created_at']
+        read_only_fields = ['role', 'created_at']
+
+
+class BatchOperationSerializer(serializers.Serializer):
+    """
+    Una operación de `POST /api/batch/`: método, ruta de la API de tareas
+    (con query string opcional), body JSON y el header `If-Match`.
+    """
+    method = serializers.ChoiceField(
+        choices=['GET', 'POST', 'PUT', 'PATCH', 'DELETE']
+    )
+    path = serializers.RegexField(r'^/api/', max_length=2000)
+    body = serializers.JSONField(required=False)
+    if_match = serializers.CharField(required=False, max_length=50)
+
+
+class BatchSerializer(serializers.Serializer):
+    operations = BatchOperationSerializer(many=True, allow_empty=False)
+
+    def validate_operations(self, operations):
+        if len(operations) > settings.BATCH_MAX_OPERATIONS:
+            raise serializers.ValidationError(
+                f'At most {settings.BATCH_MAX_OPERATIONS} operations are allowed.'
+            )
+        return operations
@@ -0,0 +1,96 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import events, rollups
+from .models import Task
+from .serializers import TaskSerializer
+
+
+def task_channels(task):
+    """
+    Las tareas de un workspace se publican solo en su canal: el creador
+    también es miembro y así no recibe el evento dos veces.
+    """
+    if task.workspace_id is not None:
+        return [events.workspace_channel(task.workspace_id)]
+    return [events.user_channel(task.user_id)]
+
+
+def transition_type(task, created):
+    if created:
+        return 'created'
+    previous = getattr(task, '_loaded_status', None)
+    if task.status == 'completed' and previous != 'completed':
+        return 'completed'
+    if previous == 'completed' and task.status != 'completed':
+        return 'reopened'
+    return 'updated'
+
+
+# Se conecta antes que publish_task_saved, que actualiza `_loaded_status`
+@receiver(post_save, sender=Task, dispatch_uid='tasks.record_task_stats')
+def record_task_stats(sender, instance, created, using, **kwargs):
+    event_type = transition_type(instance, created)
+    deltas = rollups.Deltas()
+    if created:
+        deltas.created(
+            instance.user_id, instance.created_at, task_id=instance.pk
+        )
+    if instance.status == 'completed' and instance.completed_at is not None and (
+        created or event_type == 'completed'
+    ):
+        deltas.completed(
+            instance.user_id, instance.created_at, instance.completed_at,
+            task_id=instance.pk,
+        )
+    previous = getattr(instance, '_loaded_completed_at', None)
+    if event_type == 'reopened' and previous is not None:
+        deltas.completed(
+            instance.user_id, instance.created_at, previous, sign=-1,
+            task_id=instance.pk,
+        )
+    elif (
+        event_type == 'updated'
+        and instance.status == 'completed'
+        and instance.completed_at != previous
+    ):
+        # Sigue completada pero con otro completed_at: se mueve del día y
+        # bucket anteriores a los nuevos
+        if previous is not None:
+            deltas.completed(
+                instance.user_id, instance.created_at, previous, sign=-1,
+                task_id=instance.pk,
+            )
+        if instance.completed_at is not None:
+            deltas.completed(
+                instance.user_id, instance.created_at, instance.completed_at,
+                task_id=instance.pk,
+            )
+    instance._loaded_completed_at = instance.completed_at
+    rollups.record(deltas, using)
+
+
+@receiver(post_save, sender=Task, dispatch_uid='tasks.publish_task_saved')
+def publish_task_saved(sender, instance, created, **kwargs):
+    event_type = transition_type(instance, created)
+    instance._loaded_status = instance.status
+    channels = task_channels(instance)
+    if not events.has_listeners(channels):
+        return
+    # Se serializa al confirmar la transacción, cuando ya se guardaron
+    # también las etiquetas de la tarea
+    events.publish(channels, lambda: {
+        'type': event_type,
+        'task': TaskSerializer(instance).data,
+    })
+
+
+@receiver(post_delete, sender=Task, dispatch_uid='tasks.publish_task_deleted')
+def publish_task_deleted(sender, instance, **kwargs):
+    channels = task_channels(instance)
+    if not events.has_listeners(channels):
+        return
+    events.publish(channels, {
+        'type': 'deleted',
+        'task': {'id': instance.pk},
+    })
@@ -0,0 +1,110 @@
+import pytest
+
+from django.contrib import admin
+from django.db import connection
+from django.urls import reverse
+from rest_framework import status
+
+from tasks.models import Task
+from users.models import Users
+
+
+@pytest.fixture
+def admin_client(client):
+    user = Users.objects.create_superuser(
+        username="admin", email="admin@test.com", password="adminpass123"
+    )
+    client.force_login(user)
+    return client
+
+
+@pytest.fixture
+def tasks(admin_client):
+    user = Users.objects.create_user(
+        username="testuser", email="test@test.com", password="testpass123"
+    )
+    return Task.objects.bulk_create([
+        Task(title=f"Task {index}", user=user, status=('pending', 'completed')[index % 2])
+        for index in range(5)
+    ])
+
+
+def test_admin_checks():
+    """Test los admins, que se cargan a demanda, pasan los checks del admin"""
+    reverse('admin:index')  # autodiscover
+    assert admin.site.check(None) == []
+
+
+@pytest.mark.django_db
+class TestTaskAdmin:
+    def test_changelist(self, admin_client, tasks, django_assert_max_num_queries):
+        with django_assert_max_num_queries(10):
+            response = admin_client.get(reverse('admin:tasks_task_changelist'))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.context['cl'].result_count == 5
+        assert not response.context['cl'].show_full_result_count
+        assert [task.pk for task in response.context['cl'].result_list] == sorted(
+            (task.pk for task in tasks), reverse=True
+        )
+
+    def test_filters(self, admin_client, tasks):
+        url = reverse('admin:tasks_task_changelist')
+        response = admin_client.get(url, {'status__exact': 'completed'})
+        assert response.context['cl'].result_count == 2
+
+        response = admin_client.get(url, {'user__id__exact': tasks[0].user_id})
+        assert response.context['cl'].result_count == 5
+
+    def test_user_autocomplete(self, admin_client, tasks):
+        response = admin_client.get(reverse('admin:autocomplete'), {
+            'app_label': 'tasks',
+            'model_name': 'task',
+            'field_name': 'user',
+            'term': 'test@',
+        })
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [item['text'] for item in response.json()['results']] == ['test@test.com']
+
+    def test_change_form(self, admin_client, tasks):
+        response = admin_client.get(
+            reverse('admin:tasks_task_change', args=[tasks[0].pk])
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db
+class TestUsersAdmin:
+    def test_changelist_links_tasks(self, admin_client, tasks):
+        response = admin_client.get(reverse('admin:users_users_changelist'))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert f'user__id__exact={tasks[0].user_id}'.encode() in response.content
+
+    def test_search_by_prefix(self, admin_client, tasks):
+        url = reverse('admin:users_users_changelist')
+        response = admin_client.get(url, {'q': 'TEST@'})
+        assert [user.email for user in response.context['cl'].result_list] == [
+            'test@test.com'
+        ]
+
+        response = admin_client.get(url, {'q': 'est@'})
+        assert list(response.context['cl'].result_list) == []
+
+    def test_staff_filter(self, admin_client, tasks):
+        response = admin_client.get(
+            reverse('admin:users_users_changelist'), {'is_staff__exact': '1'}
+        )
+        assert [user.email for user in response.context['cl'].result_list] == [
+            'admin@test.com'
+        ]
+
+    def test_search_uses_upper_index(self, tasks):
+        """Test la búsqueda por prefijo recorre el índice UPPER(email)"""
+        queryset = Users.objects.filter(email__istartswith='test@')
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            plan = queryset.explain()
+
+        assert 'users_email_upper_idx' in plan
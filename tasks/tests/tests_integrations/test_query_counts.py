@@ -0,0 +1,333 @@
+import pytest
+
+from datetime import timedelta
+
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from tasks.models import Tag, Task, Workspace, WorkspaceMembership
+from users.models import Users
+
+
+LIST_SIZES = [1, 10, 100]
+
+
+@pytest.fixture
+def user():
+    return Users.objects.create_user(
+        username="testuser",
+        email="test@test.com",
+        password="testpass123"
+    )
+
+
+@pytest.fixture
+def jwt_client(user):
+    """Cliente autenticado con JWT real, para contar también la autenticación"""
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+    return client
+
+
+@pytest.fixture
+def task(user):
+    return Task.objects.create(title="Test Task", user=user)
+
+
+def create_tasks(user, size, workspace=None):
+    """Crea `size` tareas con dos etiquetas cada una"""
+    Task.objects.bulk_create([
+        Task(title=f"Task {index}", user=user, workspace=workspace)
+        for index in range(size)
+    ])
+    tags = Tag.for_names(user, ['home', 'work'])
+    Task.tags.through.objects.bulk_create([
+        Task.tags.through(task_id=task_id, tag_id=tag.pk)
+        for task_id in Task.objects.filter(user=user).values_list('pk', flat=True)
+        for tag in tags
+    ])
+
+
+def create_workspace(member, size):
+    """Workspace de otro usuario con `member` y otros `size` miembros"""
+    owner = Users.objects.create_user(
+        username="owner", email="owner@test.com", password="testpass123"
+    )
+    Users.objects.bulk_create([
+        Users(username=f"member{index}", email=f"member{index}@test.com")
+        for index in range(size)
+    ])
+    workspace = Workspace.objects.create(name="Shared", owner=owner)
+    WorkspaceMembership.objects.bulk_create([
+        WorkspaceMembership(workspace=workspace, user=owner, role='owner'),
+        WorkspaceMembership(workspace=workspace, user=member),
+        *(
+            WorkspaceMembership(workspace=workspace, user=item)
+            for item in Users.objects.filter(username__startswith="member")
+        ),
+    ])
+    return workspace
+
+
+def create_chain(task, depth):
+    parent = task
+    for index in range(depth):
+        parent = Task.objects.create(
+            title=f"Subtask {index}", user=task.user, parent=parent
+        )
+
+
+# Las escrituras incluyen el upsert del token bucket (core.throttling) y
+# corren en una transacción (savepoint y release dentro del test) que al
+# final aplica los rollups diarios con un upsert por tabla
+@pytest.mark.django_db
+class TestTaskQueryBudgets:
+    @pytest.mark.parametrize('size', LIST_SIZES)
+    def test_list(self, jwt_client, user, assert_num_queries, size):
+        """Test el listado usa las mismas queries sin importar su tamaño"""
+        create_tasks(user, size)
+        # auth, tareas y prefetch de etiquetas
+        with assert_num_queries(3):
+            response = jwt_client.get(reverse('task-list'))
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data) == size
+
+    @pytest.mark.parametrize('size', LIST_SIZES)
+    def test_filtered_list(self, jwt_client, user, assert_num_queries, size):
+        """Test el listado filtrado usa las mismas queries sin importar su tamaño"""
+        create_tasks(user, size)
+        with assert_num_queries(3):
+            response = jwt_client.get(reverse('task-list'), {
+                'status': 'pending',
+                'priority': 'medium',
+                'title': 'Task',
+                'description': '',
+            })
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data) == size
+
+    @pytest.mark.parametrize('ordering', ['-created_at', 'due_date', '-priority'])
+    def test_paginated_list(self, jwt_client, user, assert_num_queries, ordering):
+        """Test cada página por cursor usa las mismas queries"""
+        create_tasks(user, 100)
+        url = reverse('task-list')
+        response = jwt_client.get(url, {'ordering': ordering, 'page_size': 10})
+        for _ in range(3):
+            # usuario, workspaces del usuario (una rama por cada uno), página
+            # y etiquetas
+            with assert_num_queries(4):
+                response = jwt_client.get(response.data['next'])
+            assert response.status_code == status.HTTP_200_OK
+            assert len(response.data['results']) == 10
+
+    @pytest.mark.parametrize('match', ['any', 'all'])
+    @pytest.mark.parametrize('size', LIST_SIZES)
+    def test_tags_filter(self, jwt_client, user, assert_num_queries, size, match):
+        """Test el filtro por etiquetas no agrega queries"""
+        create_tasks(user, size)
+        with assert_num_queries(3):
+            response = jwt_client.get(reverse('task-list'), {
+                'tags': 'home,work',
+                'tags_match': match,
+            })
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data) == size
+
+    def test_retrieve(self, jwt_client, task, assert_num_queries):
+        url = reverse('task-detail', kwargs={'pk': task.pk})
+        with assert_num_queries(3):
+            response = jwt_client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_create(self, jwt_client, assert_num_queries):
+        # la respuesta no vuelve a leer las etiquetas de la tarea nueva; los
+        # rollups leen la marca de backfill_task_stats y hacen un upsert
+        with assert_num_queries(7):
+            response = jwt_client.post(
+                reverse('task-list'), {'title': 'New Task'}, format='json'
+            )
+        assert response.status_code == status.HTTP_201_CREATED
+
+    def test_create_with_tags(self, jwt_client, user, assert_num_queries):
+        """Test las etiquetas se guardan en bloque sin importar cuántas son"""
+        Tag.for_names(user, ['home'])
+        # etiquetas existentes, INSERT de las nuevas y su SELECT,
+        # relaciones existentes e INSERT de relaciones
+        with assert_num_queries(12):
+            response = jwt_client.post(reverse('task-list'), {
+                'title': 'New Task',
+                'tags': ['home', 'work', 'errands', 'work'],
+            }, format='json')
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data['tags'] == ['errands', 'home', 'work']
+
+    def test_update(self, jwt_client, task, assert_num_queries):
+        url = reverse('task-detail', kwargs={'pk': task.pk})
+        # DRF descarta las etiquetas precargadas después de guardar
+        with assert_num_queries(8):
+            response = jwt_client.put(url, {
+                'title': 'Updated',
+                'status': 'in_progress',
+                'priority': 'high',
+            }, format='json')
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_partial_update(self, jwt_client, task, assert_num_queries):
+        url = reverse('task-detail', kwargs={'pk': task.pk})
+        with assert_num_queries(8):
+            response = jwt_client.patch(url, {'title': 'Updated'}, format='json')
+        assert response.status_code == status.HTTP_200_OK
+
+    @pytest.mark.parametrize('depth', [0, 1, 10])
+    def test_delete(self, jwt_client, task, assert_num_queries, depth):
+        """Test borrar una tarea con subtareas no depende de la profundidad"""
+        create_chain(task, depth)
+        url = reverse('task-detail', kwargs={'pk': task.pk})
+        # subárbol, subtareas y ocurrencias del subárbol (cascade),
+        # etiquetas y DELETE
+        with assert_num_queries(8):
+            response = jwt_client.delete(url)
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert not Task.objects.exists()
+
+    @pytest.mark.parametrize('depth', [0, 1, 10])
+    def test_subtree(self, jwt_client, task, assert_num_queries, depth):
+        create_chain(task, depth)
+        url = reverse('task-subtree', kwargs={'pk': task.pk})
+        with assert_num_queries(4):
+            response = jwt_client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data['tasks']) == depth + 1
+
+    @pytest.mark.parametrize('depth', [1, 10])
+    def test_complete_subtree(self, jwt_client, task, assert_num_queries, depth):
+        create_chain(task, depth)
+        url = reverse('task-complete', kwargs={'pk': task.pk})
+        # tarea y subtareas (select y update) en la misma transacción, con
+        # una lectura de la marca del backfill y un solo upsert por tabla de
+        # rollups para todas
+        with assert_num_queries(12):
+            response = jwt_client.post(f'{url}?subtree=true')
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_complete(self, jwt_client, task, assert_num_queries):
+        url = reverse('task-complete', kwargs={'pk': task.pk})
+        with assert_num_queries(10):
+            response = jwt_client.post(url)
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_reopen(self, jwt_client, task, assert_num_queries):
+        url = reverse('task-reopen', kwargs={'pk': task.pk})
+        with assert_num_queries(7):
+            response = jwt_client.post(url)
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_idempotent_replay(self, jwt_client, task, assert_num_queries):
+        """Test un reintento con Idempotency-Key solo autentica, consume un token y lee la respuesta"""
+        url = reverse('task-reopen', kwargs={'pk': task.pk})
+        jwt_client.post(url, HTTP_IDEMPOTENCY_KEY='retry')
+        with assert_num_queries(3):
+            response = jwt_client.post(url, HTTP_IDEMPOTENCY_KEY='retry')
+        assert response['Idempotent-Replayed'] == 'true'
+
+    def test_events(self, user, assert_num_queries, settings):
+        settings.TASK_EVENTS_MAX_STREAM_SECONDS = 0
+
+        async def read():
+            response = await AsyncClient().get(
+                reverse('task-events'),
+                headers={'Authorization': f'Bearer {AccessToken.for_user(user)}'},
+                HTTP_ACCEPT='text/event-stream'
+            )
+            return response, [chunk async for chunk in response.streaming_content]
+
+        # auth y workspaces del usuario para suscribirse a sus canales
+        with assert_num_queries(2):
+            response, _ = async_to_sync(read)()
+        assert response.status_code == status.HTTP_200_OK
+
+    @pytest.mark.parametrize('members', [1, 10, 100])
+    def test_workspace_list(self, jwt_client, user, assert_num_queries, members):
+        """Test el acceso por workspace no depende de la cantidad de miembros"""
+        workspace = create_workspace(user, members)
+        create_tasks(workspace.owner, 10, workspace=workspace)
+        with assert_num_queries(3):
+            response = jwt_client.get(reverse('task-list'))
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data) == 10
+
+    def test_workspace_task_update(self, jwt_client, user, assert_num_queries):
+        workspace = create_workspace(user, 10)
+        task = Task.objects.create(
+            title="Shared", user=workspace.owner, workspace=workspace
+        )
+        url = reverse('task-detail', kwargs={'pk': task.pk})
+        with assert_num_queries(8):
+            response = jwt_client.patch(url, {'title': 'Updated'}, format='json')
+        assert response.status_code == status.HTTP_200_OK
+
+    @pytest.mark.parametrize('size', LIST_SIZES)
+    def test_occurrences(self, jwt_client, user, assert_num_queries, size):
+        """Test expandir tareas recurrentes no agrega queries por serie"""
+        due_date = timezone.now()
+        Task.objects.bulk_create([
+            Task(
+                title=f"Series {index}",
+                user=user,
+                recurrence='FREQ=DAILY',
+                due_date=due_date
+            )
+            for index in range(size)
+        ])
+        params = {
+            'start': due_date.isoformat(),
+            'end': (due_date + timedelta(days=7)).isoformat(),
+        }
+        # auth, series y ocurrencias materializadas de la ventana
+        with assert_num_queries(3):
+            response = jwt_client.get(reverse('task-occurrences'), params)
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data) == size * 7
+
+    @pytest.mark.parametrize('size', [1, 10])
+    def test_batch(self, jwt_client, user, assert_num_queries, size):
+        """Test el batch autentica una sola vez para todas las operaciones"""
+        Task.objects.bulk_create([
+            Task(title=f"Task {index}", user=user) for index in range(size)
+        ])
+        operations = [
+            {'method': 'POST', 'path': f'/api/tasks/{pk}/complete/'}
+            for pk in Task.objects.values_list('pk', flat=True)
+        ]
+        # auth, savepoint y release de la transacción, la marca del backfill
+        # y los upserts de los rollups de todas las operaciones; 4 por
+        # operación (token bucket, tarea, etiquetas y update)
+        with assert_num_queries(1 + 2 + 3 + size * 4):
+            response = jwt_client.post(
+                reverse('batch'), {'operations': operations}, format='json'
+            )
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_other_user_task_not_found(self, jwt_client, assert_num_queries):
+        """Test acceder a una tarea ajena no agrega queries"""
+        other = Users.objects.create_user(
+            username="otheruser",
+            email="other@test.com",
+            password="testpass123"
+        )
+        task = Task.objects.create(title="Other", user=other)
+        url = reverse('task-detail', kwargs={'pk': task.pk})
+        with assert_num_queries(2):
+            response = jwt_client.get(url)
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_unauthenticated(self, assert_num_queries):
+        """Test un request sin token no toca la base"""
+        with assert_num_queries(0):
+            response = APIClient().get(reverse('task-list'))
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
@@ -1,11 +1,34 @@
+import hashlib
+
 import pytest
 
+from datetime import datetime, timedelta
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import QuerySet
+from django.test import AsyncClient
 from django.urls import reverse
 from rest_framework import status
-from rest_framework.test import APIClient
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
 from django.utils import timezone
 
-from tasks.models import Task
+from core import idempotency
+from core.models import IdempotencyKey
+from tasks import rollups
+from tasks.management.commands.backfill_task_stats import Command
+from tasks.models import (
+    Tag,
+    Task,
+    TaskCompletionTimes,
+    TaskDailyStats,
+    TaskStatsRebuild,
+    Workspace,
+    WorkspaceMembership,
+)
+from tasks.pagination import ordering_expressions
 from users.models import Users
 
 
@@ -156,6 +179,50 @@ class TestTaskViewSet:
         assert task.status == 'pending'
         assert task.completed_at is None
 
+    def test_events_stream(
+        self, user, settings, django_capture_on_commit_callbacks
+    ):
+        """Test stream SSE con los cambios de las tareas del usuario"""
+        settings.TASK_EVENTS_HEARTBEAT = 0.01
+        settings.TASK_EVENTS_MAX_STREAM_SECONDS = 1
+
+        def create_task():
+            with django_capture_on_commit_callbacks(execute=True):
+                Task.objects.create(title="Streamed Task", user=user)
+
+        async def read():
+            response = await AsyncClient().get(
+                reverse('task-events'),
+                headers={'Authorization': f'Bearer {AccessToken.for_user(user)}'},
+                HTTP_ACCEPT='text/event-stream'
+            )
+            content = response.streaming_content
+            first = await anext(content)
+            await sync_to_async(create_task)()
+            message = await anext(content)
+            await content.aclose()
+            return response, first, message.decode()
+
+        response, first, message = async_to_sync(read)()
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response['Content-Type'] == 'text/event-stream'
+        assert first.startswith(b'retry:')
+        assert 'event: created' in message
+        assert 'Streamed Task' in message
+
+    def test_events_stream_unauthorized(self):
+        """Test el stream SSE requiere autenticación"""
+        response = async_to_sync(AsyncClient().get)(
+            reverse('task-events'), HTTP_ACCEPT='text/event-stream'
+        )
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_events_stream_requires_asgi(self, authenticated_client):
+        """Test el stream no ocupa workers de uWSGI"""
+        response = authenticated_client.get(reverse('task-events'))
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+
     def test_unauthorized_access(self, api_client, task):
         """Test acceso no autorizado"""
         url = reverse('task-list')
@@ -197,6 +264,14 @@ class TestTaskViewSet:
         assert response.status_code == status.HTTP_200_OK
         assert len(response.data) == expected_count
 
+    def test_filter_unknown_status(self, authenticated_client, task):
+        """Test filtrar por un estado inexistente no devuelve tareas"""
+        url = reverse('task-list')
+        response = authenticated_client.get(url, {'status': 'unknown'})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data == []
+
     def test_multiple_filters(self, authenticated_client, user):
         """Test múltiples filtros combinados"""
         Task.objects.create(
@@ -223,3 +298,1032 @@ class TestTaskViewSet:
         assert response.status_code == status.HTTP_200_OK
         assert len(response.data) == 1
         assert response.data[0]['title'] == "High Priority Task"
+
+
+@pytest.mark.django_db
+class TestIdempotency:
+    def test_create_replayed(self, authenticated_client, user):
+        """Test un reintento con la misma clave no duplica la tarea"""
+        url = reverse('task-list')
+        data = {'title': 'New Task'}
+        first = authenticated_client.post(url, data, HTTP_IDEMPOTENCY_KEY='k1')
+        second = authenticated_client.post(url, data, HTTP_IDEMPOTENCY_KEY='k1')
+
+        assert first.status_code == status.HTTP_201_CREATED
+        assert second.status_code == status.HTTP_201_CREATED
+        assert second.data == first.data
+        assert second['Idempotent-Replayed'] == 'true'
+        assert Task.objects.filter(user=user).count() == 1
+
+    def test_different_keys_create_twice(self, authenticated_client, user):
+        """Test claves distintas crean tareas distintas"""
+        url = reverse('task-list')
+        authenticated_client.post(url, {'title': 'A'}, HTTP_IDEMPOTENCY_KEY='k1')
+        authenticated_client.post(url, {'title': 'A'}, HTTP_IDEMPOTENCY_KEY='k2')
+        assert Task.objects.filter(user=user).count() == 2
+
+    def test_key_reused_with_other_payload(self, authenticated_client):
+        """Test reusar la clave con otro body responde 422"""
+        url = reverse('task-list')
+        authenticated_client.post(url, {'title': 'A'}, HTTP_IDEMPOTENCY_KEY='k1')
+        response = authenticated_client.post(
+            url, {'title': 'B'}, HTTP_IDEMPOTENCY_KEY='k1'
+        )
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    def test_keys_scoped_per_user(
+        self, api_client, user, other_user
+    ):
+        """Test la misma clave de otro usuario no reutiliza la respuesta"""
+        url = reverse('task-list')
+        api_client.force_authenticate(user=user)
+        api_client.post(url, {'title': 'A'}, HTTP_IDEMPOTENCY_KEY='k1')
+        api_client.force_authenticate(user=other_user)
+        response = api_client.post(url, {'title': 'A'}, HTTP_IDEMPOTENCY_KEY='k1')
+
+        assert not response.has_header('Idempotent-Replayed')
+        assert Task.objects.filter(user=other_user).count() == 1
+
+    def test_complete_replayed_without_running_again(
+        self, authenticated_client, task, django_assert_num_queries
+    ):
+        """Test el reintento de complete solo consume un token y lee la respuesta guardada"""
+        url = reverse('task-complete', kwargs={'pk': task.pk})
+        first = authenticated_client.post(url, HTTP_IDEMPOTENCY_KEY='k1')
+        with django_assert_num_queries(2):
+            second = authenticated_client.post(url, HTTP_IDEMPOTENCY_KEY='k1')
+
+        assert second.status_code == status.HTTP_200_OK
+        assert second.data == first.data
+
+    def test_in_progress_key(self, authenticated_client, user):
+        """Test un reintento mientras el primero sigue en curso responde 409"""
+        url = reverse('task-list')
+        request = APIRequestFactory().post(url, {'title': 'A'}, format='json')
+        claimed, _ = idempotency.claim(
+            user,
+            hashlib.sha256(b'k1').hexdigest(),
+            idempotency._fingerprint(request),
+        )
+        assert claimed is not None
+
+        response = authenticated_client.post(
+            url, {'title': 'A'}, format='json', HTTP_IDEMPOTENCY_KEY='k1'
+        )
+        assert response.status_code == status.HTTP_409_CONFLICT
+        assert not Task.objects.filter(user=user).exists()
+
+    def test_expired_key_runs_again(self, authenticated_client, user):
+        url = reverse('task-list')
+        authenticated_client.post(url, {'title': 'A'}, HTTP_IDEMPOTENCY_KEY='k1')
+        IdempotencyKey.objects.update(expires_at=timezone.now())
+
+        response = authenticated_client.post(url, {'title': 'A'}, HTTP_IDEMPOTENCY_KEY='k1')
+
+        assert not response.has_header('Idempotent-Replayed')
+        assert Task.objects.filter(user=user).count() == 2
+        assert IdempotencyKey.objects.get().status == status.HTTP_201_CREATED
+
+
+@pytest.mark.django_db
+class TestOptimisticConcurrency:
+    def test_update_with_current_version(self, authenticated_client, task):
+        """Test actualizar enviando la versión vigente"""
+        url = reverse('task-detail', kwargs={'pk': task.pk})
+        response = authenticated_client.patch(
+            url, {'title': 'Updated', 'version': 1}
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['version'] == 2
+
+    def test_update_with_stale_version(self, authenticated_client, task):
+        """Test una edición con versión vieja responde 409 sin pisar cambios"""
+        Task.objects.filter(pk=task.pk).update(title='Other device', version=2)
+        url = reverse('task-detail', kwargs={'pk': task.pk})
+        response = authenticated_client.patch(
+            url, {'title': 'Updated', 'version': 1}
+        )
+
+        assert response.status_code == status.HTTP_409_CONFLICT
+        task.refresh_from_db()
+        assert task.title == 'Other device'
+
+    def test_update_with_stale_if_match(self, authenticated_client, task):
+        """Test la versión esperada también se acepta en If-Match"""
+        Task.objects.filter(pk=task.pk).update(version=2)
+        url = reverse('task-detail', kwargs={'pk': task.pk})
+        response = authenticated_client.patch(
+            url, {'title': 'Updated'}, HTTP_IF_MATCH='"1"'
+        )
+        assert response.status_code == status.HTTP_409_CONFLICT
+
+    def test_complete_with_stale_if_match(self, authenticated_client, task):
+        """Test completar con una versión vieja responde 409"""
+        Task.objects.filter(pk=task.pk).update(version=3)
+        url = reverse('task-complete', kwargs={'pk': task.pk})
+        response = authenticated_client.post(url, HTTP_IF_MATCH='2')
+
+        assert response.status_code == status.HTTP_409_CONFLICT
+        task.refresh_from_db()
+        assert task.status == 'pending'
+
+    def test_complete_with_current_if_match(self, authenticated_client, task):
+        """Test completar con la versión vigente"""
+        url = reverse('task-complete', kwargs={'pk': task.pk})
+        response = authenticated_client.post(url, HTTP_IF_MATCH='1')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['version'] == 2
+
+    def test_invalid_if_match(self, authenticated_client, task):
+        """Test If-Match debe ser un número de versión"""
+        url = reverse('task-reopen', kwargs={'pk': task.pk})
+        response = authenticated_client.post(url, HTTP_IF_MATCH='abc')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+class TestSubtasks:
+    def test_create_subtask(self, authenticated_client, task):
+        """Test crear una subtarea"""
+        url = reverse('task-list')
+        response = authenticated_client.post(
+            url, {'title': 'Subtask', 'parent': task.pk}
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data['parent'] == task.pk
+
+    def test_parent_must_belong_to_user(
+        self, authenticated_client, other_user_task
+    ):
+        """Test no se puede usar como padre una tarea ajena"""
+        url = reverse('task-list')
+        response = authenticated_client.post(
+            url, {'title': 'Subtask', 'parent': other_user_task.pk}
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'parent' in response.data
+
+    def test_cannot_move_under_descendant(self, authenticated_client, task, user):
+        """Test no se puede mover una tarea debajo de su propio subárbol"""
+        child = Task.objects.create(title="Child", user=user, parent=task)
+        url = reverse('task-detail', kwargs={'pk': task.pk})
+        response = authenticated_client.patch(url, {'parent': child.pk})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_max_depth(self, authenticated_client, task, settings):
+        """Test límite de anidamiento de subtareas"""
+        settings.TASK_MAX_DEPTH = 2
+        url = reverse('task-list')
+        response = authenticated_client.post(
+            url, {'title': 'Child', 'parent': task.pk}
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+
+        response = authenticated_client.post(
+            url, {'title': 'Grandchild', 'parent': response.data['id']}
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_filter_by_parent(self, authenticated_client, task, user):
+        """Test filtrar por tarea padre y por tareas raíz"""
+        child = Task.objects.create(title="Child", user=user, parent=task)
+        url = reverse('task-list')
+
+        response = authenticated_client.get(url, {'parent': task.pk})
+        assert [item['id'] for item in response.data] == [child.pk]
+
+        response = authenticated_client.get(url, {'parent': 'null'})
+        assert [item['id'] for item in response.data] == [task.pk]
+
+    def test_filter_by_invalid_parent(self, authenticated_client):
+        """Test un parent que no es un id responde 400"""
+        response = authenticated_client.get(
+            reverse('task-list'), {'parent': 'abc'}
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'parent' in response.data
+
+    def test_subtree(self, authenticated_client, task, user):
+        """Test obtener el subárbol con la cantidad de subtareas pendientes"""
+        child = Task.objects.create(title="Child", user=user, parent=task)
+        Task.objects.create(
+            title="Done", user=user, parent=child, status='completed'
+        )
+        Task.objects.create(title="Unrelated", user=user)
+
+        url = reverse('task-subtree', kwargs={'pk': task.pk})
+        response = authenticated_client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data['tasks']) == 3
+        assert response.data['incomplete_descendants'] == 1
+
+    def test_complete_subtree(self, authenticated_client, task, user):
+        """Test completar una tarea con todo su subárbol"""
+        child = Task.objects.create(title="Child", user=user, parent=task)
+        grandchild = Task.objects.create(title="Grandchild", user=user, parent=child)
+
+        url = reverse('task-complete', kwargs={'pk': task.pk})
+        response = authenticated_client.post(f'{url}?subtree=true')
+
+        assert response.status_code == status.HTTP_200_OK
+        for item in (task, child, grandchild):
+            item.refresh_from_db()
+            assert item.status == 'completed'
+            assert item.completed_at is not None
+        assert grandchild.version == 2
+
+    def test_complete_subtree_keeps_cancelled(self, authenticated_client, task, user):
+        """Test completar el subárbol no cambia las subtareas canceladas"""
+        cancelled = Task.objects.create(
+            title="Cancelled", user=user, parent=task, status='cancelled'
+        )
+        in_progress = Task.objects.create(
+            title="In progress", user=user, parent=task, status='in_progress'
+        )
+
+        url = reverse('task-complete', kwargs={'pk': task.pk})
+        authenticated_client.post(f'{url}?subtree=true')
+
+        cancelled.refresh_from_db()
+        in_progress.refresh_from_db()
+        assert cancelled.status == 'cancelled'
+        assert cancelled.completed_at is None
+        assert in_progress.status == 'completed'
+
+    def test_complete_subtree_is_atomic(
+        self, authenticated_client, task, user, monkeypatch
+    ):
+        """Test si falla completar las subtareas la tarea no queda completada"""
+        Task.objects.create(title="Child", user=user, parent=task)
+
+        def fail(self, **kwargs):
+            raise RuntimeError('update failed')
+
+        # Model.save no usa QuerySet.update: solo falla el de las subtareas
+        monkeypatch.setattr(QuerySet, 'update', fail)
+        url = reverse('task-complete', kwargs={'pk': task.pk})
+        with pytest.raises(RuntimeError):
+            authenticated_client.post(f'{url}?subtree=true')
+
+        task.refresh_from_db()
+        assert task.status == 'pending'
+
+    def test_complete_without_subtree(self, authenticated_client, task, user):
+        """Test completar sin `subtree` no toca las subtareas"""
+        child = Task.objects.create(title="Child", user=user, parent=task)
+        url = reverse('task-complete', kwargs={'pk': task.pk})
+        authenticated_client.post(url)
+
+        child.refresh_from_db()
+        assert child.status == 'pending'
+
+
+@pytest.mark.django_db
+class TestTags:
+    @pytest.fixture
+    def tagged_tasks(self, user):
+        home = Task.objects.create(title="Home", user=user)
+        work = Task.objects.create(title="Work", user=user)
+        both = Task.objects.create(title="Both", user=user)
+        home.tags.set(Tag.for_names(user, ['home']))
+        work.tags.set(Tag.for_names(user, ['work']))
+        both.tags.set(Tag.for_names(user, ['home', 'work']))
+        Task.objects.create(title="Untagged", user=user)
+        return home, work, both
+
+    def test_create_with_tags(self, authenticated_client):
+        """Test crear una tarea con etiquetas"""
+        url = reverse('task-list')
+        response = authenticated_client.post(
+            url, {'title': 'Tagged', 'tags': ['work', 'urgent']}, format='json'
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data['tags'] == ['urgent', 'work']
+
+    def test_filter_any(self, authenticated_client, tagged_tasks):
+        """Test filtrar tareas con alguna de las etiquetas"""
+        url = reverse('task-list')
+        response = authenticated_client.get(url, {'tags': 'home,work'})
+        assert {item['title'] for item in response.data} == {
+            'Home', 'Work', 'Both'
+        }
+
+    def test_filter_all(self, authenticated_client, tagged_tasks):
+        """Test filtrar tareas con todas las etiquetas"""
+        url = reverse('task-list')
+        response = authenticated_client.get(
+            url, {'tags': 'home,work', 'tags_match': 'all'}
+        )
+        assert [item['title'] for item in response.data] == ['Both']
+        assert response.data[0]['tags'] == ['home', 'work']
+
+    def test_filter_other_user_tags(
+        self, authenticated_client, tagged_tasks, other_user_task
+    ):
+        """Test el filtro no devuelve tareas de otros usuarios"""
+        other_user_task.tags.set(Tag.for_names(other_user_task.user, ['home']))
+        url = reverse('task-list')
+        response = authenticated_client.get(url, {'tags': 'home'})
+        assert {item['title'] for item in response.data} == {'Home', 'Both'}
+
+    def test_invalid_match(self, authenticated_client):
+        """Test valor inválido de tags_match"""
+        url = reverse('task-list')
+        response = authenticated_client.get(
+            url, {'tags': 'home', 'tags_match': 'some'}
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+class TestWorkspaces:
+    @pytest.fixture
+    def workspace(self, other_user, user):
+        """Workspace de otro usuario del que `user` es miembro"""
+        workspace = Workspace.objects.create(name="Shared", owner=other_user)
+        WorkspaceMembership.objects.create(
+            workspace=workspace, user=other_user, role='owner'
+        )
+        WorkspaceMembership.objects.create(workspace=workspace, user=user)
+        return workspace
+
+    @pytest.fixture
+    def shared_task(self, workspace, other_user):
+        return Task.objects.create(
+            title="Shared Task", user=other_user, workspace=workspace
+        )
+
+    def test_create_workspace(self, authenticated_client, user):
+        """Test el creador queda como dueño y miembro del workspace"""
+        url = reverse('workspace-list')
+        response = authenticated_client.post(url, {'name': 'Team'})
+
+        assert response.status_code == status.HTTP_201_CREATED
+        workspace = Workspace.objects.get(pk=response.data['id'])
+        assert workspace.owner == user
+        assert workspace.memberships.get().role == 'owner'
+
+    def test_member_sees_workspace_tasks(
+        self, authenticated_client, task, shared_task, other_user_task
+    ):
+        """Test un miembro ve sus tareas y las del workspace, no otras"""
+        response = authenticated_client.get(reverse('task-list'))
+        assert {item['id'] for item in response.data} == {
+            task.pk, shared_task.pk
+        }
+
+    def test_member_can_complete_workspace_task(
+        self, authenticated_client, shared_task
+    ):
+        url = reverse('task-complete', kwargs={'pk': shared_task.pk})
+        response = authenticated_client.post(url)
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_create_task_in_workspace(self, authenticated_client, workspace):
+        response = authenticated_client.post(
+            reverse('task-list'),
+            {'title': 'Shared', 'workspace': workspace.pk}
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data['workspace'] == workspace.pk
+
+    def test_create_task_in_foreign_workspace(
+        self, authenticated_client, other_user
+    ):
+        """Test no se pueden crear tareas en workspaces ajenos"""
+        workspace = Workspace.objects.create(name="Private", owner=other_user)
+        response = authenticated_client.post(
+            reverse('task-list'),
+            {'title': 'Shared', 'workspace': workspace.pk}
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'workspace' in response.data
+
+    def test_subtask_must_share_workspace(
+        self, authenticated_client, shared_task
+    ):
+        """Test una subtarea debe estar en el workspace de su padre"""
+        response = authenticated_client.post(
+            reverse('task-list'),
+            {'title': 'Subtask', 'parent': shared_task.pk}
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'parent' in response.data
+
+    def test_add_member_only_owner(self, authenticated_client, workspace):
+        """Test solo el dueño agrega miembros"""
+        Users.objects.create_user(
+            username="third", email="third@test.com", password="testpass123"
+        )
+        url = reverse('workspace-members', kwargs={'pk': workspace.pk})
+        response = authenticated_client.post(url, {'user': 'third@test.com'})
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_add_member(self, authenticated_client, user):
+        workspace = Workspace.objects.create(name="Team", owner=user)
+        WorkspaceMembership.objects.create(
+            workspace=workspace, user=user, role='owner'
+        )
+        Users.objects.create_user(
+            username="third", email="third@test.com", password="testpass123"
+        )
+        url = reverse('workspace-members', kwargs={'pk': workspace.pk})
+
+        response = authenticated_client.post(url, {'user': 'third@test.com'})
+        assert response.status_code == status.HTTP_201_CREATED
+
+        response = authenticated_client.post(url, {'user': 'third@test.com'})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+        response = authenticated_client.get(url)
+        assert {item['user'] for item in response.data} == {
+            'test@test.com', 'third@test.com'
+        }
+
+    def test_leave_workspace(
+        self, authenticated_client, user, workspace, shared_task
+    ):
+        """Test al salir del workspace se pierde el acceso a sus tareas"""
+        url = reverse(
+            'workspace-remove-member',
+            kwargs={'pk': workspace.pk, 'user_id': user.pk}
+        )
+        response = authenticated_client.delete(url)
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+
+        url = reverse('task-detail', kwargs={'pk': shared_task.pk})
+        response = authenticated_client.get(url)
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_non_member_cannot_see_workspace(
+        self, api_client, other_user, workspace
+    ):
+        third = Users.objects.create_user(
+            username="third", email="third@test.com", password="testpass123"
+        )
+        api_client.force_authenticate(user=third)
+        url = reverse('workspace-detail', kwargs={'pk': workspace.pk})
+        response = api_client.get(url)
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+class TestRecurringTasks:
+    @pytest.fixture
+    def series(self, user):
+        return Task.objects.create(
+            title="Standup",
+            user=user,
+            recurrence='FREQ=DAILY',
+            due_date=timezone.make_aware(datetime(2026, 10, 1, 9, 0)),
+        )
+
+    def test_create_recurring_task(self, authenticated_client):
+        response = authenticated_client.post(reverse('task-list'), {
+            'title': 'Gym',
+            'recurrence': 'freq=weekly;byday=mo,th',
+            'due_date': '2026-10-19T07:00:00Z',
+        })
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data['recurrence'] == 'FREQ=WEEKLY;BYDAY=MO,TH'
+
+    def test_recurring_task_needs_due_date(self, authenticated_client):
+        response = authenticated_client.post(reverse('task-list'), {
+            'title': 'Gym', 'recurrence': 'FREQ=DAILY'
+        })
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'due_date' in response.data
+
+    def test_invalid_recurrence(self, authenticated_client):
+        response = authenticated_client.post(reverse('task-list'), {
+            'title': 'Gym',
+            'recurrence': 'FREQ=HOURLY',
+            'due_date': '2026-10-19T07:00:00Z',
+        })
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'recurrence' in response.data
+
+    def test_occurrences_are_not_stored(self, authenticated_client, series):
+        """Test las ocurrencias se calculan sin crear filas"""
+        url = reverse('task-occurrences')
+        response = authenticated_client.get(
+            url, {'start': '2026-10-10', 'end': '2026-10-13'}
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert [item['occurrence_date'] for item in response.data] == [
+            '2026-10-10T09:00:00Z',
+            '2026-10-11T09:00:00Z',
+            '2026-10-12T09:00:00Z',
+        ]
+        assert all(item['id'] is None for item in response.data)
+        assert Task.objects.count() == 1
+
+    def test_complete_occurrence(self, authenticated_client, series):
+        """Test completar una ocurrencia materializa solo esa"""
+        url = reverse('task-complete', kwargs={'pk': series.pk})
+        response = authenticated_client.post(
+            f'{url}?occurrence=2026-10-11T09:00:00Z'
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['series'] == series.pk
+        assert response.data['status'] == 'completed'
+        assert Task.objects.count() == 2
+
+        series.refresh_from_db()
+        assert series.status == 'pending'
+
+        response = authenticated_client.get(
+            reverse('task-occurrences'),
+            {'start': '2026-10-10', 'end': '2026-10-13'}
+        )
+        assert [item['status'] for item in response.data] == [
+            'pending', 'completed', 'pending'
+        ]
+
+    def test_complete_occurrence_twice(self, authenticated_client, series):
+        url = reverse('task-complete', kwargs={'pk': series.pk})
+        authenticated_client.post(f'{url}?occurrence=2026-10-11T09:00:00Z')
+        response = authenticated_client.post(
+            f'{url}?occurrence=2026-10-11T09:00:00Z'
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert Task.objects.count() == 2
+
+    def test_complete_invalid_occurrence(self, authenticated_client, series):
+        url = reverse('task-complete', kwargs={'pk': series.pk})
+        response = authenticated_client.post(
+            f'{url}?occurrence=2026-10-11T10:00:00Z'
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'occurrence' in response.data
+
+    def test_occurrences_window_limit(self, authenticated_client, series):
+        response = authenticated_client.get(
+            reverse('task-occurrences'),
+            {'start': '2026-01-01', 'end': '2027-01-01'}
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'end' in response.data
+
+
+@pytest.mark.django_db
+class TestOrdering:
+    @pytest.fixture
+    def tasks(self, user):
+        now = timezone.now()
+        return [
+            Task.objects.create(
+                title=f"Task {index}",
+                user=user,
+                priority=priority,
+                due_date=None if index == 0 else now + timedelta(days=index),
+            )
+            for index, priority in enumerate(['medium', 'high', 'low', 'high'])
+        ]
+
+    def test_priority_by_severity(self, authenticated_client, tasks):
+        """Test ordenar por prioridad usa la severidad y no el orden alfabético"""
+        response = authenticated_client.get(
+            reverse('task-list'), {'ordering': '-priority'}
+        )
+        assert [item['priority'] for item in response.data] == [
+            'high', 'high', 'medium', 'low'
+        ]
+
+    def test_status_by_workflow(self, authenticated_client, user):
+        """Test ordenar por estado sigue el flujo de trabajo"""
+        for task_status in ['cancelled', 'completed', 'pending', 'in_progress']:
+            Task.objects.create(title=task_status, user=user, status=task_status)
+        response = authenticated_client.get(
+            reverse('task-list'), {'ordering': 'status'}
+        )
+        assert [item['status'] for item in response.data] == [
+            'pending', 'in_progress', 'completed', 'cancelled'
+        ]
+
+    def test_due_date_nulls_last(self, authenticated_client, tasks):
+        response = authenticated_client.get(
+            reverse('task-list'), {'ordering': 'due_date'}
+        )
+        assert [item['title'] for item in response.data] == [
+            'Task 1', 'Task 2', 'Task 3', 'Task 0'
+        ]
+
+    def test_invalid_ordering(self, authenticated_client):
+        response = authenticated_client.get(
+            reverse('task-list'), {'ordering': 'title'}
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'ordering' in response.data
+
+
+@pytest.mark.django_db
+class TestCursorPagination:
+    @pytest.fixture
+    def tasks(self, user):
+        now = timezone.now()
+        return [
+            Task.objects.create(
+                title=f"Task {index}",
+                user=user,
+                priority=['low', 'medium', 'high'][index % 3],
+                due_date=(
+                    None if index % 4 == 0
+                    else now + timedelta(days=index % 5)
+                ),
+            )
+            for index in range(23)
+        ]
+
+    def test_without_params_is_not_paginated(self, authenticated_client, tasks):
+        """Test sin `cursor` ni `page_size` se devuelve la lista completa"""
+        response = authenticated_client.get(reverse('task-list'))
+        assert isinstance(response.data, list)
+        assert len(response.data) == 23
+
+    @pytest.mark.parametrize('ordering', [
+        '-created_at', 'due_date', '-due_date', 'priority', '-priority',
+        'status', 'updated_at',
+    ])
+    def test_pages_forward_and_back(self, authenticated_client, tasks, ordering):
+        """Test recorrer las páginas en ambos sentidos con valores repetidos"""
+        url = reverse('task-list')
+        expected = [
+            item['id'] for item in authenticated_client.get(
+                url, {'ordering': ordering}
+            ).data
+        ]
+
+        pages = []
+        response = authenticated_client.get(
+            url, {'ordering': ordering, 'page_size': 5}
+        )
+        assert response.data['previous'] is None
+        while True:
+            pages.append([item['id'] for item in response.data['results']])
+            if response.data['next'] is None:
+                break
+            response = authenticated_client.get(response.data['next'])
+        assert [pk for page in pages for pk in page] == expected
+        assert len(pages) == 5
+
+        for page in reversed(pages[:-1]):
+            response = authenticated_client.get(response.data['previous'])
+            assert [item['id'] for item in response.data['results']] == page
+        assert response.data['previous'] is None
+
+    def test_invalid_cursor(self, authenticated_client, tasks):
+        response = authenticated_client.get(
+            reverse('task-list'), {'cursor': 'invalid'}
+        )
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_pages_include_workspace_tasks(
+        self, authenticated_client, user, other_user
+    ):
+        """Test las tareas propias y las del workspace se combinan sin repetirse"""
+        workspace = Workspace.objects.create(name="Shared", owner=other_user)
+        WorkspaceMembership.objects.bulk_create([
+            WorkspaceMembership(workspace=workspace, user=other_user, role='owner'),
+            WorkspaceMembership(workspace=workspace, user=user),
+        ])
+        for index in range(9):
+            Task.objects.create(
+                title=f"Task {index}",
+                user=(user, other_user)[index % 2],
+                workspace=workspace if index % 3 else None,
+            )
+        Task.objects.create(title="Private", user=other_user)
+        url = reverse('task-list')
+        expected = [item['id'] for item in authenticated_client.get(url).data]
+
+        ids = []
+        response = authenticated_client.get(url, {'page_size': 2})
+        while True:
+            ids.extend(item['id'] for item in response.data['results'])
+            if response.data['next'] is None:
+                break
+            response = authenticated_client.get(response.data['next'])
+
+        assert ids == expected
+        assert len(ids) == 8
+
+    def test_branches_use_ordered_index_scans(self, user, other_user):
+        """Test cada rama recorre su índice en orden, sin ordenar las filas"""
+        for name in ('Shared', 'Team'):
+            workspace = Workspace.objects.create(name=name, owner=other_user)
+            WorkspaceMembership.objects.create(workspace=workspace, user=user)
+        ordering = ordering_expressions('created_at', True)
+        branches = [
+            Task.objects.filter(branch).order_by(*ordering)[:51]
+            for branch in Task.visibility_branches(user)
+        ]
+        query = branches[0].union(*branches[1:], all=True).order_by(*ordering)[:51]
+        sql, params = query.query.sql_with_params()
+        with connection.cursor() as cursor:
+            # Con tablas de pocas filas el planner preferiría un seq scan
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0][0]['Plan']
+
+        def nodes(node):
+            yield node
+            for child in node.get('Plans', []):
+                yield from nodes(child)
+
+        # Merge Append si Postgres une las ramas ya ordenadas, Append + Sort
+        # si no: en los dos casos las ramas son sus hijos
+        append = next(
+            node for node in nodes(plan)
+            if node['Node Type'] in ('Append', 'Merge Append')
+        )
+        indexes = ['tasks_user_created_idx'] + ['tasks_workspace_created_idx'] * 2
+        assert len(append['Plans']) == len(indexes)
+        for branch_plan, index in zip(append['Plans'], indexes):
+            types = {node['Node Type'] for node in nodes(branch_plan)}
+            assert 'Sort' not in types
+            assert 'Bitmap Heap Scan' not in types
+            assert index in {node.get('Index Name') for node in nodes(branch_plan)}
+
+
+@pytest.mark.django_db
+class TestBatch:
+    def post(self, client, operations):
+        return client.post(
+            reverse('batch'), {'operations': operations}, format='json'
+        )
+
+    def test_runs_operations_in_order(self, authenticated_client, task):
+        response = self.post(authenticated_client, [
+            {'method': 'POST', 'path': '/api/tasks/', 'body': {'title': 'New'}},
+            {'method': 'POST', 'path': f'/api/tasks/{task.pk}/complete/'},
+            {'method': 'GET', 'path': '/api/tasks/?status=completed'},
+            {'method': 'DELETE', 'path': f'/api/tasks/{task.pk}/'},
+        ])
+
+        assert response.status_code == status.HTTP_200_OK
+        results = response.data['results']
+        assert [result['status'] for result in results] == [201, 200, 200, 204]
+        assert results[0]['body']['title'] == 'New'
+        assert [item['id'] for item in results[2]['body']] == [task.pk]
+        assert list(Task.objects.values_list('title', flat=True)) == ['New']
+
+    def test_failure_rolls_back(self, authenticated_client, task):
+        """Test si una operación falla se deshacen las anteriores"""
+        response = self.post(authenticated_client, [
+            {'method': 'PATCH', 'path': f'/api/tasks/{task.pk}/', 'body': {'title': 'Changed'}},
+            {'method': 'POST', 'path': '/api/tasks/', 'body': {'title': ''}},
+            {'method': 'DELETE', 'path': f'/api/tasks/{task.pk}/'},
+        ])
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data['failed'] == 1
+        assert len(response.data['results']) == 2
+        assert 'title' in response.data['results'][1]['body']
+        task.refresh_from_db()
+        assert task.title == 'Test Task'
+
+    def test_if_match(self, authenticated_client, task):
+        response = self.post(authenticated_client, [
+            {'method': 'PATCH', 'path': f'/api/tasks/{task.pk}/', 'body': {'title': 'Changed'}, 'if_match': '7'},
+        ])
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data['results'][0]['status'] == status.HTTP_409_CONFLICT
+
+    def test_other_user_task(self, authenticated_client, other_user_task):
+        response = self.post(authenticated_client, [
+            {'method': 'DELETE', 'path': f'/api/tasks/{other_user_task.pk}/'},
+        ])
+
+        assert response.data['results'][0]['status'] == status.HTTP_404_NOT_FOUND
+        assert Task.objects.filter(pk=other_user_task.pk).exists()
+
+    def test_invalid_parent_filter(self, authenticated_client):
+        response = self.post(authenticated_client, [
+            {'method': 'GET', 'path': '/api/tasks/?parent=abc'},
+        ])
+
+        assert response.data['results'][0]['status'] == status.HTTP_400_BAD_REQUEST
+
+    @pytest.mark.parametrize('path', [
+        '/api/batch/', '/api/tasks/events/', '/api/users/', '/admin/',
+    ])
+    def test_unsupported_paths(self, authenticated_client, path):
+        response = self.post(authenticated_client, [
+            {'method': 'GET', 'path': path},
+        ])
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_max_operations(self, authenticated_client, settings):
+        settings.BATCH_MAX_OPERATIONS = 2
+        response = self.post(authenticated_client, [
+            {'method': 'GET', 'path': '/api/tasks/'},
+        ] * 3)
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'operations' in response.data
+
+    def test_empty(self, authenticated_client):
+        response = self.post(authenticated_client, [])
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_requires_authentication(self, api_client):
+        response = self.post(api_client, [
+            {'method': 'GET', 'path': '/api/tasks/'},
+        ])
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.django_db
+class TestTaskStats:
+    def stats(self, client, start, end):
+        return client.get(
+            reverse('task-stats'),
+            {'start': start.isoformat(), 'end': end.isoformat()}
+        )
+
+    def rollups(self):
+        return (
+            list(TaskDailyStats.objects.order_by('user', 'date').values_list(
+                'user', 'date', 'created', 'completed'
+            )),
+            list(TaskCompletionTimes.objects.filter(count__gt=0).order_by(
+                'user', 'date', 'bucket'
+            ).values_list('user', 'date', 'bucket', 'count')),
+        )
+
+    def test_stats_from_transitions(self, authenticated_client, task):
+        """Test los rollups siguen cada transición de las tareas"""
+        today = timezone.now().date()
+        authenticated_client.post(reverse('task-list'), {'title': 'Done', 'status': 'completed'})
+        authenticated_client.post(reverse('task-complete', kwargs={'pk': task.pk}))
+        authenticated_client.post(reverse('task-reopen', kwargs={'pk': task.pk}))
+        authenticated_client.patch(
+            reverse('task-detail', kwargs={'pk': task.pk}), {'status': 'completed'}
+        )
+
+        response = self.stats(authenticated_client, today - timedelta(days=1), today)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['created'] == 2
+        assert response.data['completed'] == 2
+        assert response.data['median_completion_seconds'] is not None
+        assert response.data['days'] == [
+            {'date': (today - timedelta(days=1)).isoformat(), 'created': 0, 'completed': 0},
+            {'date': today.isoformat(), 'created': 2, 'completed': 2},
+        ]
+
+    def test_complete_twice_then_reopen(
+        self, authenticated_client, task, monkeypatch
+    ):
+        """Test completar de nuevo otro día no desfasa los rollups al reabrir"""
+        now = timezone.now()
+        complete = reverse('task-complete', kwargs={'pk': task.pk})
+        authenticated_client.post(complete)
+        completed_at = Task.objects.get(pk=task.pk).completed_at
+        monkeypatch.setattr(timezone, 'now', lambda: now + timedelta(days=1))
+
+        response = authenticated_client.post(complete)
+        assert response.status_code == status.HTTP_200_OK
+        assert Task.objects.get(pk=task.pk).completed_at == completed_at
+
+        authenticated_client.post(reverse('task-reopen', kwargs={'pk': task.pk}))
+        days, times = self.rollups()
+        assert [completed for *_, completed in days] == [0]
+        assert times == []
+        assert not TaskCompletionTimes.objects.filter(count__lt=0).exists()
+
+    def test_completed_at_moved(self, task):
+        """Test cambiar completed_at de una tarea completada mueve su día y bucket"""
+        task.status = 'completed'
+        task.completed_at = task.created_at + timedelta(hours=1)
+        task.save()
+        task.completed_at = task.created_at + timedelta(days=2)
+        task.save()
+
+        days, times = self.rollups()
+        completed_date = (task.created_at + timedelta(days=2)).date()
+        assert [(date, completed) for _, date, _, completed in days if completed] == [
+            (completed_date, 1)
+        ]
+        assert [(date, count) for _, date, _, count in times] == [(completed_date, 1)]
+
+        task.status = 'pending'
+        task.completed_at = None
+        task.save()
+        days, times = self.rollups()
+        assert all(completed == 0 for *_, completed in days)
+        assert not TaskCompletionTimes.objects.exclude(count=0).exists()
+
+    def test_patch_sets_completed_at(self, authenticated_client, task):
+        url = reverse('task-detail', kwargs={'pk': task.pk})
+        response = authenticated_client.patch(url, {'status': 'completed'})
+        assert response.data['completed_at'] is not None
+
+        response = authenticated_client.patch(url, {'status': 'pending'})
+        assert response.data['completed_at'] is None
+
+    def test_complete_subtree(self, authenticated_client, task):
+        child = Task.objects.create(title="Child", user=task.user, parent=task)
+        Task.objects.create(title="Grandchild", user=task.user, parent=child)
+        url = reverse('task-complete', kwargs={'pk': task.pk})
+        authenticated_client.post(f'{url}?subtree=true')
+
+        assert TaskDailyStats.objects.get().completed == 3
+
+    def test_only_own_stats(self, authenticated_client, other_user_task):
+        today = timezone.now().date()
+        response = self.stats(authenticated_client, today, today)
+        assert response.data['created'] == 0
+        assert response.data['median_completion_seconds'] is None
+
+    def test_backfill_matches_signals(self, user, other_user):
+        """Test el backfill reconstruye los mismos rollups que las señales"""
+        for index in range(7):
+            task = Task.objects.create(
+                title=f"Task {index}", user=(user, other_user)[index % 2]
+            )
+            if index % 3:
+                task.status = 'completed'
+                task.completed_at = task.created_at + timedelta(hours=index)
+                task.save()
+        expected = self.rollups()
+
+        call_command('backfill_task_stats', chunk_size=2, verbosity=0)
+
+        assert self.rollups() == expected
+
+    def test_failed_backfill_keeps_rollups(self, user, monkeypatch):
+        """Test si el backfill falla quedan los rollups anteriores"""
+        for index in range(3):
+            Task.objects.create(title=f"Task {index}", user=user)
+        expected = self.rollups()
+        write = rollups.Deltas.write
+        calls = []
+
+        def fail_second_chunk(self, using=None, suffix=''):
+            calls.append(suffix)
+            if len(calls) == 2:
+                raise RuntimeError('chunk failed')
+            write(self, using, suffix)
+
+        monkeypatch.setattr(rollups.Deltas, 'write', fail_second_chunk)
+        with pytest.raises(RuntimeError):
+            call_command('backfill_task_stats', chunk_size=2, verbosity=0)
+
+        assert self.rollups() == expected
+        monkeypatch.undo()
+        call_command('backfill_task_stats', chunk_size=2, verbosity=0)
+        assert self.rollups() == expected
+        assert not TaskStatsRebuild.objects.exists()
+
+    def test_backfill_with_concurrent_writes(self, user, monkeypatch):
+        """Test las escrituras entre lotes quedan en los rollups reconstruidos"""
+        tasks = [
+            Task.objects.create(title=f"Task {index}", user=user)
+            for index in range(4)
+        ]
+        process_chunk = Command.process_chunk
+        finish = Command.finish
+        expected = []
+
+        def process_and_write(command, using, rebuild, chunk_size):
+            count = process_chunk(command, using, rebuild, chunk_size)
+            if rebuild.last_task_id == tasks[1].pk:
+                # Una tarea ya recorrida, una que falta y una nueva
+                for task in (tasks[0], tasks[3]):
+                    task.status = 'completed'
+                    task.completed_at = timezone.now()
+                    task.save()
+                Task.objects.create(
+                    title="New", user=user, status='completed',
+                    completed_at=timezone.now(),
+                )
+            return count
+
+        def finish_after_signals(command, using):
+            # Los rollups que mantuvieron las señales durante el comando
+            expected.append(self.rollups())
+            finish(command, using)
+
+        monkeypatch.setattr(Command, 'process_chunk', process_and_write)
+        monkeypatch.setattr(Command, 'finish', finish_after_signals)
+        call_command('backfill_task_stats', chunk_size=2, verbosity=0)
+
+        assert self.rollups() == expected[0]
+        [(_, _, created, completed)] = self.rollups()[0]
+        assert (created, completed) == (5, 3)
+
+    @pytest.mark.parametrize('params', [
+        {},
+        {'start': '2026-10-10', 'end': 'yesterday'},
+        {'start': '2026-10-10', 'end': '2026-10-01'},
+        {'start': '2020-01-01', 'end': '2026-01-01'},
+    ])
+    def test_invalid_range(self, authenticated_client, params):
+        response = authenticated_client.get(reverse('task-stats'), params)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,200 @@
+import json
+import threading
+
+import pytest
+
+from datetime import timedelta
+
+from asgiref.sync import async_to_sync
+from django.db import connection
+from django.utils import timezone
+
+from tasks import events
+from tasks.events import EventBroker
+from tasks.models import Task, TaskEventChannel, Workspace
+from tasks.signals import task_channels, transition_type
+from users.models import Users
+
+
+@pytest.fixture
+def user():
+    return Users.objects.create(
+        username="testuser",
+        email="test@example.com",
+        password="testpass123"
+    )
+
+
+@pytest.fixture
+def subscription(user):
+    subscription = events.broker.subscribe([events.user_channel(user.pk)])
+    yield subscription
+    subscription.close()
+
+
+class TestEventBroker:
+    def test_dispatch_to_channel_subscribers(self):
+        """Test el broker solo entrega eventos a los suscriptores del canal"""
+        broker = EventBroker()
+        subscription = broker.subscribe(['user:1'], maxsize=10)
+        other = broker.subscribe(['user:2'], maxsize=10)
+
+        broker.dispatch('user:1', {'type': 'created'})
+
+        event = subscription.get_nowait()
+        assert event['type'] == 'created'
+        assert event['id'] == 1
+        assert other.get_nowait() is None
+
+    def test_unsubscribe(self):
+        """Test al cerrar la suscripción se libera el canal"""
+        broker = EventBroker()
+        subscription = broker.subscribe(['user:1'], maxsize=10)
+        assert broker.has_subscribers('user:1')
+
+        subscription.close()
+
+        assert not broker.has_subscribers('user:1')
+
+    def test_overflow_marks_subscription(self):
+        """Test un cliente lento queda marcado para resincronizar"""
+        broker = EventBroker()
+        subscription = broker.subscribe(['user:1'], maxsize=1)
+
+        broker.dispatch('user:1', {'type': 'created'})
+        broker.dispatch('user:1', {'type': 'updated'})
+
+        assert subscription.overflowed
+        assert subscription.get_nowait()['type'] == 'created'
+
+    def test_get_waits_for_event_from_other_thread(self):
+        """Test el stream espera eventos sin bloquear y los recibe de otro hilo"""
+        broker = EventBroker()
+        subscription = broker.subscribe(['user:1'], maxsize=10)
+
+        async def read():
+            timer = threading.Timer(
+                0.05, broker.dispatch, ['user:1', {'type': 'created'}]
+            )
+            timer.start()
+            return await subscription.get(timeout=5)
+
+        assert async_to_sync(read)()['type'] == 'created'
+
+    def test_get_timeout(self):
+        subscription = EventBroker().subscribe(['user:1'], maxsize=10)
+        assert async_to_sync(subscription.get)(timeout=0.01) is None
+
+    def test_stream_format(self):
+        """Test formato SSE de los eventos"""
+        broker = EventBroker()
+        subscription = broker.subscribe(['user:1'], maxsize=10)
+        broker.dispatch('user:1', {'type': 'deleted', 'task': {'id': 3}})
+
+        async def read():
+            stream = events.stream(subscription, heartbeat=0.01, max_duration=1)
+            first = await anext(stream)
+            message = await anext(stream)
+            await stream.aclose()
+            return first, message
+
+        first, message = async_to_sync(read)()
+        assert first.startswith('retry:')
+
+        assert message.startswith('id: 1\nevent: deleted\n')
+        data = json.loads(message.split('data: ', 1)[1])
+        assert data['task'] == {'id': 3}
+        assert not broker.has_subscribers('user:1')
+
+
+@pytest.mark.django_db
+class TestTaskSignals:
+    def test_transition_types(self, user):
+        """Test detección del tipo de evento según la transición de status"""
+        task = Task.objects.create(title="Task", user=user)
+        assert transition_type(task, created=True) == 'created'
+
+        task = Task.objects.get(pk=task.pk)
+        task.title = "Updated"
+        assert transition_type(task, created=False) == 'updated'
+
+        task.status = 'completed'
+        assert transition_type(task, created=False) == 'completed'
+
+        task.save()
+        task.status = 'pending'
+        assert transition_type(task, created=False) == 'reopened'
+
+    def test_events_published_on_commit(
+        self, user, subscription, django_capture_on_commit_callbacks
+    ):
+        """Test se publican eventos de alta, completado y borrado"""
+        with django_capture_on_commit_callbacks(execute=True):
+            task = Task.objects.create(title="Task", user=user)
+        with django_capture_on_commit_callbacks(execute=True):
+            task.status = 'completed'
+            task.save()
+        with django_capture_on_commit_callbacks(execute=True):
+            task_id = task.pk
+            task.delete()
+
+        received = [subscription.get_nowait() for _ in range(3)]
+        assert [event['type'] for event in received] == [
+            'created', 'completed', 'deleted'
+        ]
+        assert received[0]['task']['title'] == "Task"
+        assert received[2]['task'] == {'id': task_id}
+
+    def test_no_event_without_commit(
+        self, user, subscription, django_capture_on_commit_callbacks
+    ):
+        """Test no se notifica si la transacción no se confirma"""
+        with django_capture_on_commit_callbacks(execute=False) as callbacks:
+            Task.objects.create(title="Task", user=user)
+
+        assert len(callbacks) == 1
+        assert subscription.get_nowait() is None
+
+    def test_workspace_task_channels(self, user):
+        """Test las tareas de un workspace se publican en su canal"""
+        workspace = Workspace.objects.create(name="Shared", owner=user)
+        personal = Task.objects.create(title="Personal", user=user)
+        shared = Task.objects.create(
+            title="Shared", user=user, workspace=workspace
+        )
+
+        assert task_channels(personal) == [events.user_channel(user.pk)]
+        assert task_channels(shared) == [
+            events.workspace_channel(workspace.pk)
+        ]
+
+
+@pytest.mark.django_db
+class TestListeners:
+    @pytest.fixture(autouse=True)
+    def postgres_backend(self, monkeypatch):
+        monkeypatch.setattr(events, 'uses_postgres', lambda: True)
+        monkeypatch.setattr(events, '_listened', (0.0, frozenset()))
+
+    def test_only_registered_channels(self, django_assert_num_queries):
+        """Test solo se publican eventos de canales con clientes conectados"""
+        TaskEventChannel.objects.create(
+            channel='user:1', expires_at=timezone.now() + timedelta(seconds=30)
+        )
+        TaskEventChannel.objects.create(
+            channel='user:2', expires_at=timezone.now() - timedelta(seconds=1)
+        )
+
+        with django_assert_num_queries(1):
+            assert events.has_listeners(['user:1', 'workspace:3'])
+            assert not events.has_listeners(['user:2'])
+
+    def test_register_channels(self):
+        with connection.cursor() as cursor:
+            events.register_channels(cursor, ['user:1', 'workspace:2'])
+            events.register_channels(cursor, ['user:1'])
+
+        assert sorted(
+            TaskEventChannel.objects.values_list('channel', flat=True)
+        ) == ['user:1', 'workspace:2']
+        assert events.has_listeners(['workspace:2'])
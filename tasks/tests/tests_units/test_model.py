@@ -3,8 +3,9 @@ import pytest
 from django.utils import timezone
 from datetime import timedelta
 from django.core.exceptions import ValidationError
+from django.db import connection
 
-from tasks.models import Task
+from tasks.models import StaleTaskError, Tag, Task
 from users.models import Users
 
 
@@ -81,6 +82,18 @@ class TestTaskModel:
             )
             task.full_clean()
 
+    def test_status_priority_stored_as_codes(self, sample_task):
+        """Test status y prioridad se guardan como códigos enteros"""
+        row = Task.objects.filter(pk=sample_task.pk).values_list(
+            'status', 'priority'
+        ).query
+        with connection.cursor() as cursor:
+            cursor.execute(*row.sql_with_params())
+            assert cursor.fetchone() == (1, 2)
+
+        assert Task.objects.filter(status="pending", priority="medium").get() == sample_task
+        assert Task.objects.get(pk=sample_task.pk).status == "pending"
+
     def test_task_dates(self, user):
         """Test campos de fecha"""
         task = Task.objects.create(
@@ -145,3 +158,80 @@ class TestTaskModel:
             description=""
         )
         assert task.description == ""
+
+    def test_task_version_increments(self, sample_task):
+        """Test cada guardado incrementa la versión"""
+        assert sample_task.version == 1
+        sample_task.title = "Updated"
+        sample_task.save()
+        sample_task.refresh_from_db()
+        assert sample_task.version == 2
+
+    def test_task_stale_save(self, sample_task):
+        """Test guardar una copia desactualizada no pisa otros cambios"""
+        first = Task.objects.get(pk=sample_task.pk)
+        second = Task.objects.get(pk=sample_task.pk)
+        first.title = "First"
+        first.save()
+
+        second.title = "Second"
+        with pytest.raises(StaleTaskError):
+            second.save()
+
+        assert second.version == 1
+        sample_task.refresh_from_db()
+        assert sample_task.title == "First"
+        assert sample_task.version == 2
+
+    def test_task_version_with_update_fields(self, sample_task):
+        """Test la versión también se actualiza con update_fields"""
+        sample_task.title = "Updated"
+        sample_task.save(update_fields=['title'])
+        sample_task.refresh_from_db()
+        assert sample_task.version == 2
+
+    def test_subtask_path(self, sample_task):
+        """Test las subtareas guardan el camino de sus ancestros"""
+        child = Task.objects.create(title="Child", user=sample_task.user, parent=sample_task)
+        grandchild = Task.objects.create(title="Grandchild", user=sample_task.user, parent=child)
+
+        assert sample_task.path == ''
+        assert child.path == f'{sample_task.pk}/'
+        assert grandchild.path == f'{sample_task.pk}/{child.pk}/'
+        assert grandchild.depth == 2
+        assert set(sample_task.get_descendants()) == {child, grandchild}
+        assert set(sample_task.get_subtree()) == {sample_task, child, grandchild}
+
+    def test_move_subtask_rewrites_descendants(self, sample_task, user):
+        """Test al mover una tarea se actualiza el camino de su subárbol"""
+        child = Task.objects.create(title="Child", user=user, parent=sample_task)
+        grandchild = Task.objects.create(title="Grandchild", user=user, parent=child)
+        other_root = Task.objects.create(title="Other root", user=user)
+
+        child.parent = other_root
+        child.save()
+
+        grandchild.refresh_from_db()
+        assert child.path == f'{other_root.pk}/'
+        assert grandchild.path == f'{other_root.pk}/{child.pk}/'
+        assert not sample_task.get_descendants().exists()
+
+    def test_delete_removes_subtree(self, sample_task, user):
+        """Test borrar una tarea borra todas sus subtareas"""
+        child = Task.objects.create(title="Child", user=user, parent=sample_task)
+        Task.objects.create(title="Grandchild", user=user, parent=child)
+        sibling = Task.objects.create(title="Sibling", user=user)
+
+        sample_task.delete()
+
+        assert list(Task.objects.all()) == [sibling]
+
+    def test_tags_for_names(self, user):
+        """Test se reutilizan las etiquetas existentes y se crean las nuevas"""
+        home = Tag.objects.create(user=user, name="home")
+
+        tags = Tag.for_names(user, ["work", "home"])
+
+        assert [tag.name for tag in tags] == ["work", "home"]
+        assert tags[1] == home
+        assert Tag.objects.filter(user=user).count() == 2
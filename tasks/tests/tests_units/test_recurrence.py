@@ -0,0 +1,70 @@
+import pytest
+
+from datetime import datetime, timedelta, timezone
+
+from tasks.recurrence import RecurrenceRule
+
+
+START = datetime(2026, 10, 14, 9, 0, tzinfo=timezone.utc)  # miércoles
+
+
+def dates(occurrences):
+    return [occurrence.date().isoformat() for occurrence in occurrences]
+
+
+class TestRecurrenceRule:
+    def test_parse_and_format(self):
+        """Test el texto de la regla se normaliza"""
+        rule = RecurrenceRule.parse('rrule:freq=weekly;byday=fr,mo;interval=2')
+        assert str(rule) == 'FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,FR'
+
+    @pytest.mark.parametrize('text', [
+        'FREQ=YEARLY',
+        'INTERVAL=2',
+        'FREQ=DAILY;INTERVAL=0',
+        'FREQ=DAILY;COUNT=x',
+        'FREQ=DAILY;BYDAY=MO',
+        'FREQ=WEEKLY;BYDAY=XX',
+        'FREQ=DAILY;COUNT=2;UNTIL=20261231T000000Z',
+        'FREQ=DAILY;UNTIL=2026-12-31',
+        'FREQ=DAILY;BYHOUR=9',
+        'FREQ=DAILY;FREQ=WEEKLY',
+    ])
+    def test_invalid_rules(self, text):
+        with pytest.raises(ValueError):
+            RecurrenceRule.parse(text)
+
+    def test_daily_interval_until(self):
+        rule = RecurrenceRule.parse('FREQ=DAILY;INTERVAL=3;UNTIL=20261101T000000Z')
+        occurrences = rule.between(START, START, START + timedelta(days=60))
+        assert dates(occurrences) == [
+            '2026-10-14', '2026-10-17', '2026-10-20', '2026-10-23',
+            '2026-10-26', '2026-10-29',
+        ]
+
+    def test_weekly_byday_count(self):
+        """Test COUNT cuenta desde el inicio aunque la ventana empiece después"""
+        rule = RecurrenceRule.parse('FREQ=WEEKLY;BYDAY=MO,WE,FR;COUNT=10')
+        after = START + timedelta(days=17)
+        occurrences = rule.between(START, after, START + timedelta(days=60))
+        assert dates(occurrences) == ['2026-11-02', '2026-11-04']
+
+    def test_monthly_skips_short_months(self):
+        start = datetime(2026, 1, 31, 9, 0, tzinfo=timezone.utc)
+        rule = RecurrenceRule.parse('FREQ=MONTHLY')
+        occurrences = rule.between(start, start, start + timedelta(days=130))
+        assert dates(occurrences) == ['2026-01-31', '2026-03-31', '2026-05-31']
+
+    def test_window_far_in_the_future(self):
+        """Test una ventana lejana no recorre las ocurrencias anteriores"""
+        rule = RecurrenceRule.parse('FREQ=DAILY')
+        after = START + timedelta(days=365 * 100)
+        occurrences = list(rule.between(START, after, after + timedelta(days=2)))
+        assert len(occurrences) == 2
+        assert rule._skip(START, after)[0] > 36000
+
+    def test_includes(self):
+        rule = RecurrenceRule.parse('FREQ=WEEKLY')
+        assert rule.includes(START, START + timedelta(weeks=3))
+        assert not rule.includes(START, START + timedelta(days=1))
+        assert not rule.includes(START, START - timedelta(weeks=1))
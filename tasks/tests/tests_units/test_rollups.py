@@ -0,0 +1,75 @@
+import pytest
+
+from datetime import date, datetime, timedelta, timezone
+
+from tasks import rollups
+from tasks.models import TaskCompletionTimes, TaskDailyStats
+from users.models import Users
+
+
+CREATED = datetime(2026, 10, 14, 23, 30, tzinfo=timezone.utc)
+
+
+class TestCompletionBuckets:
+    @pytest.mark.parametrize('seconds', [0, 1, 59, 3600, 86400 * 30])
+    def test_bucket_close_to_value(self, seconds):
+        """Test el valor de cada bucket difiere menos de un 10% del real"""
+        estimate = rollups.bucket_seconds(rollups.completion_bucket(seconds))
+        assert abs(estimate - seconds) <= max(seconds * 0.1, 1)
+
+    def test_median(self):
+        buckets = [
+            (rollups.completion_bucket(seconds), 1)
+            for seconds in (60, 3600, 86400)
+        ]
+        assert rollups.median_seconds(buckets) == pytest.approx(3600, rel=0.1)
+
+    def test_median_empty(self):
+        assert rollups.median_seconds([]) is None
+        assert rollups.median_seconds([(3, 0)]) is None
+
+
+@pytest.mark.django_db
+class TestDeltas:
+    @pytest.fixture
+    def user(self):
+        return Users.objects.create_user(
+            username="testuser", email="test@test.com", password="testpass123"
+        )
+
+    def test_save_adds_to_existing_rows(self, user):
+        completed_at = CREATED + timedelta(hours=1)
+        for _ in range(2):
+            deltas = rollups.Deltas()
+            deltas.created(user.pk, CREATED)
+            deltas.completed(user.pk, CREATED, completed_at)
+            deltas.save()
+
+        assert list(
+            TaskDailyStats.objects.order_by('date')
+            .values_list('date', 'created', 'completed')
+        ) == [(date(2026, 10, 14), 2, 0), (date(2026, 10, 15), 0, 2)]
+        times = TaskCompletionTimes.objects.get()
+        assert times.bucket == rollups.completion_bucket(3600)
+        assert times.count == 2
+
+    def test_undo_completion(self, user):
+        completed_at = CREATED + timedelta(hours=1)
+        deltas = rollups.Deltas()
+        deltas.completed(user.pk, CREATED, completed_at)
+        deltas.save()
+        deltas = rollups.Deltas()
+        deltas.completed(user.pk, CREATED, completed_at, sign=-1)
+        deltas.save()
+
+        assert TaskDailyStats.objects.get().completed == 0
+        assert TaskCompletionTimes.objects.get().count == 0
+
+    def test_save_in_batches(self, user, monkeypatch):
+        monkeypatch.setattr(rollups, 'UPSERT_BATCH_SIZE', 3)
+        deltas = rollups.Deltas()
+        for day in range(10):
+            deltas.created(user.pk, CREATED + timedelta(days=day))
+        deltas.save()
+
+        assert TaskDailyStats.objects.filter(created=1).count() == 10
@@ -44,7 +44,9 @@ class TestTaskSerializer:
         serializer = TaskSerializer(task)
         expected_fields = {
             'id', 'title', 'description', 'created_at', 'updated_at',
-            'due_date', 'completed_at', 'status', 'priority'
+            'due_date', 'completed_at', 'status', 'priority', 'version',
+            'parent', 'tags', 'workspace', 'recurrence', 'series',
+            'occurrence_date'
         }
         assert set(serializer.data.keys()) == expected_fields
 
@@ -196,3 +198,34 @@ class TestTaskSerializer:
         serializer = TaskSerializer(data=data, context=context)
         assert not serializer.is_valid()
         assert 'due_date' in serializer.errors
+
+    def test_tags(self, user, request_with_user):
+        """Test las etiquetas se guardan sin duplicados y se serializan por nombre"""
+        context = {'request': request_with_user}
+        serializer = TaskSerializer(
+            data={'title': 'Tagged', 'tags': ['work', 'home', 'work']},
+            context=context
+        )
+        assert serializer.is_valid()
+        task = serializer.save()
+
+        assert TaskSerializer(task).data['tags'] == ['home', 'work']
+
+        serializer = TaskSerializer(
+            task, data={'tags': []}, partial=True, context=context
+        )
+        assert serializer.is_valid()
+        task = serializer.save()
+        assert TaskSerializer(task).data['tags'] == []
+
+    def test_tags_limit(self, request_with_user):
+        """Test límite de etiquetas por tarea"""
+        data = {
+            'title': 'Tagged',
+            'tags': [f'tag{index}' for index in range(21)]
+        }
+        serializer = TaskSerializer(
+            data=data, context={'request': request_with_user}
+        )
+        assert not serializer.is_valid()
+        assert 'tags' in serializer.errors
@@ -1,11 +1,14 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
-from .views import TaskViewSet
+from .views import BatchView, TaskViewSet, WorkspaceViewSet, events_stream
 
 router = DefaultRouter()
 router.register(r'tasks', TaskViewSet, basename='task')
+router.register(r'workspaces', WorkspaceViewSet, basename='workspace')
 
 urlpatterns = [
+    path('api/batch/', BatchView.as_view(), name='batch'),
+    path('api/tasks/events/', events_stream, name='task-events'),
     path('api/', include(router.urls)),
 ]
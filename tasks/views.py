@@ -1,59 +1,603 @@
-from rest_framework import viewsets
+import datetime
+import io
+import json
+from urllib.parse import urlsplit
+
+from asgiref.sync import sync_to_async
+from rest_framework import mixins, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import (
+    AuthenticationFailed,
+    NotAuthenticated,
+    PermissionDenied,
+    ValidationError,
+)
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.views import APIView
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef
+from django.http import JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import Resolver404, resolve
 from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from django.views.decorators.http import require_GET
+from rest_framework_simplejwt.authentication import JWTAuthentication
 
-from .models import Task
-from .serializers import TaskSerializer
+from core.idempotency import idempotent
+from core.throttling import WriteTokenBucketThrottle
+from . import events as task_events
+from . import rollups
+from .exceptions import VersionConflict
+from .models import (
+    StaleTaskError,
+    Task,
+    Workspace,
+    WorkspaceMembership,
+)
+from .pagination import (
+    DEFAULT_ORDERING,
+    ORDERING_FIELDS,
+    TaskCursorPagination,
+    ordering_expressions,
+)
+from .serializers import (
+    BatchSerializer,
+    OccurrenceSerializer,
+    TaskSerializer,
+    WorkspaceMembershipSerializer,
+    WorkspaceSerializer,
+)
+from .signals import task_channels
 
 
 class TaskViewSet(viewsets.ModelViewSet):
     serializer_class = TaskSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = TaskCursorPagination
+    throttle_classes = [WriteTokenBucketThrottle]
+    throttle_scope = 'task_write'
 
-    def get_queryset(self):
+    def get_queryset(self, visibility=None):
         """
-        Filtra las tareas para mostrar solo las del usuario actual.
-        Permite filtrar por status y priority a través de query params.
+        Filtra las tareas para mostrar solo las del usuario actual y las de
+        sus workspaces (o las de la condición `visibility`).
+        Permite filtrar por status y priority a través de query params,
+        por tarea padre con `parent=<id>` (`parent=null` para las raíz) y
+        por etiquetas con `tags=a,b` (`tags_match=all` exige todas).
+        El orden se elige con `ordering` (ver `get_ordering`).
         """
-        queryset = Task.objects.filter(user=self.request.user)
+        if visibility is None:
+            visibility = Task.visible_to(self.request.user)
+        queryset = Task.objects.filter(visibility)
+        if self.action not in ('destroy', 'subtree', 'occurrences'):
+            queryset = queryset.prefetch_related('tags')
 
         status = self.request.query_params.get('status', None)
         priority = self.request.query_params.get('priority', None)
         title = self.request.query_params.get('title', None)
         description = self.request.query_params.get('description', None)
+        # Un valor desconocido no tiene código en la base: no hay tareas
         if status:
+            if status not in Task.STATUS_CODES:
+                return Task.objects.none()
             queryset = queryset.filter(status=status)
         if priority:
+            if priority not in Task.PRIORITY_CODES:
+                return Task.objects.none()
             queryset = queryset.filter(priority=priority)
         if title:
             queryset = queryset.filter(title__icontains=title)
         if description:
             queryset = queryset.filter(description__icontains=description)
 
+        parent = self.request.query_params.get('parent', None)
+        if parent == 'null':
+            queryset = queryset.filter(parent__isnull=True)
+        elif parent:
+            try:
+                parent = int(parent)
+            except ValueError:
+                raise ValidationError({
+                    'parent': 'Must be a task id or "null".'
+                })
+            queryset = queryset.filter(parent_id=parent)
+
+        tags = self.request.query_params.get('tags', None)
+        if tags:
+            queryset = self.filter_tags(queryset, tags)
+
+        ordering = self.get_ordering()
+        queryset = queryset.order_by(*ordering_expressions(
+            ordering.lstrip('-'), ordering.startswith('-')
+        ))
+
         return queryset
 
+    def get_keyset_branches(self):
+        """
+        Querysets que la paginación por cursor combina con UNION ALL: uno
+        por cada rama de Task.visibility_branches (tareas propias y una por
+        workspace), con los mismos filtros.
+        """
+        return [
+            self.get_queryset(visibility=branch)
+            for branch in Task.visibility_branches(self.request.user)
+        ]
+
+    def get_ordering(self):
+        """
+        Orden del query param `ordering`: uno de ORDERING_FIELDS, con `-`
+        para orden descendente. `priority` ordena por severidad.
+        """
+        ordering = self.request.query_params.get('ordering', DEFAULT_ORDERING)
+        if ordering.lstrip('-') not in ORDERING_FIELDS:
+            raise ValidationError({
+                'ordering': f'Must be one of {", ".join(ORDERING_FIELDS)}, '
+                            f'optionally prefixed with "-".'
+            })
+        return ordering
+
+    def filter_tags(self, queryset, tags):
+        """
+        Filtra con subqueries EXISTS sobre la tabla intermedia, que usan su
+        índice (task_id, tag_id) y no duplican filas como un JOIN.
+        """
+        names = list(dict.fromkeys(
+            name.strip() for name in tags.split(',') if name.strip()
+        ))
+        if len(names) > settings.TASK_MAX_TAGS:
+            raise ValidationError({
+                'tags': f'At most {settings.TASK_MAX_TAGS} tags are allowed.'
+            })
+        match = self.request.query_params.get('tags_match', 'any')
+        task_tags = Task.tags.through.objects.filter(task_id=OuterRef('pk'))
+        if match == 'any':
+            return queryset.filter(
+                Exists(task_tags.filter(tag__name__in=names))
+            )
+        if match == 'all':
+            for name in names:
+                queryset = queryset.filter(
+                    Exists(task_tags.filter(tag__name=name))
+                )
+            return queryset
+        raise ValidationError({'tags_match': 'Must be "any" or "all".'})
+
+    def handle_exception(self, exc):
+        if isinstance(exc, StaleTaskError):
+            exc = VersionConflict()
+        return super().handle_exception(exc)
+
+    def expect_version(self, task):
+        """
+        Toma la versión esperada del header If-Match, si el cliente la envía.
+        Sin header se usa la versión leída, que igualmente detecta escrituras
+        concurrentes entre la lectura y el guardado.
+        """
+        header = self.request.headers.get('If-Match')
+        if not header:
+            return
+        try:
+            task.version = int(header.removeprefix('W/').strip('"'))
+        except ValueError:
+            raise ValidationError({'If-Match': 'Must be the task version.'})
+
+    def parse_datetime_param(self, name):
+        """
+        Fecha del query param `name`, en ISO 8601 (datetime o fecha).
+        Las fechas sin zona horaria se toman en UTC.
+        """
+        value = self.request.query_params.get(name, '')
+        try:
+            parsed = parse_datetime(value)
+            if parsed is None and parse_date(value) is not None:
+                parsed = parse_datetime(f'{value}T00:00:00')
+        except ValueError:
+            parsed = None
+        if parsed is None:
+            raise ValidationError({name: 'Must be an ISO 8601 date or datetime.'})
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed, datetime.timezone.utc)
+        return parsed
+
+    def parse_date_param(self, name):
+        """Fecha del query param `name`, en formato ISO 8601 (YYYY-MM-DD)"""
+        try:
+            parsed = parse_date(self.request.query_params.get(name, ''))
+        except ValueError:
+            parsed = None
+        if parsed is None:
+            raise ValidationError({name: 'Must be an ISO 8601 date.'})
+        return parsed
+
+    def get_occurrence(self, task):
+        """
+        Fila de la ocurrencia indicada en `?occurrence=` de una tarea
+        recurrente, materializándola si hace falta.
+        """
+        occurrence = self.parse_datetime_param('occurrence')
+        if not task.recurrence or task.due_date is None:
+            raise ValidationError({'occurrence': 'The task is not recurring.'})
+        if not task.rule.includes(task.due_date, occurrence):
+            raise ValidationError({
+                'occurrence': 'Not an occurrence of the task.'
+            })
+        return task.materialize(occurrence)
+
+    @idempotent
+    @rollups.deferred()
+    def create(self, request, *args, **kwargs):
+        return super().create(request, *args, **kwargs)
+
+    @rollups.deferred()
+    def update(self, request, *args, **kwargs):
+        return super().update(request, *args, **kwargs)
+
+    def perform_update(self, serializer):
+        self.expect_version(serializer.instance)
+        serializer.save()
+
     @action(detail=True, methods=['post'])
+    @idempotent
+    @rollups.deferred()
     def complete(self, request, pk=None):
         """
-        Marca una tarea como completada y establece completed_at
+        Marca una tarea como completada y establece completed_at.
+        Con `?subtree=true` completa también todas sus subtareas
+        pendientes o en curso (las canceladas no cambian) en un solo UPDATE,
+        en la misma transacción que la tarea. En tareas recurrentes,
+        `?occurrence=<fecha>` completa solo esa ocurrencia.
         """
         task = self.get_object()
-        task.status = 'completed'
-        task.completed_at = timezone.now()
+        if 'occurrence' in request.query_params:
+            task = self.get_occurrence(task)
+        else:
+            self.expect_version(task)
+        # Completar de nuevo una tarea completada no cambia cuándo se
+        # completó
+        if task.status != 'completed':
+            task.status = 'completed'
+            task.completed_at = timezone.now()
+        # La tarea y sus subtareas se guardan en la transacción de
+        # `rollups.deferred`
         task.save()
+        if request.query_params.get('subtree') == 'true':
+            pending = task.get_descendants().filter(
+                status__in=['pending', 'in_progress']
+            )
+            # El UPDATE no emite post_save: los rollups se actualizan
+            # con las filas bloqueadas antes de completarlas
+            rows = list(
+                pending.select_for_update()
+                .order_by()
+                .values_list('id', 'user_id', 'created_at')
+            )
+            completed = pending.update(
+                status='completed',
+                completed_at=task.completed_at,
+                updated_at=task.completed_at,
+                version=F('version') + 1
+            )
+            deltas = rollups.Deltas()
+            for task_id, user_id, created_at in rows:
+                deltas.completed(
+                    user_id, created_at, task.completed_at, task_id=task_id
+                )
+            rollups.record(deltas)
+            if completed:
+                task_events.publish(
+                    task_channels(task),
+                    {
+                        'type': 'subtree_completed',
+                        'task': {'id': task.pk, 'descendants': completed},
+                    }
+                )
         serializer = self.get_serializer(task)
         return Response(serializer.data)
 
     @action(detail=True, methods=['post'])
+    @idempotent
+    @rollups.deferred()
     def reopen(self, request, pk=None):
         """
         Reabre una tarea completada
         """
         task = self.get_object()
+        self.expect_version(task)
         task.status = 'pending'
         task.completed_at = None
         task.save()
         serializer = self.get_serializer(task)
         return Response(serializer.data)
+
+    @action(detail=False, methods=['get'])
+    def stats(self, request):
+        """
+        Tareas creadas y completadas por el usuario actual en cada día entre
+        `start` y `end` (fechas UTC, inclusive) y la mediana del tiempo
+        hasta completarlas. Se responde desde los rollups diarios, sin
+        recorrer las tareas.
+        """
+        start = self.parse_date_param('start')
+        end = self.parse_date_param('end')
+        if end < start:
+            raise ValidationError({'end': 'Must not be earlier than start.'})
+        if (end - start).days >= settings.TASK_STATS_MAX_DAYS:
+            raise ValidationError({
+                'end': f'The range cannot exceed '
+                       f'{settings.TASK_STATS_MAX_DAYS} days.'
+            })
+        return Response(rollups.daily_stats(request.user, start, end))
+
+    @action(detail=True, methods=['get'])
+    def subtree(self, request, pk=None):
+        """
+        Devuelve la tarea con todas sus subtareas (en cualquier nivel) en
+        una sola query, junto con la cantidad de subtareas sin completar
+        """
+        task = self.get_object()
+        tasks = list(
+            task.get_subtree().prefetch_related('tags').order_by('path', 'id')
+        )
+        incomplete = sum(
+            1 for item in tasks
+            if item.pk != task.pk and item.status != 'completed'
+        )
+        serializer = self.get_serializer(tasks, many=True)
+        return Response({
+            'id': task.pk,
+            'incomplete_descendants': incomplete,
+            'tasks': serializer.data,
+        })
+
+    @action(detail=False, methods=['get'])
+    def occurrences(self, request):
+        """
+        Ocurrencias de las tareas recurrentes entre `start` y `end`. Las
+        futuras se calculan a partir de la regla; solo se leen de la base
+        las ocurrencias ya materializadas de la ventana.
+        """
+        start = self.parse_datetime_param('start')
+        end = self.parse_datetime_param('end')
+        if end <= start:
+            raise ValidationError({'end': 'Must be later than start.'})
+        if (end - start).days > settings.TASK_OCCURRENCES_MAX_DAYS:
+            raise ValidationError({
+                'end': f'The window cannot exceed '
+                       f'{settings.TASK_OCCURRENCES_MAX_DAYS} days.'
+            })
+
+        series = list(
+            self.get_queryset()
+            .exclude(recurrence='')
+            .exclude(status__in=['completed', 'cancelled'])
+            .filter(due_date__lt=end)
+        )
+        materialized = {}
+        if series:
+            materialized = {
+                (task.series_id, task.occurrence_date): task
+                for task in Task.objects.filter(
+                    series__in=[task.pk for task in series],
+                    occurrence_date__gte=start,
+                    occurrence_date__lt=end
+                )
+            }
+        occurrences = []
+        for task in series:
+            for date in task.occurrences_between(start, end):
+                occurrence = materialized.get((task.pk, date))
+                if occurrence is None:
+                    occurrence = Task(
+                        series_id=task.pk,
+                        occurrence_date=date,
+                        title=task.title,
+                        description=task.description,
+                        priority=task.priority,
+                        due_date=date,
+                    )
+                occurrences.append(occurrence)
+        occurrences.sort(key=lambda item: (item.occurrence_date, item.series_id))
+        serializer = OccurrenceSerializer(occurrences, many=True)
+        return Response(serializer.data)
+
+
+@require_GET
+async def events_stream(request):
+    """
+    Stream SSE con los cambios en las tareas del usuario actual y de sus
+    workspaces (created, updated, completed, reopened, deleted). Es una
+    vista asíncrona que sirve el proceso ASGI (nginx enruta ahí
+    /api/tasks/events/): cada cliente conectado es una corrutina esperando
+    eventos, no un worker de uWSGI.
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse(
+            {'detail': 'The event stream is served by the ASGI server.'},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+    authentication = JWTAuthentication()
+    try:
+        result = await sync_to_async(authentication.authenticate)(request)
+    except AuthenticationFailed as exc:
+        result, detail = None, exc.detail
+    else:
+        detail = NotAuthenticated.default_detail
+    if result is None:
+        response = JsonResponse(
+            {'detail': detail}, status=status.HTTP_401_UNAUTHORIZED
+        )
+        response['WWW-Authenticate'] = authentication.authenticate_header(request)
+        return response
+    user = result[0]
+
+    def subscribe():
+        workspace_ids = WorkspaceMembership.objects.filter(
+            user=user
+        ).values_list('workspace_id', flat=True)
+        return task_events.subscribe([
+            task_events.user_channel(user.pk),
+            *map(task_events.workspace_channel, workspace_ids),
+        ])
+
+    task_events.ensure_listener()
+    subscription = await sync_to_async(subscribe)()
+    response = StreamingHttpResponse(
+        task_events.stream(subscription),
+        content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+class WorkspaceViewSet(mixins.CreateModelMixin,
+                       mixins.RetrieveModelMixin,
+                       mixins.DestroyModelMixin,
+                       mixins.ListModelMixin,
+                       viewsets.GenericViewSet):
+    serializer_class = WorkspaceSerializer
+    permission_classes = [IsAuthenticated]
+    throttle_classes = [WriteTokenBucketThrottle]
+    throttle_scope = 'task_write'
+
+    def get_queryset(self):
+        """
+        Workspaces de los que el usuario actual es miembro
+        """
+        return Workspace.objects.filter(memberships__user=self.request.user)
+
+    def check_owner(self, workspace):
+        if workspace.owner_id != self.request.user.pk:
+            raise PermissionDenied('Only the workspace owner can do this.')
+
+    def perform_destroy(self, instance):
+        self.check_owner(instance)
+        instance.delete()
+
+    @action(detail=True, methods=['get', 'post'])
+    def members(self, request, pk=None):
+        """
+        Lista los miembros del workspace o agrega uno por email (solo el dueño)
+        """
+        workspace = self.get_object()
+        if request.method == 'GET':
+            memberships = workspace.memberships.select_related('user')
+            serializer = WorkspaceMembershipSerializer(memberships, many=True)
+            return Response(serializer.data)
+        self.check_owner(workspace)
+        serializer = WorkspaceMembershipSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        if workspace.memberships.filter(
+            user=serializer.validated_data['user']
+        ).exists():
+            raise ValidationError({'user': 'Already a member.'})
+        serializer.save(workspace=workspace)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @action(
+        detail=True,
+        methods=['delete'],
+        url_path=r'members/(?P<user_id>[0-9]+)'
+    )
+    def remove_member(self, request, pk=None, user_id=None):
+        """
+        Quita un miembro del workspace. El dueño puede quitar a cualquiera
+        y cada miembro puede salir por su cuenta.
+        """
+        workspace = self.get_object()
+        if int(user_id) != request.user.pk:
+            self.check_owner(workspace)
+        membership = get_object_or_404(
+            workspace.memberships, user_id=user_id
+        )
+        if membership.user_id == workspace.owner_id:
+            raise ValidationError({'user': 'The owner cannot be removed.'})
+        membership.delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+# Rutas que no se pueden usar dentro de un batch
+BATCH_EXCLUDED_ROUTES = ('batch', 'task-events')
+# Headers del request original que no se pasan a las operaciones
+BATCH_DROPPED_HEADERS = (
+    'CONTENT_TYPE', 'CONTENT_LENGTH', 'HTTP_IDEMPOTENCY_KEY', 'HTTP_IF_MATCH',
+)
+
+
+class BatchView(APIView):
+    """
+    Ejecuta varias operaciones de la API de tareas en un solo request, en
+    orden y dentro de una transacción. El usuario se autentica una sola vez
+    y las operaciones reciben el usuario ya resuelto. Si una operación
+    falla (status >= 400) no se ejecutan las siguientes y se deshacen las
+    anteriores; los eventos SSE solo se publican si la transacción se
+    confirma.
+    """
+    permission_classes = [IsAuthenticated]
+
+    @idempotent
+    def post(self, request):
+        serializer = BatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        operations = serializer.validated_data['operations']
+
+        results = []
+        with rollups.deferred():
+            for index, operation in enumerate(operations):
+                result = self.run_operation(request, operation)
+                results.append(result)
+                if result['status'] >= 400:
+                    transaction.set_rollback(True)
+                    return Response(
+                        {'results': results, 'failed': index},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+        return Response({'results': results})
+
+    def run_operation(self, request, operation):
+        url = urlsplit(operation['path'])
+        try:
+            match = resolve(url.path, urlconf='tasks.urls')
+        except Resolver404:
+            match = None
+        if match is None or match.url_name in BATCH_EXCLUDED_ROUTES:
+            return {
+                'status': status.HTTP_404_NOT_FOUND,
+                'body': {'detail': 'Not found.'},
+            }
+
+        body = b''
+        if 'body' in operation:
+            body = json.dumps(operation['body']).encode()
+        environ = {
+            key: value for key, value in request.META.items()
+            if key not in BATCH_DROPPED_HEADERS
+        }
+        environ.update({
+            'REQUEST_METHOD': operation['method'],
+            'SCRIPT_NAME': '',
+            'PATH_INFO': url.path,
+            'QUERY_STRING': url.query,
+            'CONTENT_TYPE': 'application/json',
+            'CONTENT_LENGTH': str(len(body)),
+            'wsgi.input': io.BytesIO(body),
+        })
+        if 'if_match' in operation:
+            environ['HTTP_IF_MATCH'] = operation['if_match']
+
+        sub_request = WSGIRequest(environ)
+        sub_request.resolver_match = match
+        # DRF usa estos atributos en lugar de volver a autenticar
+        sub_request._force_auth_user = request.user
+        sub_request._force_auth_token = request.auth
+        response = match.func(sub_request, *match.args, **match.kwargs)
+        return {
+            'status': response.status_code,
+            'body': getattr(response, 'data', None),
+        }
@@ -0,0 +1,27 @@
+from django.contrib import admin
+from django.contrib.auth.admin import UserAdmin
+from django.urls import reverse
+from django.utils.html import format_html
+
+from core.paginator import EstimatedCountPaginator
+from .models import Users
+
+
+@admin.register(Users)
+class UsersAdmin(UserAdmin):
+    list_display = ('email', 'username', 'is_staff', 'date_joined', 'tasks')
+    # Los valores poco frecuentes (staff, inactivos) tienen índices parciales
+    list_filter = ('is_staff', 'is_active')
+    # Por prefijo, sobre los índices UPPER(columna) de Users.Meta. También
+    # las usa el autocomplete del usuario en TaskAdmin
+    search_fields = ('^email', '^username')
+    ordering = ('-id',)
+    sortable_by = ('email',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    @admin.display(description='Tasks')
+    def tasks(self, user):
+        """Link a las tareas del usuario, filtradas por el índice de user"""
+        url = reverse('admin:tasks_task_changelist')
+        return format_html('<a href="{}?user__id__exact={}">Tasks</a>', url, user.pk)
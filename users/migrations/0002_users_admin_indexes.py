@@ -0,0 +1,35 @@
+# Generated by Django 5.0 on 2026-10-19 00:12
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY no puede correr dentro de una transacción
+    atomic = False
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='users',
+            index=models.Index(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('email'), name='text_pattern_ops'), name='users_email_upper_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='users',
+            index=models.Index(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('username'), name='text_pattern_ops'), name='users_username_upper_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='users',
+            index=models.Index(condition=models.Q(('is_staff', True)), fields=['id'], name='users_staff_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='users',
+            index=models.Index(condition=models.Q(('is_active', False)), fields=['id'], name='users_inactive_idx'),
+        ),
+    ]
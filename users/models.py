@@ -1,5 +1,8 @@
 from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.indexes import OpClass
 from django.db import models
+from django.db.models import Q
+from django.db.models.functions import Upper
 
 
 class Users(AbstractUser):
@@ -24,3 +27,27 @@ class Users(AbstractUser):
         Meta method for the User model.
         """
         db_table = "users"
+        indexes = [
+            # Búsqueda del admin por prefijo (`^email`, `^username`), que
+            # Django resuelve con UPPER(columna) LIKE 'PREFIJO%'
+            models.Index(
+                OpClass(Upper('email'), name='text_pattern_ops'),
+                name='users_email_upper_idx'
+            ),
+            models.Index(
+                OpClass(Upper('username'), name='text_pattern_ops'),
+                name='users_username_upper_idx'
+            ),
+            # Filtros del admin por los valores poco frecuentes, en el
+            # orden del listado
+            models.Index(
+                fields=['id'],
+                condition=Q(is_staff=True),
+                name='users_staff_idx'
+            ),
+            models.Index(
+                fields=['id'],
+                condition=Q(is_active=False),
+                name='users_inactive_idx'
+            ),
+        ]
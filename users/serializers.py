@@ -1,9 +1,11 @@
 from rest_framework import serializers
 from django.contrib.auth import authenticate
+
+from core.serializers import TimedSerializerMixin
 from .models import Users
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Users
         fields = ('id', 'username', 'email', 'phone_number')
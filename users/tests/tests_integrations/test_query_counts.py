@@ -0,0 +1,67 @@
+import pytest
+
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from users.models import Users
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def user_data():
+    return {
+        'username': 'testuser',
+        'email': 'test@example.com',
+        'password': 'securepass123',
+        'phone_number': '1234567890'
+    }
+
+
+@pytest.fixture
+def user(user_data):
+    return Users.objects.create_user(**user_data)
+
+
+# Registro y login incluyen el upsert del token bucket (core.throttling)
+@pytest.mark.django_db
+class TestUserQueryBudgets:
+    def test_register(self, api_client, user_data, assert_num_queries):
+        with assert_num_queries(5):
+            response = api_client.post(
+                reverse('register'), user_data, format='json'
+            )
+        assert response.status_code == status.HTTP_201_CREATED
+
+    def test_login(self, api_client, user, user_data, assert_num_queries):
+        with assert_num_queries(3):
+            response = api_client.post(reverse('login'), {
+                'username': user_data['email'],
+                'password': user_data['password'],
+            }, format='json')
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_failed_login(self, api_client, user, user_data, assert_num_queries):
+        with assert_num_queries(2):
+            response = api_client.post(reverse('login'), {
+                'username': user_data['email'],
+                'password': 'wrong-password',
+            }, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_logout(self, api_client, user, assert_num_queries):
+        refresh = RefreshToken.for_user(user)
+        api_client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}'
+        )
+        # blacklist de simplejwt: verificación, get_or_create y savepoints
+        with assert_num_queries(7):
+            response = api_client.post(
+                reverse('logout'), {'refresh': str(refresh)}, format='json'
+            )
+        assert response.status_code == status.HTTP_200_OK
@@ -5,6 +5,7 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.exceptions import TokenError
 
+from core.throttling import ScopedTokenBucketThrottle
 
 from .serializers import (
     UserRegistrationSerializer,
@@ -17,6 +18,9 @@ class RegisterView(APIView):
     """
     Permite la creación de nuevos usuarios
     """
+    throttle_classes = [ScopedTokenBucketThrottle]
+    throttle_scope = 'register'
+
     def post(self, request):
         serializer = UserRegistrationSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -35,6 +39,9 @@ class LoginView(APIView):
     """
     Permite el inicio de sesión de usuarios
     """
+    throttle_classes = [ScopedTokenBucketThrottle]
+    throttle_scope = 'login'
+
     def post(self, request):
         serializer = LoginSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)